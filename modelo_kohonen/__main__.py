@@ -0,0 +1,3 @@
+from modelo_kohonen.cli import main
+
+main()
@@ -0,0 +1,161 @@
+# Suite de benchmarks reproducibles del entrenamiento y la extracción de características.
+# Genera datasets sintéticos con semilla fija, mide cada fase (distancias, actualización de
+# pesos, cada motor de entrenamiento en 'dura' y 'blanda', extracción de imágenes) y guarda
+# los tiempos y el pico de memoria en JSON para comparar entre commits.
+# Uso (desde la raíz del repositorio):
+#   python -m modelo_kohonen benchmark entrenamiento --salida resultados.json
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from PIL import Image
+from modelo_kohonen.configuraciones.creacionred import RedKohonen
+from modelo_kohonen.configuraciones.extraccion import extraer_caracteristicas
+
+MOTORES = ('online', 'batch', 'minibatch', 'flujo', 'paralelo')
+COMPETENCIAS = ('dura', 'blanda')
+
+# Ejecuta 'funcion' una vez cronometrada y, si se pide, otra bajo tracemalloc para el pico de memoria
+def medir(funcion, memoria=True):
+    with contextlib.redirect_stdout(io.StringIO()):  # Silenciar los mensajes del entrenamiento
+        inicio = time.perf_counter()
+        resultado = funcion()
+        segundos = time.perf_counter() - inicio
+
+        pico = None
+        if memoria:
+            tracemalloc.start()
+            funcion()
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return segundos, pico, resultado
+
+def crear_red(entradas, neuronas, competencia, epocas, semilla):
+    return RedKohonen(entradas, competencia, 0.1, epocas, columnas=neuronas, semilla=semilla)
+
+def bench_fases(dataset, neuronas, semilla, repeticiones, memoria):
+    resultados = []
+    entradas = dataset.shape[1]
+    patrones = dataset[:repeticiones].astype(float)
+
+    red = crear_red(entradas, neuronas, 'dura', 1, semilla)
+    segundos, pico, _ = medir(lambda: [red.calcular_distancias(p) for p in patrones], memoria)
+    resultados.append({'fase': 'calcular_distancias', 'segundos_por_llamada': segundos / len(patrones),
+                       'pico_memoria_bytes': pico})
+
+    for competencia in COMPETENCIAS:
+        red = crear_red(entradas, neuronas, competencia, 10, semilla)
+        vencedoras = np.random.default_rng(semilla).integers(red.num_neuronas, size=len(patrones))
+        segundos, pico, _ = medir(
+            lambda: [red.actualizar_pesos(p, v, 1) for p, v in zip(patrones, vencedoras)], memoria)
+        resultados.append({'fase': 'actualizar_pesos', 'competencia': competencia,
+                           'segundos_por_llamada': segundos / len(patrones), 'pico_memoria_bytes': pico})
+    return resultados
+
+def bench_motor(dataset, neuronas, motor, competencia, epocas, batch_size, procesos, semilla, memoria):
+    def entrenar():
+        red = crear_red(dataset.shape[1], neuronas, competencia, epocas, semilla)
+        if motor == 'flujo':
+            red.entrenar_flujo(lambda: (dataset[i:i + 4 * batch_size] for i in range(0, len(dataset), 4 * batch_size)),
+                               batch_size=batch_size)
+        elif motor == 'paralelo':
+            red.entrenar_paralelo(dataset, procesos=procesos, batch_size=batch_size)
+        else:
+            red.entrenar(dataset, modo=motor, batch_size=batch_size, mostrar_graficos=False)
+        return red
+
+    # En 'paralelo' tracemalloc solo ve el proceso principal
+    segundos, pico, red = medir(entrenar, memoria)
+    num_epocas = len(red.dm_values)
+    return {'fase': 'entrenar', 'motor': motor, 'competencia': competencia, 'epocas': num_epocas,
+            'segundos': segundos, 'segundos_por_epoca': segundos / num_epocas,
+            'patrones_por_segundo': len(dataset) * num_epocas / segundos,
+            'dm_final': float(red.dm_values[-1]), 'pico_memoria_bytes': pico}
+
+def bench_extraccion(num_imagenes, tamano, procesos, semilla, memoria):
+    rng = np.random.default_rng(semilla)
+    resultados = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        rutas = []
+        for i in range(num_imagenes):
+            ruta = os.path.join(carpeta, f"imagen{i}.png")
+            Image.fromarray((rng.random((tamano, tamano)) < 0.5).astype(np.uint8) * 255).save(ruta)
+            rutas.append(ruta)
+
+        for num_procesos in sorted({1, procesos}):
+            segundos, pico, _ = medir(lambda: list(extraer_caracteristicas(rutas, procesos=num_procesos)), memoria)
+            resultados.append({'fase': 'procesar_imagen', 'procesos': num_procesos, 'imagenes': num_imagenes,
+                               'tamano': tamano, 'segundos': segundos, 'imagenes_por_segundo': num_imagenes / segundos,
+                               'pico_memoria_bytes': pico})
+    return resultados
+
+def commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks reproducibles de la red de Kohonen")
+    parser.add_argument('--entradas', type=int, nargs='+', default=[16, 64])
+    parser.add_argument('--patrones', type=int, nargs='+', default=[2000, 10000])
+    parser.add_argument('--neuronas', type=int, nargs='+', default=[64, 256])
+    parser.add_argument('--motores', nargs='+', choices=MOTORES, default=list(MOTORES))
+    parser.add_argument('--epocas', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--procesos', type=int, default=2)
+    parser.add_argument('--repeticiones', type=int, default=200, help="Llamadas por fase individual")
+    parser.add_argument('--imagenes', type=int, default=500)
+    parser.add_argument('--tamano-imagen', type=int, default=32)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--sin-memoria', action='store_true', help="No medir el pico de memoria (más rápido)")
+    parser.add_argument('--salida', default=None, help="Archivo JSON de salida (por defecto, stdout)")
+    args = parser.parse_args(argv)
+    memoria = not args.sin_memoria
+
+    resultados = []
+    for entradas, patrones, neuronas in itertools.product(args.entradas, args.patrones, args.neuronas):
+        configuracion = {'entradas': entradas, 'patrones': patrones, 'neuronas': neuronas}
+        dataset = np.random.default_rng(args.semilla).normal(size=(patrones, entradas))
+        print(f"Configuración {configuracion}", file=sys.stderr)
+
+        for resultado in bench_fases(dataset, neuronas, args.semilla, args.repeticiones, memoria):
+            resultados.append({**configuracion, **resultado})
+        for motor, competencia in itertools.product(args.motores, COMPETENCIAS):
+            resultado = bench_motor(dataset, neuronas, motor, competencia, args.epocas, args.batch_size,
+                                    args.procesos, args.semilla, memoria)
+            resultados.append({**configuracion, **resultado})
+
+    if args.imagenes:
+        resultados.extend(bench_extraccion(args.imagenes, args.tamano_imagen, args.procesos, args.semilla, memoria))
+
+    informe = {
+        'metadatos': {
+            'commit': commit_actual(),
+            'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+            'argumentos': vars(args),
+        },
+        'resultados': resultados,
+    }
+    texto = json.dumps(informe, indent=2)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            archivo.write(texto)
+    else:
+        print(texto)
+
+if __name__ == '__main__':
+    main()
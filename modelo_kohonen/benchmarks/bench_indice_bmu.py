@@ -0,0 +1,49 @@
+# Benchmark de recall vs velocidad del índice BMU frente a la búsqueda por fuerza bruta.
+# Uso (desde la raíz del repositorio): python -m modelo_kohonen benchmark indice_bmu
+import argparse
+import time
+import numpy as np
+from modelo_kohonen.configuraciones.indice_bmu import IndiceBMU, distancias_cuadradas
+
+# Mapa sintético con estructura de grupos, parecido a un mapa ya entrenado
+def generar_datos(rng, num_entradas, num_neuronas, num_consultas, num_clusters=32):
+    centros = rng.normal(0, 3, (num_clusters, num_entradas))
+    pesos = (centros[rng.integers(num_clusters, size=num_neuronas)]
+             + rng.normal(0, 1, (num_neuronas, num_entradas))).T
+    consultas = (centros[rng.integers(num_clusters, size=num_consultas)]
+                 + rng.normal(0, 1, (num_consultas, num_entradas)))
+    return pesos, consultas
+
+def medir(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    return (time.perf_counter() - inicio) / repeticiones, resultado
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recall vs velocidad del índice BMU")
+    parser.add_argument('--entradas', type=int, default=64)
+    parser.add_argument('--neuronas', type=int, default=4096)
+    parser.add_argument('--consultas', type=int, default=10000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--sondas', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    pesos, consultas = generar_datos(rng, args.entradas, args.neuronas, args.consultas)
+
+    tiempo_exacto, distancias = medir(lambda: distancias_cuadradas(consultas, pesos), args.repeticiones)
+    exactas = np.argmin(distancias, axis=1)
+    print(f"Mapa: {args.entradas} entradas x {args.neuronas} neuronas, {args.consultas} consultas")
+    print(f"{'sondas':>8} {'recall':>8} {'tiempo (ms)':>12} {'aceleración':>12}")
+    print(f"{'exacto':>8} {1.0:>8.4f} {tiempo_exacto * 1000:>12.2f} {1.0:>12.2f}")
+
+    for num_sondas in args.sondas:
+        indice = IndiceBMU(num_sondas=num_sondas, rng=np.random.default_rng(0))
+        indice.construir(pesos)
+        tiempo, (vencedoras, _) = medir(lambda: indice.buscar(consultas), args.repeticiones)
+        recall = np.mean(vencedoras == exactas)
+        print(f"{num_sondas:>8} {recall:>8.4f} {tiempo * 1000:>12.2f} {tiempo_exacto / tiempo:>12.2f}")
+
+if __name__ == '__main__':
+    main()
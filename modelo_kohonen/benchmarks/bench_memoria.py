@@ -0,0 +1,52 @@
+# Benchmark de asignaciones de memoria del entrenamiento y la simulación.
+# Para cada motor mide el tiempo por época y el pico de memoria reservada por NumPy durante
+# la época (tracemalloc): con buffers reutilizados no debería crecer con cada bloque o patrón.
+# Uso (desde la raíz del repositorio):
+#   python -m modelo_kohonen benchmark memoria --entradas 64 --neuronas 1024
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+import numpy as np
+from modelo_kohonen.configuraciones.creacionred import RedKohonen
+
+def medir(nombre, funcion, repeticiones):
+    # Una pasada de calentamiento (reserva de buffers) y después las mediciones
+    with contextlib.redirect_stdout(io.StringIO()):
+        funcion()
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            funcion()
+        segundos = (time.perf_counter() - inicio) / repeticiones
+
+        tracemalloc.start()
+        funcion()
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    print(f"{nombre:>22} {segundos:>10.4f} {pico / 2 ** 20:>12.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Asignaciones de memoria por motor de entrenamiento")
+    parser.add_argument('--entradas', type=int, default=64)
+    parser.add_argument('--neuronas', type=int, default=1024)
+    parser.add_argument('--patrones', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    dataset = np.random.default_rng(args.semilla).normal(size=(args.patrones, args.entradas))
+    print(f"{args.patrones} patrones x {args.entradas} entradas, {args.neuronas} neuronas, "
+          f"bloques de {args.batch_size}")
+    print(f"{'fase':>22} {'s/época':>10} {'pico (MiB)':>12}")
+    for competencia in ('dura', 'blanda'):
+        for modo in ('online', 'minibatch', 'batch'):
+            red = RedKohonen(args.entradas, competencia, 0.1, 1000, columnas=args.neuronas, semilla=args.semilla)
+            red.preparar_normalizacion([dataset], False)
+            bloques = lambda: (dataset[i:i + args.batch_size] for i in range(0, len(dataset), args.batch_size))
+            medir(f"{modo} {competencia}", lambda: red.entrenar_epoca(bloques(), 1, modo), args.repeticiones)
+    medir("simular_lote", lambda: red.simular_lote(dataset), args.repeticiones)
+
+if __name__ == '__main__':
+    main()
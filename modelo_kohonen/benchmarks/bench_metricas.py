@@ -0,0 +1,74 @@
+# Benchmark del motor de métricas (configuraciones/metricas.py) frente al cálculo con bucles
+# de Python (patrón a patrón para los errores y neurona a neurona para la matriz U). Comprueba
+# que ambos dan lo mismo y mide el tiempo de cada uno; el de bucles solo sobre --patrones-bucle.
+# Uso (desde la raíz del repositorio): python -m modelo_kohonen benchmark metricas
+import argparse
+import time
+import numpy as np
+from modelo_kohonen.configuraciones.creacionred import RedKohonen
+from modelo_kohonen.configuraciones.metricas import DISTANCIA_ADYACENTES
+
+def metricas_bucle(red, datos):
+    pesos = np.asarray(red.pesos, dtype=np.float64)
+    distancias_red = red.tabla_distancias()
+    suma_distancias = 0.0
+    errores = 0
+    aciertos = np.zeros(red.num_neuronas, dtype=np.int64)
+    for patron in red.normalizar(datos).astype(np.float64):
+        distancias = np.sqrt(((pesos - patron[:, np.newaxis]) ** 2).sum(axis=0))
+        primera, segunda = np.argsort(distancias)[:2]
+        suma_distancias += distancias[primera]
+        errores += distancias_red[primera, segunda] > DISTANCIA_ADYACENTES
+        aciertos[primera] += 1
+    u = np.zeros(red.num_neuronas)
+    for i in range(red.num_neuronas):
+        vecinas = [j for j in range(red.num_neuronas) if 0 < distancias_red[i, j] <= DISTANCIA_ADYACENTES]
+        if vecinas:
+            u[i] = np.mean([np.linalg.norm(pesos[:, i] - pesos[:, j]) for j in vecinas])
+    return suma_distancias / len(datos), errores / len(datos), aciertos, u
+
+def medir(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    return (time.perf_counter() - inicio) / repeticiones, resultado
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Motor de métricas vectorizado vs bucles de Python")
+    parser.add_argument('--entradas', type=int, default=64)
+    parser.add_argument('--filas', type=int, default=32)
+    parser.add_argument('--columnas', type=int, default=32)
+    parser.add_argument('--topologia', choices=['rectangular', 'hexagonal'], default='hexagonal')
+    parser.add_argument('--patrones', type=int, default=200000)
+    parser.add_argument('--patrones-bucle', type=int, default=2000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.semilla)
+    datos = rng.normal(size=(args.patrones, args.entradas)).astype(np.float32)
+    red = RedKohonen(args.entradas, 'dura', 0.1, 1, topologia=args.topologia, filas=args.filas,
+                     columnas=args.columnas, semilla=args.semilla)
+    red.preparar_normalizacion([datos], False)
+    muestra = datos[:args.patrones_bucle]
+
+    inicio = time.perf_counter()
+    cuantizacion, topografico, aciertos, u = metricas_bucle(red, muestra)
+    tiempo_bucle = time.perf_counter() - inicio
+    tiempo_muestra, metricas = medir(lambda: red.metricas(muestra), args.repeticiones)
+    print(f"Mapa: {args.filas}x{args.columnas} ({args.topologia}), {args.entradas} entradas")
+    print(f"Comprobación con {len(muestra)} patrones: "
+          f"cuantización {abs(metricas['error_cuantizacion'] - cuantizacion):.2e}, "
+          f"topográfico {abs(metricas['error_topografico'] - topografico):.2e}, "
+          f"aciertos {'iguales' if np.array_equal(metricas['aciertos'], aciertos) else 'DISTINTOS'}, "
+          f"matriz U {np.max(np.abs(metricas['matriz_u'] - u)):.2e}")
+
+    tiempo, metricas = medir(lambda: red.metricas(datos), args.repeticiones)
+    print(f"{'método':>12} {'patrones':>10} {'tiempo (ms)':>12} {'patrones/s':>12}")
+    print(f"{'bucles':>12} {len(muestra):>10} {tiempo_bucle * 1000:>12.1f} {len(muestra) / tiempo_bucle:>12.0f}")
+    print(f"{'vectorizado':>12} {len(muestra):>10} {tiempo_muestra * 1000:>12.1f} "
+          f"{len(muestra) / tiempo_muestra:>12.0f}")
+    print(f"{'vectorizado':>12} {len(datos):>10} {tiempo * 1000:>12.1f} {len(datos) / tiempo:>12.0f}")
+
+if __name__ == '__main__':
+    main()
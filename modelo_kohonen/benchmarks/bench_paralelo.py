@@ -0,0 +1,47 @@
+# Benchmark de escalado del entrenamiento por lotes en paralelo (tiempo por época vs procesos).
+# El tiempo por época sale de los eventos de telemetría (solo el bucle de épocas); el arranque
+# del pool y la publicación en memoria compartida se muestran aparte, en 'arranque'. El pool crea
+# sus procesos con la primera tarea, así que la primera época no cuenta para el tiempo por época.
+# Uso (desde la raíz del repositorio): python -m modelo_kohonen benchmark paralelo --patrones 200000
+import argparse
+import os
+import time
+import numpy as np
+from modelo_kohonen.configuraciones.creacionred import RedKohonen
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Escalado del SOM por lotes en paralelo")
+    parser.add_argument('--entradas', type=int, default=64)
+    parser.add_argument('--patrones', type=int, default=200000)
+    parser.add_argument('--epocas', type=int, default=5)
+    parser.add_argument('--competencia', choices=['dura', 'blanda'], default='blanda')
+    parser.add_argument('--procesos', type=int, nargs='+', default=None)
+    args = parser.parse_args(argv)
+
+    maximo = os.cpu_count() or 1
+    lista_procesos = args.procesos or sorted({p for p in (1, 2, 4, 8, 16, 32, maximo) if p <= maximo})
+
+    dataset = np.random.default_rng(0).normal(size=(args.patrones, args.entradas))
+
+    print(f"Dataset: {args.patrones} patrones x {args.entradas} entradas, {args.epocas} épocas, "
+          f"competencia {args.competencia}")
+    print(f"{'procesos':>9} {'s/época':>10} {'arranque (s)':>13} {'aceleración':>12} {'eficiencia':>11}")
+    tiempo_base = None
+    for procesos in lista_procesos:
+        red = RedKohonen(args.entradas, args.competencia, 0.1, args.epocas, semilla=0)
+        epocas = []
+        red.activar_telemetria(lambda evento: epocas.append(evento['segundos']))
+        inicio = time.perf_counter()
+        red.entrenar_paralelo(dataset, procesos=procesos)
+        total = time.perf_counter() - inicio
+        red.desactivar_telemetria()
+        estables = epocas[1:] or epocas
+        por_epoca = sum(estables) / len(estables)
+        arranque = total - por_epoca * len(epocas)
+        tiempo_base = tiempo_base or por_epoca
+        aceleracion = tiempo_base / por_epoca
+        print(f"{procesos:>9} {por_epoca:>10.3f} {arranque:>13.3f} {aceleracion:>12.2f} "
+              f"{aceleracion / procesos:>11.2f}")
+
+if __name__ == '__main__':
+    main()
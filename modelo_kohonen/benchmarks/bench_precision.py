@@ -0,0 +1,64 @@
+# Precisión frente a velocidad según el tipo de los pesos (float64, float32, float16).
+# Entrena la misma red (misma semilla) con cada tipo y compara el DM final, el acuerdo de
+# vencedoras con float64 y el tiempo por época, en los datasets de letras y en uno sintético grande.
+# Uso (desde la raíz del repositorio):
+#   python -m modelo_kohonen benchmark precision entrenamiento.csv entrenamiento20.csv
+import argparse
+import contextlib
+import io
+import time
+import numpy as np
+from modelo_kohonen.configuraciones.creacionred import RedKohonen, TIPOS_PESOS, MODOS_ENTRENAMIENTO
+from modelo_kohonen.configuraciones.dataset_binario import cargar_dataset
+
+def entrenar(dataset, dtype, modo, args):
+    red = RedKohonen(dataset.shape[1], args.competencia, 0.1, args.epocas, topologia='rectangular',
+                     filas=args.filas, columnas=args.columnas, semilla=args.semilla, dtype=dtype)
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        red.entrenar(dataset, modo=modo, mostrar_graficos=False)
+        segundos = time.perf_counter() - inicio
+    return red, segundos / len(red.dm_values)
+
+def comparar(nombre, dataset, args):
+    print(f"\n{nombre}: {dataset.shape[0]} patrones x {dataset.shape[1]} entradas, "
+          f"mapa {args.filas}x{args.columnas}, {args.epocas} épocas")
+    print(f"{'modo':>10} {'dtype':>8} {'s/época':>10} {'DM final':>12} {'ΔDM rel.':>10} "
+          f"{'acuerdo BMU':>12} {'pesos (KiB)':>12}")
+    for modo in args.modos:
+        referencia = None
+        for dtype in TIPOS_PESOS:
+            red, por_epoca = entrenar(dataset, dtype, modo, args)
+            vencedoras = red.simular_lote(dataset)['vencedoras']
+            if referencia is None:
+                referencia = (red.dm_values[-1], vencedoras)
+            dm_referencia, vencedoras_referencia = referencia
+            print(f"{modo:>10} {dtype:>8} {por_epoca:>10.4f} {red.dm_values[-1]:>12.6f} "
+                  f"{abs(red.dm_values[-1] - dm_referencia) / dm_referencia:>10.2e} "
+                  f"{np.mean(vencedoras == vencedoras_referencia):>12.3f} {red.pesos.nbytes / 1024:>12.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precisión y velocidad según el tipo de los pesos")
+    parser.add_argument('datasets', nargs='*', help="CSV o .npy de letras")
+    parser.add_argument('--modos', nargs='+', choices=MODOS_ENTRENAMIENTO, default=['online', 'batch'])
+    parser.add_argument('--competencia', choices=['dura', 'blanda'], default='blanda')
+    parser.add_argument('--filas', type=int, default=8)
+    parser.add_argument('--columnas', type=int, default=8)
+    parser.add_argument('--epocas', type=int, default=50)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--sintetico', type=int, nargs=2, default=[50000, 64], metavar=('PATRONES', 'ENTRADAS'),
+                        help="Dataset sintético adicional (0 0 para omitirlo)")
+    args = parser.parse_args(argv)
+
+    for ruta in args.datasets:
+        matriz, _ = cargar_dataset(ruta)
+        comparar(ruta, np.asarray(matriz), args)
+
+    patrones, entradas = args.sintetico
+    if patrones:
+        dataset = np.random.default_rng(args.semilla).integers(0, 30, size=(patrones, entradas)).astype(np.uint16)
+        comparar("sintético", dataset, argparse.Namespace(**{**vars(args), 'modos': ['batch'], 'epocas': 5,
+                                                           'filas': 32, 'columnas': 32}))
+
+if __name__ == '__main__':
+    main()
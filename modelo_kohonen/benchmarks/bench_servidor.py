@@ -0,0 +1,170 @@
+# Prueba de carga del servidor de inferencia (python -m modelo_kohonen serve).
+# Lanza el servidor en un subproceso para cada tamaño máximo de micro-lote (1 = sin agrupar),
+# abre --clientes conexiones concurrentes que envían sus peticiones una tras otra y mide la
+# latencia de cada petición (p50/p99), el rendimiento y el tamaño medio de lote del servidor.
+# Sin --modelo se guarda un modelo sintético con semilla fija; con --servidor se prueba un
+# servidor ya en marcha (ruta de socket Unix o http://host:puerto).
+# Uso (desde la raíz del repositorio):
+#   python -m modelo_kohonen benchmark servidor --clientes 64 --lotes-maximos 1 256
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from modelo_kohonen.configuraciones.creacionred import RedKohonen
+from modelo_kohonen.configuraciones.modelo import guardar_modelo
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+async def abrir_conexion(direccion):
+    if direccion.startswith('http://'):
+        host, _, puerto = direccion[len('http://'):].rstrip('/').rpartition(':')
+        return await asyncio.open_connection(host, int(puerto))
+    return await asyncio.open_unix_connection(direccion)
+
+async def peticion(lector, escritor, metodo, ruta, cuerpo=b''):
+    escritor.write(f"{metodo} {ruta} HTTP/1.1\r\nHost: kohonen\r\nContent-Type: application/json\r\n"
+                   f"Content-Length: {len(cuerpo)}\r\n\r\n".encode('latin-1') + cuerpo)
+    await escritor.drain()
+    estado = int((await lector.readline()).split()[1])
+    longitud = 0
+    while True:
+        linea = await lector.readline()
+        if linea in (b'\r\n', b''):
+            break
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        if nombre.strip().lower() == 'content-length':
+            longitud = int(valor)
+    respuesta = json.loads(await lector.readexactly(longitud))
+    if estado != 200:
+        raise RuntimeError(f"{ruta}: HTTP {estado} {respuesta.get('error')}")
+    return respuesta
+
+async def consultar(direccion, metodo, ruta):
+    lector, escritor = await abrir_conexion(direccion)
+    try:
+        return await peticion(lector, escritor, metodo, ruta)
+    finally:
+        escritor.close()
+
+async def cliente(direccion, cuerpos, latencias):
+    lector, escritor = await abrir_conexion(direccion)
+    try:
+        for cuerpo in cuerpos:
+            inicio = time.perf_counter()
+            await peticion(lector, escritor, 'POST', '/simular', cuerpo)
+            latencias.append(time.perf_counter() - inicio)
+    finally:
+        escritor.close()
+
+async def carga(direccion, cuerpos_por_cliente):
+    antes = await consultar(direccion, 'GET', '/estadisticas')
+    latencias = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(direccion, cuerpos, latencias) for cuerpos in cuerpos_por_cliente))
+    segundos = time.perf_counter() - inicio
+    despues = await consultar(direccion, 'GET', '/estadisticas')
+    lotes = despues['lotes'] - antes['lotes']
+    return {
+        'lote_maximo': despues['lote_maximo'],
+        'peticiones': len(latencias),
+        'segundos': segundos,
+        'peticiones_por_segundo': len(latencias) / segundos,
+        'latencia_p50_ms': float(np.percentile(latencias, 50) * 1000),
+        'latencia_p99_ms': float(np.percentile(latencias, 99) * 1000),
+        'patrones_por_lote': (despues['patrones'] - antes['patrones']) / lotes if lotes else 0.0,
+    }
+
+async def esperar_servidor(direccion, proceso, limite=30.0):
+    fin = time.monotonic() + limite
+    while True:
+        try:
+            return await consultar(direccion, 'GET', '/salud')
+        except OSError:
+            if proceso.poll() is not None or time.monotonic() > fin:
+                raise RuntimeError("El servidor no arrancó.")
+            await asyncio.sleep(0.05)
+
+@contextlib.contextmanager
+def lanzar_servidor(modelo, lote_maximo, espera_ms, carpeta, puerto):
+    # Socket Unix donde existe (menos sobrecarga que TCP); TCP en local en otro caso
+    if hasattr(socket, 'AF_UNIX'):
+        direccion = os.path.join(carpeta, f'kohonen_{lote_maximo}.sock')
+        opciones = ['--socket', direccion]
+    else:
+        direccion = f'http://127.0.0.1:{puerto}'
+        opciones = ['--puerto', str(puerto)]
+    proceso = subprocess.Popen(
+        [sys.executable, '-m', 'modelo_kohonen', 'serve', modelo, '--lote-maximo', str(lote_maximo),
+         '--espera-ms', str(espera_ms)] + opciones, cwd=RAIZ, stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(esperar_servidor(direccion, proceso))
+        yield direccion
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+def crear_modelo(ruta, entradas, neuronas, semilla):
+    red = RedKohonen(entradas, 'dura', 0.1, 1, columnas=neuronas, semilla=semilla)
+    red.preparar_normalizacion([np.random.default_rng(semilla).normal(size=(1000, entradas))], False)
+    guardar_modelo(red, ruta)
+
+def imprimir(resultado):
+    print(f"{resultado['lote_maximo']:>12} {resultado['peticiones']:>10} {resultado['peticiones_por_segundo']:>12.1f} "
+          f"{resultado['latencia_p50_ms']:>10.2f} {resultado['latencia_p99_ms']:>10.2f} "
+          f"{resultado['patrones_por_lote']:>12.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del servidor de inferencia")
+    parser.add_argument('--modelo', default=None, help="Carpeta del modelo (por defecto, uno sintético)")
+    parser.add_argument('--servidor', default=None,
+                        help="Probar un servidor ya en marcha (socket Unix o http://host:puerto)")
+    parser.add_argument('--entradas', type=int, default=64)
+    parser.add_argument('--neuronas', type=int, default=1024)
+    parser.add_argument('--clientes', type=int, default=64)
+    parser.add_argument('--peticiones', type=int, default=50, help="Peticiones por cliente")
+    parser.add_argument('--patrones-por-peticion', type=int, default=1)
+    parser.add_argument('--lotes-maximos', type=int, nargs='+', default=[1, 256])
+    parser.add_argument('--espera-ms', type=float, default=2.0)
+    parser.add_argument('--puerto', type=int, default=8765, help="Puerto TCP si no hay sockets Unix")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--salida', default=None, help="Guardar los resultados en JSON")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.semilla)
+    def generar_cuerpos(entradas):
+        return [[json.dumps({'patrones': rng.normal(size=(args.patrones_por_peticion, entradas)).tolist()}).encode()
+                 for _ in range(args.peticiones)] for _ in range(args.clientes)]
+
+    print(f"{args.clientes} clientes x {args.peticiones} peticiones de {args.patrones_por_peticion} patrones")
+    print(f"{'lote máximo':>12} {'peticiones':>10} {'peticiones/s':>12} {'p50 (ms)':>10} {'p99 (ms)':>10} "
+          f"{'patrones/lote':>12}")
+    resultados = []
+    if args.servidor:
+        salud = asyncio.run(consultar(args.servidor, 'GET', '/salud'))
+        resultados.append(asyncio.run(carga(args.servidor, generar_cuerpos(salud['entradas']))))
+        imprimir(resultados[-1])
+    else:
+        with tempfile.TemporaryDirectory() as carpeta:
+            modelo = args.modelo
+            if modelo is None:
+                modelo = os.path.join(carpeta, 'modelo')
+                crear_modelo(modelo, args.entradas, args.neuronas, args.semilla)
+            for lote_maximo in args.lotes_maximos:
+                with lanzar_servidor(modelo, lote_maximo, args.espera_ms, carpeta, args.puerto) as direccion:
+                    salud = asyncio.run(consultar(direccion, 'GET', '/salud'))
+                    resultados.append(asyncio.run(carga(direccion, generar_cuerpos(salud['entradas']))))
+                imprimir(resultados[-1])
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump({'parametros': vars(args), 'resultados': resultados}, archivo, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,376 @@
+# Punto de entrada por línea de comandos (sin interfaz gráfica). Uso desde la raíz del repositorio:
+#   python -m modelo_kohonen extract letras_organizadas/letraA -o entrenamiento_A.npy
+#   python -m modelo_kohonen index letras_organizadas -o indice_letras.npy --cache cache_letras.npz
+#   python -m modelo_kohonen split indice_letras.npy --entrenamiento entrenamiento.csv --prueba entrenamiento20.csv
+#   python -m modelo_kohonen train entrenamiento.csv -o modelo --competencia blanda --topologia hexagonal
+#   python -m modelo_kohonen simulate modelo entrenamiento20.csv
+#   python -m modelo_kohonen metrics modelo entrenamiento20.csv --salida metricas.json
+#   python -m modelo_kohonen serve modelo --socket /tmp/kohonen.sock
+#   python -m modelo_kohonen update modelo nuevas_muestras.csv --decaimiento 0.01
+#   python -m modelo_kohonen sweep entrenamiento.csv -o clasificacion.csv --epocas-poda 10 --guardar-mejor mejor
+#   python -m modelo_kohonen benchmark entrenamiento --salida resultados.json
+#   python -m modelo_kohonen gui
+# Cada subcomando importa solo lo que necesita (tkinter, matplotlib, pandas y PIL se cargan
+# únicamente en las etapas que los usan).
+import argparse
+import importlib
+import os
+
+BENCHMARKS = ('entrenamiento', 'indice_bmu', 'memoria', 'metricas', 'paralelo', 'precision', 'servidor')
+MOTORES = ('memoria', 'flujo', 'paralelo')
+
+def agregar_opciones_descriptores(parser, procesos=True):
+    from modelo_kohonen.configuraciones.extraccion import DESCRIPTORES, DESCRIPTORES_DEFECTO
+    parser.add_argument('--descriptores', nargs='+', choices=DESCRIPTORES, default=list(DESCRIPTORES_DEFECTO))
+    parser.add_argument('--lienzo', type=int, nargs=2, metavar=('ALTO', 'ANCHO'), default=None,
+                        help="Redimensionar todas las imágenes a este tamaño antes de extraer")
+    if procesos:
+        parser.add_argument('--procesos', type=int, default=None)
+
+def comando_extract(args, parser):
+    from modelo_kohonen.configuraciones.ensamblado import etiquetar
+    from modelo_kohonen.configuraciones.extraccion import guardar_caracteristicas, listar_imagenes
+    rutas = []
+    for entrada in args.entradas:
+        rutas.extend(sorted(listar_imagenes(entrada)) if os.path.isdir(entrada) else [entrada])
+    if not rutas:
+        parser.error("No se encontraron imágenes.")
+    cache = crear_cache(args.cache)
+    etiquetas = etiquetar(rutas, args.etiquetas)
+    guardar_caracteristicas(rutas, args.salida, etiquetas=etiquetas, procesos=args.procesos, cache=cache,
+                            descriptores=args.descriptores, lienzo=args.lienzo)
+
+def crear_cache(ruta):
+    if not ruta:
+        return None
+    from modelo_kohonen.configuraciones.cache_caracteristicas import CacheCaracteristicas
+    return CacheCaracteristicas(ruta)
+
+def comando_index(args, parser):
+    from modelo_kohonen.configuraciones.ensamblado import guardar_indice
+    try:
+        guardar_indice(args.entradas, args.salida, args.etiquetas, args.procesos, crear_cache(args.cache),
+                       args.descriptores, args.lienzo)
+    except ValueError as error:
+        parser.error(str(error))
+
+def comando_split(args, parser):
+    from modelo_kohonen.configuraciones.normalimage import procesar_imagenes_y_guardar
+    if not 0 < args.porcentaje < 1:
+        parser.error("--porcentaje debe estar entre 0 y 1.")
+    try:
+        procesar_imagenes_y_guardar(args.carpeta, args.entrenamiento, args.prueba, args.porcentaje, args.procesos,
+                                    descriptores=args.descriptores, lienzo=args.lienzo, semilla=args.semilla,
+                                    criterio=args.etiquetas, cache=crear_cache(args.cache),
+                                    minimo_prueba=args.minimo_prueba)
+    except ValueError as error:
+        parser.error(str(error))
+
+def crear_telemetria(red, ruta):
+    from modelo_kohonen.configuraciones.telemetria import ExportadorPrometheus, SumideroCSV, SumideroJSONL
+    if ruta.endswith('.csv'):
+        return red.activar_telemetria(SumideroCSV(ruta))
+    if ruta.endswith('.prom'):
+        return red.activar_telemetria(ExportadorPrometheus(ruta))
+    return red.activar_telemetria(SumideroJSONL(ruta))
+
+def comando_train(args, parser):
+    from modelo_kohonen.configuraciones.creacionred import RedKohonen
+    from modelo_kohonen.configuraciones.dataset_binario import cargar_dataset, fuente_csv, fuente_npy
+    from modelo_kohonen.configuraciones.modelo import cargar_modelo, guardar_modelo
+
+    if args.motor == 'flujo':
+        dataset, etiquetas = None, None  # Sin tabla de etiquetas: el dataset no se carga entero
+        fuente = fuente_npy(args.dataset) if args.dataset.endswith('.npy') else fuente_csv(args.dataset)
+        primer_chunk = next(iter(fuente()))
+        num_entradas = primer_chunk.shape[1] - ('Etiqueta' in getattr(primer_chunk, 'columns', ()))
+    else:
+        dataset, etiquetas = cargar_dataset(args.dataset)
+        num_entradas = dataset.shape[1]
+
+    if args.continuar:
+        red = cargar_modelo(args.salida)
+        if red.num_entradas != num_entradas:
+            parser.error(f"El modelo espera {red.num_entradas} entradas y el dataset tiene {num_entradas}.")
+        if args.iteraciones is not None:
+            red.num_iteraciones = args.iteraciones
+    else:
+        red = RedKohonen(num_entradas, args.competencia, args.tasa, args.iteraciones or 100,
+                         topologia=args.topologia, filas=args.filas, columnas=args.columnas,
+                         semilla=args.semilla, dtype=args.dtype)
+    red.configurar_parada(paciencia=args.paciencia, mejora_minima=args.mejora_minima,
+                          restaurar_mejor=args.restaurar_mejor)
+    if args.checkpoint_epocas or args.checkpoint_segundos:
+        red.configurar_checkpoints(args.salida, args.checkpoint_epocas, args.checkpoint_segundos)
+    if args.telemetria:
+        crear_telemetria(red, args.telemetria)
+
+    try:
+        if args.motor == 'flujo':
+            red.entrenar_flujo(fuente, modo=args.modo if args.modo != 'online' else 'minibatch',
+                               batch_size=args.batch_size, mostrar_graficos=args.graficos, continuar=args.continuar)
+        elif args.motor == 'paralelo':
+            red.entrenar_paralelo(dataset, procesos=args.procesos, batch_size=args.batch_size,
+                                  mostrar_graficos=args.graficos, continuar=args.continuar)
+        else:
+            red.entrenar(dataset, modo=args.modo, batch_size=args.batch_size, mostrar_graficos=args.graficos,
+                         continuar=args.continuar)
+    finally:
+        red.desactivar_telemetria()
+
+    # Con un dataset etiquetado se guarda también la tabla neurona -> etiqueta
+    if etiquetas is not None:
+        red.etiquetar_neuronas(dataset, etiquetas)
+        print(f"Neuronas etiquetadas con {len(red.clases)} etiquetas "
+              f"(confianza media {red.confianza_neurona[red.conteos_etiquetas.sum(axis=1) > 0].mean():.2f})")
+    guardar_modelo(red, args.salida)
+    print(f"Modelo guardado en {args.salida} (iteración {red.iteracion_actual}, mejor DM: {red.mejor_dm:.6f})")
+
+def mapa(texto):
+    filas, _, columnas = texto.lower().partition('x')
+    try:
+        return int(filas), int(columnas)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Mapa no válido: {texto} (usa FILASxCOLUMNAS, p. ej. 6x6)")
+
+def comando_sweep(args, parser):
+    from modelo_kohonen.configuraciones.barrido import (barrido, configuraciones_aleatorias,
+                                                        configuraciones_rejilla, guardar_clasificacion)
+    from modelo_kohonen.configuraciones.dataset_binario import cargar_dataset
+    from modelo_kohonen.configuraciones.modelo import guardar_modelo
+
+    espacio = {
+        'tasa_aprendizaje': args.tasas,
+        'num_iteraciones': args.iteraciones,
+        'tipo_competencia': args.competencias,
+        'mapa': args.mapas,
+        'topologia': args.topologias,
+        'modo': args.modos,
+    }
+    if args.aleatorias:
+        configuraciones = configuraciones_aleatorias(espacio, args.aleatorias, args.semilla)
+    else:
+        configuraciones = configuraciones_rejilla(espacio)
+    dataset, _ = cargar_dataset(args.dataset)
+
+    def mostrar(resultado):
+        configuracion = resultado['configuracion']
+        print(f"{resultado['estado']:>10} época {resultado['red'].iteracion_actual:>4} "
+              f"DM {resultado['red'].dm_values[-1]:.6f} {resultado['segundos']:>7.2f} s  {configuracion}")
+
+    print(f"{len(configuraciones)} configuraciones sobre {dataset.shape[0]} patrones x {dataset.shape[1]} entradas")
+    clasificacion, mejor_red = barrido(dataset, configuraciones, procesos=args.procesos, epocas_poda=args.epocas_poda,
+                                       supervivientes=args.supervivientes, batch_size=args.batch_size,
+                                       semilla=args.semilla, dtype=args.dtype, callback=mostrar)
+    guardar_clasificacion(clasificacion, args.salida)
+    mejor = clasificacion[0]
+    print(f"Clasificación guardada en {args.salida}. Mejor: DM {mejor['dm']:.6f}, "
+          f"error de cuantización {mejor['error_cuantizacion']:.6f}")
+    if args.guardar_mejor:
+        guardar_modelo(mejor_red, args.guardar_mejor)
+        print(f"Mejor modelo guardado en {args.guardar_mejor}")
+
+def comando_simulate(args, parser):
+    from modelo_kohonen.simulacion.simular_cli import ejecutar
+    ejecutar(args, parser)
+
+def comando_metrics(args, parser):
+    import json
+    from modelo_kohonen.configuraciones.dataset_binario import cargar_dataset
+    from modelo_kohonen.configuraciones.metricas import informe_metricas
+    from modelo_kohonen.configuraciones.modelo import cargar_modelo
+    red = cargar_modelo(args.modelo)
+    datos, _ = cargar_dataset(args.datos)
+    if datos.shape[1] != red.num_entradas:
+        parser.error(f"El modelo espera {red.num_entradas} entradas y el dataset tiene {datos.shape[1]}.")
+    metricas = red.metricas(datos)
+    print(informe_metricas(metricas, red.filas, red.columnas))
+    if args.salida:
+        # Aciertos y matriz U con la forma del mapa (filas x columnas)
+        resultado = dict(metricas, filas=red.filas, columnas=red.columnas,
+                         aciertos=metricas['aciertos'].reshape(red.filas, red.columnas).tolist(),
+                         matriz_u=metricas['matriz_u'].reshape(red.filas, red.columnas).tolist())
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(resultado, archivo, indent=2)
+        print(f"Métricas guardadas en {args.salida}")
+
+def comando_serve(args, parser):
+    from modelo_kohonen.configuraciones.modelo import cargar_modelo
+    from modelo_kohonen.simulacion.servidor import servir
+    if args.lote_maximo < 1:
+        parser.error("--lote-maximo debe ser al menos 1.")
+    red = cargar_modelo(args.modelo)
+    if args.aprendizaje:
+        red.configurar_incremental(tasa=args.tasa, decaimiento=args.decaimiento, radio=args.radio)
+    servir(red, host=args.host, puerto=args.puerto, socket=args.socket,
+           descriptores=args.descriptores, lienzo=args.lienzo, lote_maximo=args.lote_maximo,
+           espera_maxima=args.espera_ms / 1000, aprendizaje=args.aprendizaje)
+
+def agregar_opciones_incrementales(parser):
+    parser.add_argument('--tasa', type=float, default=None,
+                        help="Tasa de aprendizaje incremental (por defecto, la final del entrenamiento)")
+    parser.add_argument('--decaimiento', type=float, default=0.0,
+                        help="La tasa es tasa / (1 + decaimiento * patrones absorbidos); 0 = constante")
+    parser.add_argument('--radio', type=float, default=None,
+                        help="Radio de vecindad (por defecto, el de la última época entrenada)")
+
+def comando_update(args, parser):
+    from modelo_kohonen.configuraciones.dataset_binario import cargar_dataset
+    from modelo_kohonen.configuraciones.modelo import cargar_modelo, guardar_modelo
+    red = cargar_modelo(args.modelo)
+    datos, etiquetas = cargar_dataset(args.datos)
+    if datos.shape[1] != red.num_entradas:
+        parser.error(f"El modelo espera {red.num_entradas} entradas y el dataset tiene {datos.shape[1]}.")
+    red.configurar_incremental(tasa=args.tasa, decaimiento=args.decaimiento, radio=args.radio, modo=args.modo)
+    # Lotes pequeños en el orden del archivo, como llegarían en producción
+    suma_distancias = 0.0
+    for inicio in range(0, len(datos), args.lote):
+        fin = inicio + args.lote
+        _, distancias = red.ajustar_parcial(datos[inicio:fin], None if etiquetas is None else etiquetas[inicio:fin])
+        suma_distancias += float(distancias.sum())
+    guardar_modelo(red, args.modelo)
+    print(f"{len(datos)} patrones absorbidos (distancia media antes de cada ajuste: {suma_distancias / len(datos):.6f}); "
+          f"{red.patrones_incrementales} en total. Modelo guardado en {args.modelo}")
+
+def comando_benchmark(args, parser):
+    modulo = importlib.import_module(f"modelo_kohonen.benchmarks.bench_{args.nombre}")
+    modulo.main(args.argumentos)
+
+def comando_gui(args, parser):
+    from modelo_kohonen.mainkohonen import main
+    main()
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog='python -m modelo_kohonen', description="Red de Kohonen sin interfaz gráfica")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    from modelo_kohonen.configuraciones.ensamblado import CRITERIOS_ETIQUETA
+    extract = subparsers.add_parser('extract', help="Extraer características de imágenes a CSV o .npy")
+    extract.add_argument('entradas', nargs='+', help="Carpetas o archivos de imagen")
+    extract.add_argument('-o', '--salida', required=True, help="Archivo .csv o .npy de salida")
+    extract.add_argument('--cache', default=None, help="Caché incremental de características (.npz)")
+    extract.add_argument('--etiquetas', choices=CRITERIOS_ETIQUETA, default='nombre',
+                         help="Etiqueta por la primera letra del archivo o por la carpeta")
+    agregar_opciones_descriptores(extract)
+    extract.set_defaults(funcion=comando_extract)
+
+    index = subparsers.add_parser('index', help="Construir un índice (ruta, etiqueta, características) de imágenes")
+    index.add_argument('entradas', nargs='+', help="Carpetas (con subcarpetas) o archivos de imagen")
+    index.add_argument('-o', '--salida', required=True, help="Índice .npy (con .etiquetas.txt y .rutas.txt)")
+    index.add_argument('--etiquetas', choices=CRITERIOS_ETIQUETA, default='nombre',
+                       help="Etiqueta por la primera letra del archivo o por la carpeta")
+    index.add_argument('--cache', default=None, help="Caché incremental de características (.npz)")
+    agregar_opciones_descriptores(index)
+    index.set_defaults(funcion=comando_index)
+
+    split = subparsers.add_parser('split', help="Dividir imágenes o un índice en entrenamiento y prueba (estratificado)")
+    split.add_argument('carpeta', help="Carpeta de imágenes o índice .npy")
+    split.add_argument('--entrenamiento', default='entrenamiento.csv')
+    split.add_argument('--prueba', default='entrenamiento20.csv')
+    split.add_argument('--porcentaje', type=float, default=0.8)
+    split.add_argument('--semilla', type=int, default=None)
+    split.add_argument('--minimo-prueba', type=int, default=1, help="Patrones de prueba mínimos por etiqueta")
+    split.add_argument('--etiquetas', choices=CRITERIOS_ETIQUETA, default='nombre')
+    split.add_argument('--cache', default=None, help="Caché incremental de características (.npz)")
+    agregar_opciones_descriptores(split)
+    split.set_defaults(funcion=comando_split)
+
+    from modelo_kohonen.configuraciones.creacionred import MODOS_ENTRENAMIENTO, TIPOS_PESOS, TOPOLOGIAS
+    train = subparsers.add_parser('train', help="Entrenar una red y guardar el modelo")
+    train.add_argument('dataset', help="CSV o .npy con un patrón por fila")
+    train.add_argument('-o', '--salida', required=True, help="Carpeta del modelo")
+    train.add_argument('--competencia', choices=['dura', 'blanda'], default='dura')
+    train.add_argument('--tasa', type=float, default=0.1)
+    train.add_argument('--iteraciones', type=int, default=None, help="Épocas (por defecto 100)")
+    train.add_argument('--topologia', choices=TOPOLOGIAS, default='lineal')
+    train.add_argument('--filas', type=int, default=None)
+    train.add_argument('--columnas', type=int, default=None)
+    train.add_argument('--modo', choices=MODOS_ENTRENAMIENTO, default='online')
+    train.add_argument('--motor', choices=MOTORES, default='memoria',
+                       help="memoria, flujo (fuera de memoria por chunks) o paralelo (procesos)")
+    train.add_argument('--batch-size', type=int, default=256)
+    train.add_argument('--procesos', type=int, default=None)
+    train.add_argument('--dtype', choices=TIPOS_PESOS, default='float32')
+    train.add_argument('--semilla', type=int, default=None)
+    train.add_argument('--paciencia', type=int, default=None)
+    train.add_argument('--mejora-minima', type=float, default=0.0)
+    train.add_argument('--restaurar-mejor', action='store_true')
+    train.add_argument('--checkpoint-epocas', type=int, default=None)
+    train.add_argument('--checkpoint-segundos', type=float, default=None)
+    train.add_argument('--continuar', action='store_true', help="Reanudar el modelo guardado en --salida")
+    train.add_argument('--telemetria', default=None, help="Métricas por época en .csv, .jsonl o .prom")
+    train.add_argument('--graficos', action='store_true', help="Mostrar los gráficos de matplotlib")
+    train.set_defaults(funcion=comando_train)
+
+    from modelo_kohonen.configuraciones.barrido import ESPACIO_DEFECTO
+    sweep = subparsers.add_parser('sweep', help="Barrido de hiperparámetros en paralelo con poda temprana")
+    sweep.add_argument('dataset', help="CSV o .npy con un patrón por fila")
+    sweep.add_argument('-o', '--salida', default='clasificacion.csv', help="Clasificación en .csv o .json")
+    sweep.add_argument('--tasas', type=float, nargs='+', default=ESPACIO_DEFECTO['tasa_aprendizaje'])
+    sweep.add_argument('--iteraciones', type=int, nargs='+', default=ESPACIO_DEFECTO['num_iteraciones'])
+    sweep.add_argument('--competencias', nargs='+', choices=['dura', 'blanda'],
+                       default=ESPACIO_DEFECTO['tipo_competencia'])
+    sweep.add_argument('--mapas', type=mapa, nargs='+', default=ESPACIO_DEFECTO['mapa'], help="p. ej. 4x4 6x6")
+    sweep.add_argument('--topologias', nargs='+', choices=TOPOLOGIAS, default=ESPACIO_DEFECTO['topologia'])
+    sweep.add_argument('--modos', nargs='+', choices=MODOS_ENTRENAMIENTO, default=ESPACIO_DEFECTO['modo'])
+    sweep.add_argument('--aleatorias', type=int, default=None,
+                       help="Búsqueda aleatoria: N configuraciones de la rejilla (por defecto, la rejilla completa)")
+    sweep.add_argument('--epocas-poda', type=int, nargs='+', default=None,
+                       help="Épocas tras las que se descartan las configuraciones con peor DM")
+    sweep.add_argument('--supervivientes', type=float, default=0.5, help="Fracción que sigue tras cada poda")
+    sweep.add_argument('--procesos', type=int, default=None)
+    sweep.add_argument('--batch-size', type=int, default=256)
+    sweep.add_argument('--dtype', choices=TIPOS_PESOS, default='float32')
+    sweep.add_argument('--semilla', type=int, default=0)
+    sweep.add_argument('--guardar-mejor', default=None, help="Carpeta donde guardar el mejor modelo")
+    sweep.set_defaults(funcion=comando_sweep)
+
+    from modelo_kohonen.simulacion.simular_cli import agregar_argumentos
+    simulate = subparsers.add_parser('simulate', help="Simular un modelo o unos pesos sobre un dataset")
+    agregar_argumentos(simulate)
+    simulate.set_defaults(funcion=comando_simulate)
+
+    metrics = subparsers.add_parser('metrics', help="Métricas de calidad de un modelo: errores, aciertos y matriz U")
+    metrics.add_argument('modelo', help="Carpeta del modelo")
+    metrics.add_argument('datos', help="CSV o .npy con los patrones")
+    metrics.add_argument('--salida', default=None, help="Guardar las métricas en JSON")
+    metrics.set_defaults(funcion=comando_metrics)
+
+    serve = subparsers.add_parser('serve', help="Servir un modelo por HTTP (TCP o socket Unix)")
+    serve.add_argument('modelo', help="Carpeta del modelo")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--puerto', type=int, default=8080)
+    serve.add_argument('--socket', default=None, help="Escuchar en este socket Unix en lugar de TCP")
+    serve.add_argument('--lote-maximo', type=int, default=256, help="Patrones por micro-lote")
+    serve.add_argument('--espera-ms', type=float, default=2.0,
+                       help="Espera máxima para completar un micro-lote (0 agrupa solo lo ya recibido)")
+    serve.add_argument('--aprendizaje', action='store_true',
+                       help="Habilitar POST /ajustar (aprendizaje incremental mientras se sirve)")
+    agregar_opciones_incrementales(serve)
+    agregar_opciones_descriptores(serve, procesos=False)
+    serve.set_defaults(funcion=comando_serve)
+
+    update = subparsers.add_parser('update', help="Absorber nuevos patrones en un modelo (aprendizaje incremental)")
+    update.add_argument('modelo', help="Carpeta del modelo (se reescribe)")
+    update.add_argument('datos', help="CSV o .npy con los patrones nuevos (y sus etiquetas, si las tiene)")
+    update.add_argument('--modo', choices=['online', 'minibatch'], default='online')
+    update.add_argument('--lote', type=int, default=32, help="Patrones por llamada a ajustar_parcial")
+    agregar_opciones_incrementales(update)
+    update.set_defaults(funcion=comando_update)
+
+    benchmark = subparsers.add_parser('benchmark', help="Ejecutar uno de los benchmarks")
+    benchmark.add_argument('nombre', choices=BENCHMARKS)
+    benchmark.add_argument('argumentos', nargs=argparse.REMAINDER, help="Argumentos del benchmark")
+    benchmark.set_defaults(funcion=comando_benchmark)
+
+    gui = subparsers.add_parser('gui', help="Abrir la interfaz gráfica")
+    gui.set_defaults(funcion=comando_gui)
+    return parser
+
+def main(argv=None):
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    args.funcion(args, parser)
+
+if __name__ == '__main__':
+    main()
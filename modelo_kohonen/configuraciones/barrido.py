@@ -0,0 +1,158 @@
+import contextlib
+import csv
+import io
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from modelo_kohonen.configuraciones.creacionred import RedKohonen, TAMANO_BLOQUE_LECTURA, estadisticas_normalizacion
+from modelo_kohonen.configuraciones.memoria_compartida import ESTADO_PROCESO, MemoriaCompartida, inicializar_proceso
+from modelo_kohonen.configuraciones.metricas import metricas_mapa
+
+# Barrido de hiperparámetros: entrena muchas configuraciones de RedKohonen en un pool de procesos.
+# El dataset se carga una sola vez (memoria compartida, o el .npy mapeado si ya está en disco) y
+# la normalización se calcula una vez para todas. Todas las configuraciones usan la misma semilla,
+# así que dos configuraciones con el mismo mapa parten de los mismos pesos.
+# Poda: tras cada época de 'epocas_poda' solo sigue la fracción 'supervivientes' de configuraciones
+# con menor DM (halving sucesivo); el resto queda en la clasificación como 'podada'.
+
+# Espacio de búsqueda por defecto: listas de valores por parámetro ('mapa' = (filas, columnas))
+ESPACIO_DEFECTO = {
+    'tasa_aprendizaje': [0.05, 0.1, 0.3],
+    'num_iteraciones': [50, 100],
+    'tipo_competencia': ['dura', 'blanda'],
+    'mapa': [(4, 4), (6, 6), (8, 8)],
+    'topologia': ['rectangular'],
+    'modo': ['batch'],
+}
+COLUMNAS_CLASIFICACION = ('puesto', 'estado', 'dm', 'mejor_dm', 'error_cuantizacion', 'error_topografico',
+                          'segundos', 'epocas', 'tasa_aprendizaje', 'num_iteraciones', 'tipo_competencia',
+                          'filas', 'columnas', 'topologia', 'modo')
+
+def configuraciones_rejilla(espacio):
+    nombres = list(espacio)
+    return [dict(zip(nombres, valores)) for valores in itertools.product(*(espacio[n] for n in nombres))]
+
+def configuraciones_aleatorias(espacio, cantidad, semilla=None):
+    # Muestra sin repetición de la rejilla completa
+    rejilla = configuraciones_rejilla(espacio)
+    indices = np.random.default_rng(semilla).permutation(len(rejilla))[:cantidad]
+    return [rejilla[i] for i in sorted(indices)]
+
+def crear_red(configuracion, estado):
+    filas, columnas = configuracion['mapa']
+    red = RedKohonen(estado['datos'].shape[1], configuracion['tipo_competencia'], configuracion['tasa_aprendizaje'],
+                     configuracion['num_iteraciones'], topologia=configuracion['topologia'], filas=filas,
+                     columnas=columnas, semilla=estado['semilla'], dtype=estado['dtype'])
+    red.media = estado['media']
+    red.desviacion = estado['desviacion']
+    return red
+
+def errores_mapa(red, datos):
+    # Error de cuantización (distancia media a la vencedora) y topográfico con los pesos finales
+    metricas = metricas_mapa(red, datos, TAMANO_BLOQUE_LECTURA)
+    return metricas['error_cuantizacion'], metricas['error_topografico']
+
+def entrenar_configuracion(tarea):
+    # Entrena una configuración hasta la época 'hasta' (o hasta el final si es None). 'red' es
+    # None en la primera ronda; en las siguientes es la red devuelta por la ronda anterior
+    indice, configuracion, red, hasta = tarea
+    estado = ESTADO_PROCESO
+    inicio = time.perf_counter()
+    if red is None:
+        red = crear_red(configuracion, estado)
+    with contextlib.redirect_stdout(io.StringIO()):  # Silenciar los mensajes del entrenamiento
+        red.entrenar(estado['datos'], modo=configuracion['modo'], batch_size=estado['batch_size'],
+                     mostrar_graficos=False, continuar=True, hasta=hasta)
+    terminada = hasta is None or red.iteracion_actual < hasta or red.iteracion_actual >= red.num_iteraciones
+    metricas = errores_mapa(red, estado['datos']) if terminada else None
+    return indice, red, terminada, metricas, time.perf_counter() - inicio
+
+def barrido(dataset, configuraciones, procesos=None, epocas_poda=None, supervivientes=0.5, batch_size=256,
+            semilla=0, dtype='float32', callback=None):
+    # Devuelve la clasificación (lista de diccionarios ordenada de mejor a peor) y la mejor red.
+    # epocas_poda: épocas tras las que se poda (un entero o una lista creciente de épocas)
+    procesos = procesos or os.cpu_count() or 1
+    if not isinstance(dataset, np.memmap):
+        dataset = np.asarray(dataset)
+    if epocas_poda is None:
+        epocas_poda = []
+    elif isinstance(epocas_poda, int):
+        epocas_poda = [epocas_poda]
+    media, desviacion = estadisticas_normalizacion(
+        dataset[inicio:inicio + TAMANO_BLOQUE_LECTURA] for inicio in range(0, len(dataset), TAMANO_BLOQUE_LECTURA))
+
+    resultados = [{'configuracion': configuracion, 'red': None, 'estado': 'pendiente', 'segundos': 0.0,
+                   'metricas': None} for configuracion in configuraciones]
+    with MemoriaCompartida() as compartida:
+        compartida.publicar_dataset('datos', dataset)
+        parametros = {'media': float(media), 'desviacion': float(desviacion), 'batch_size': batch_size,
+                      'semilla': semilla, 'dtype': dtype}
+
+        with ProcessPoolExecutor(max_workers=procesos, initializer=inicializar_proceso,
+                                 initargs=(compartida.descripciones, parametros)) as pool:
+            # Una ronda por época de poda y una última hasta el final de cada configuración
+            for hasta in list(epocas_poda) + [None]:
+                activos = [i for i, resultado in enumerate(resultados) if resultado['estado'] == 'pendiente']
+                if not activos:
+                    break
+                tareas = [(i, resultados[i]['configuracion'], resultados[i]['red'], hasta) for i in activos]
+                for indice, red, terminada, metricas, segundos in pool.map(entrenar_configuracion, tareas):
+                    resultado = resultados[indice]
+                    resultado.update(red=red, metricas=metricas)
+                    resultado['segundos'] += segundos
+                    if terminada:
+                        resultado['estado'] = 'completa'
+                    if callback:
+                        callback(resultado)
+                if hasta is None:
+                    break
+
+                # Podar: de las que siguen pendientes, solo continúan las de menor DM
+                pendientes = sorted((i for i in activos if resultados[i]['estado'] == 'pendiente'),
+                                    key=lambda i: resultados[i]['red'].dm_values[-1])
+                conservar = math.ceil(len(pendientes) * supervivientes)
+                for i in pendientes[conservar:]:
+                    resultados[i]['estado'] = 'podada'
+
+    # Primero las completas por error de cuantización final; después las podadas por su DM
+    clasificacion = sorted(resultados, key=lambda r: (r['estado'] != 'completa',
+                                                      r['metricas'][0] if r['metricas'] else r['red'].dm_values[-1]))
+    mejor_red = clasificacion[0]['red'] if clasificacion else None
+    return [fila_clasificacion(puesto, r) for puesto, r in enumerate(clasificacion, start=1)], mejor_red
+
+def fila_clasificacion(puesto, resultado):
+    configuracion = resultado['configuracion']
+    red = resultado['red']
+    error_cuantizacion, error_topografico = resultado['metricas'] or (None, None)
+    return {
+        'puesto': puesto,
+        'estado': resultado['estado'],
+        'dm': float(red.dm_values[-1]),  # DM de la última época entrenada
+        'mejor_dm': float(red.mejor_dm),
+        'error_cuantizacion': error_cuantizacion,  # Con los pesos finales (solo configuraciones completas)
+        'error_topografico': error_topografico,
+        'segundos': resultado['segundos'],
+        'epocas': red.iteracion_actual,
+        'tasa_aprendizaje': configuracion['tasa_aprendizaje'],
+        'num_iteraciones': configuracion['num_iteraciones'],
+        'tipo_competencia': configuracion['tipo_competencia'],
+        'filas': configuracion['mapa'][0],
+        'columnas': configuracion['mapa'][1],
+        'topologia': configuracion['topologia'],
+        'modo': configuracion['modo'],
+    }
+
+def guardar_clasificacion(clasificacion, ruta):
+    # CSV o JSON según la extensión
+    if ruta.endswith('.json'):
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(clasificacion, archivo, indent=2)
+        return
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=COLUMNAS_CLASIFICACION)
+        escritor.writeheader()
+        escritor.writerows(clasificacion)
@@ -0,0 +1,101 @@
+import hashlib
+import os
+import numpy as np
+from modelo_kohonen.configuraciones.extraccion import (DTYPE_CARACTERISTICAS, DESCRIPTORES_DEFECTO, apilar, clave_descriptores,
+                                        extraer_caracteristicas)
+
+# Caché persistente de características por imagen. Cada entrada se identifica por la ruta
+# absoluta y se valida con mtime + tamaño del archivo (o con un hash del contenido), de modo
+# que solo se vuelven a decodificar las imágenes nuevas o modificadas. Cada entrada guarda
+# también la configuración de descriptores con la que se extrajo.
+class CacheCaracteristicas:
+    def __init__(self, ruta_cache, usar_hash=False):
+        self.ruta_cache = ruta_cache
+        self.usar_hash = usar_hash
+        self.entradas = {}  # ruta -> (mtime_ns, tamaño, hash, clave de descriptores, características)
+        self.modificada = False
+        if os.path.exists(ruta_cache):
+            self.cargar()
+
+    def cargar(self):
+        with np.load(self.ruta_cache, allow_pickle=False) as datos:
+            # Las características se guardan concatenadas con sus desplazamientos (ancho variable)
+            desplazamientos = datos['desplazamientos']
+            valores = datos['valores']
+            # Las cachés anteriores a las claves solo tenían sumas por columna
+            claves = datos['claves'] if 'claves' in datos else [clave_descriptores()] * len(datos['rutas'])
+            for i, ruta in enumerate(datos['rutas']):
+                caracteristicas = valores[desplazamientos[i]:desplazamientos[i + 1]]
+                self.entradas[str(ruta)] = (int(datos['mtimes'][i]), int(datos['tamanos'][i]),
+                                            str(datos['hashes'][i]), str(claves[i]), caracteristicas)
+
+    def guardar(self):
+        if not self.modificada:
+            return
+        rutas = list(self.entradas)
+        caracteristicas = [self.entradas[ruta][4] for ruta in rutas]
+        desplazamientos = np.zeros(len(rutas) + 1, dtype=np.int64)
+        desplazamientos[1:] = np.cumsum([len(c) for c in caracteristicas])
+        valores = np.concatenate(caracteristicas) if caracteristicas else np.zeros(0, DTYPE_CARACTERISTICAS)
+
+        # Escritura atómica: se escribe a un temporal y se reemplaza el archivo
+        temporal = self.ruta_cache + '.tmp.npz'
+        np.savez(temporal,
+                 rutas=np.array(rutas, dtype=str),
+                 mtimes=np.array([self.entradas[r][0] for r in rutas], dtype=np.int64),
+                 tamanos=np.array([self.entradas[r][1] for r in rutas], dtype=np.int64),
+                 hashes=np.array([self.entradas[r][2] for r in rutas], dtype=str),
+                 claves=np.array([self.entradas[r][3] for r in rutas], dtype=str),
+                 desplazamientos=desplazamientos,
+                 valores=valores.astype(DTYPE_CARACTERISTICAS))
+        os.replace(temporal, self.ruta_cache)
+        self.modificada = False
+
+    def firma(self, ruta):
+        estado = os.stat(ruta)
+        contenido = ''
+        if self.usar_hash:
+            with open(ruta, 'rb') as archivo:
+                contenido = hashlib.sha1(archivo.read()).hexdigest()
+        return estado.st_mtime_ns, estado.st_size, contenido
+
+    def vigente(self, entrada, firma, clave):
+        if entrada is None or entrada[3] != clave:
+            return False
+        if self.usar_hash:
+            return entrada[2] == firma[2]  # Con hash basta con que el contenido coincida
+        return entrada[:2] == firma[:2]
+
+    # Igual que extraccion.extraer_caracteristicas, pero solo decodifica las imágenes
+    # que no están en la caché o que han cambiado. Todas las pendientes se extraen en una
+    # sola pasada (un único pool de procesos), a medida que cada bloque de salida las necesita
+    def extraer_caracteristicas(self, rutas, procesos=None, tamano_bloque=256, descriptores=DESCRIPTORES_DEFECTO,
+                                lienzo=None):
+        clave = clave_descriptores(descriptores, lienzo)
+        rutas = [os.path.abspath(ruta) for ruta in rutas]
+        firmas = [self.firma(ruta) for ruta in rutas]
+        pendientes = [i for i, ruta in enumerate(rutas) if not self.vigente(self.entradas.get(ruta), firmas[i], clave)]
+        lotes = extraer_caracteristicas([rutas[i] for i in pendientes], procesos, tamano_bloque, descriptores, lienzo)
+        nuevas = (caracteristicas for lote in lotes for caracteristicas in lote)
+
+        siguiente = 0  # Posición en 'pendientes' de la próxima imagen por extraer
+        try:
+            for inicio in range(0, len(rutas), tamano_bloque):
+                fin = inicio + tamano_bloque
+                while siguiente < len(pendientes) and pendientes[siguiente] < fin:
+                    i = pendientes[siguiente]
+                    self.entradas[rutas[i]] = firmas[i] + (clave, next(nuevas))
+                    self.modificada = True
+                    siguiente += 1
+                yield apilar([self.entradas[ruta][4] for ruta in rutas[inicio:fin]])
+        finally:
+            lotes.close()  # Cierra el pool de procesos aunque no se consuman todos los bloques
+
+    # Elimina las entradas de imágenes que ya no existen
+    def purgar(self):
+        borradas = [ruta for ruta in self.entradas if not os.path.exists(ruta)]
+        for ruta in borradas:
+            del self.entradas[ruta]
+        if borradas:
+            self.modificada = True
+        return len(borradas)
@@ -0,0 +1,67 @@
+import numpy as np
+
+# Clasificación con un mapa entrenado: se cuentan las etiquetas de los patrones que gana cada
+# neurona y cada neurona se queda con la etiqueta mayoritaria (y la fracción de aciertos como
+# confianza). Clasificar un patrón es entonces buscar su vencedora y consultar la tabla.
+
+# Códigos enteros de las etiquetas. Con 'clases' (en cualquier orden) las etiquetas desconocidas valen -1
+def codificar(etiquetas, clases=None):
+    etiquetas = np.asarray(etiquetas).astype(str)
+    if clases is None:
+        clases, codigos = np.unique(etiquetas, return_inverse=True)
+        return clases, codigos.ravel()
+    clases = np.asarray(clases).astype(str)
+    if len(clases) == 0:
+        return clases, np.full(len(etiquetas), -1)
+    orden = np.argsort(clases)
+    posiciones = np.minimum(np.searchsorted(clases, etiquetas, sorter=orden), len(clases) - 1)
+    codigos = orden[posiciones]
+    codigos[clases[codigos] != etiquetas] = -1
+    return clases, codigos
+
+# Matriz (neuronas x clases) con cuántos patrones de cada clase gana cada neurona
+def conteos_por_neurona(vencedoras, codigos, num_neuronas, num_clases):
+    return np.bincount(vencedoras * num_clases + codigos, minlength=num_neuronas * num_clases).reshape(
+        num_neuronas, num_clases)
+
+# Etiqueta mayoritaria (código) y confianza de cada neurona. Las neuronas que no ganaron ningún
+# patrón toman la etiqueta de la neurona con aciertos más cercana en la rejilla, con confianza 0.
+# 'distancias_entre(origen, destino)' devuelve la submatriz de distancias en la rejilla
+def tabla_etiquetas(conteos, distancias_entre):
+    totales = conteos.sum(axis=1)
+    mayoritarias = conteos.argmax(axis=1)
+    confianzas = np.divide(conteos.max(axis=1), totales, out=np.zeros(len(totales)), where=totales > 0)
+    con_aciertos = np.flatnonzero(totales)
+    sin_aciertos = np.flatnonzero(totales == 0)
+    if len(con_aciertos) and len(sin_aciertos):
+        cercanas = np.argmin(distancias_entre(sin_aciertos, con_aciertos), axis=1)
+        mayoritarias[sin_aciertos] = mayoritarias[con_aciertos[cercanas]]
+    return mayoritarias, confianzas
+
+# Matriz de confusión (clases reales x clases predichas); los códigos -1 (desconocidos) se ignoran
+def matriz_confusion(reales, predichas, num_clases):
+    validas = (reales >= 0) & (predichas >= 0)
+    return np.bincount(reales[validas] * num_clases + predichas[validas],
+                       minlength=num_clases * num_clases).reshape(num_clases, num_clases)
+
+def informe_confusion(matriz, clases):
+    total = matriz.sum()
+    aciertos = np.trace(matriz)
+    reales = matriz.sum(axis=1)
+    predichas = matriz.sum(axis=0)
+    precision = np.divide(np.diag(matriz), predichas, out=np.zeros(len(clases)), where=predichas > 0)
+    exhaustividad = np.divide(np.diag(matriz), reales, out=np.zeros(len(clases)), where=reales > 0)
+
+    ancho = max(6, max(len(str(clase)) for clase in clases) + 1)
+    lineas = ["Matriz de confusión (filas: etiqueta real, columnas: predicha)",
+              f"{'':>{ancho}}" + ''.join(f"{clase:>{ancho}}" for clase in clases)]
+    for clase, fila in zip(clases, matriz):
+        lineas.append(f"{clase:>{ancho}}" + ''.join(f"{valor:>{ancho}}" for valor in fila))
+    lineas.append("")
+    ancho = max(ancho, len('Etiqueta'))
+    lineas.append(f"{'Etiqueta':>{ancho}} {'Precisión':>10} {'Exhaustividad':>14} {'Patrones':>9}")
+    for i, clase in enumerate(clases):
+        lineas.append(f"{clase:>{ancho}} {precision[i]:>10.3f} {exhaustividad[i]:>14.3f} {reales[i]:>9}")
+    lineas.append("")
+    lineas.append(f"Exactitud: {aciertos}/{total} ({aciertos / total if total else 0.0:.3f})")
+    return "\n".join(lineas)
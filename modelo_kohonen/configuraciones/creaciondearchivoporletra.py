@@ -1,62 +1,52 @@
-from PIL import Image
-import numpy as np
 import os
-import pandas as pd
-
-# Función para procesar una imagen y devolver la suma de sus columnas
-def procesar_imagen(filepath):
-    # Abrir la imagen en escala de grises
-    img = Image.open(filepath).convert('L')
-    # Convertir la imagen a un array numpy
-    img_array = np.array(img)
-
-    # Binarizar la imagen (0 para blanco, 1 para negro)
-    binarizada = (img_array < 128).astype(int)
-
-    # Sumar las columnas
-    sumas_columnas = binarizada.sum(axis=0)
-    return sumas_columnas
+import sys
+from modelo_kohonen.configuraciones.extraccion import DESCRIPTORES_DEFECTO, listar_imagenes, guardar_caracteristicas
+from modelo_kohonen.configuraciones.cache_caracteristicas import CacheCaracteristicas
+from modelo_kohonen.configuraciones.ensamblado import etiquetar
 
 # Función para procesar imágenes en una carpeta y guardar en un archivo CSV
-def procesar_imagenes_y_guardar(carpeta_letra, output_filepath):
-    datos_imagenes = []
-    etiquetas = []
-
+def procesar_imagenes_y_guardar(carpeta_letra, output_filepath, procesos=None, cache=None,
+                                descriptores=DESCRIPTORES_DEFECTO, lienzo=None):
     # Obtener todas las imágenes en la carpeta
-    imagenes = [f for f in os.listdir(carpeta_letra) if f.endswith(".png") or f.endswith(".jpg")]
-
-    for filename in imagenes:
-        filepath = os.path.join(carpeta_letra, filename)
-        sumas_columnas = procesar_imagen(filepath)
-        datos_imagenes.append(sumas_columnas)
-        etiquetas.append(filename)  # Guardar el nombre del archivo como etiqueta (puedes cambiarlo)
+    rutas = listar_imagenes(carpeta_letra)
+    etiquetas = etiquetar(rutas)  # La letra (primera letra del archivo) como etiqueta
 
-    # Convertir los datos a un DataFrame de Pandas
-    df = pd.DataFrame(datos_imagenes)
-
-    # Agregar la columna de etiquetas
-    df['Etiqueta'] = etiquetas
-
-    # Guardar el DataFrame en un archivo CSV
-    df.to_csv(output_filepath, index=False)
+    # Extraer las características en paralelo y guardarlas por bloques
+    guardar_caracteristicas(rutas, output_filepath, etiquetas=etiquetas, procesos=procesos, cache=cache,
+                            descriptores=descriptores, lienzo=lienzo)
 
     print(f"Datos de la carpeta {carpeta_letra} procesados y guardados en {output_filepath}.")
 
-# Función para procesar múltiples carpetas
-def procesar_carpetas(base_path):
+# Función para procesar múltiples carpetas. Con 'ruta_cache' las características se guardan
+# en una caché incremental y solo se decodifican las imágenes nuevas o modificadas.
+# 'formato' puede ser 'csv' o 'npy' (binario con memoria mapeada). 'descriptores' y 'lienzo'
+# eligen las características (ver configuraciones/extraccion.py).
+def procesar_carpetas(base_path, ruta_cache=None, formato='csv', descriptores=DESCRIPTORES_DEFECTO, lienzo=None):
+    cache = CacheCaracteristicas(ruta_cache) if ruta_cache else None
+
     # Letras o carpetas que quieres procesar
     letras = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'I', 'O', 'T', 'U']
 
     for letra in letras:
         carpeta_letra = os.path.join(base_path, f"letra{letra}")
-        archivo_salida = f"entrenamiento_{letra}.csv"
+        archivo_salida = f"entrenamiento_{letra}.{formato}"
 
         # Asegurarse de que la carpeta existe
         if os.path.exists(carpeta_letra):
-            procesar_imagenes_y_guardar(carpeta_letra, archivo_salida)
+            procesar_imagenes_y_guardar(carpeta_letra, archivo_salida, cache=cache,
+                                        descriptores=descriptores, lienzo=lienzo)
         else:
             print(f"La carpeta {carpeta_letra} no existe, saltando...")
 
-# Ejemplo de uso
-base_path = r"C:\Users\themo\OneDrive\Desktop\ParcialKohonen\letras_organizadas"
-procesar_carpetas(base_path)
+    # Quitar de la caché las imágenes que se han borrado
+    if cache is not None:
+        borradas = cache.purgar()
+        cache.guardar()
+        print(f"Caché actualizada: {len(cache.entradas)} imágenes, {borradas} eliminadas.")
+
+# Ejemplo de uso (protegido para que los procesos del pool no lo vuelvan a ejecutar):
+#   python -m modelo_kohonen.configuraciones.creaciondearchivoporletra [carpeta_letras_organizadas]
+if __name__ == '__main__':
+    base_path = sys.argv[1] if len(sys.argv) > 1 else "letras_organizadas"
+    procesar_carpetas(base_path, ruta_cache="cache_caracteristicas.npz")
+
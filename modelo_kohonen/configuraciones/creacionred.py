@@ -1,57 +1,387 @@
+import time
 import numpy as np
-import matplotlib.pyplot as plt
+from modelo_kohonen.configuraciones.clasificacion import codificar, conteos_por_neurona, tabla_etiquetas
+from modelo_kohonen.configuraciones.indice_bmu import IndiceBMU, distancias_cuadradas, tipo_calculo
+from modelo_kohonen.configuraciones.metricas import matriz_u, metricas_mapa, pares_adyacentes
+from modelo_kohonen.configuraciones.telemetria import Telemetria, sin_medicion
+
+TOPOLOGIAS = ('lineal', 'rectangular', 'hexagonal')
+MODOS_ENTRENAMIENTO = ('online', 'batch', 'minibatch')
+TAMANO_BLOQUE_LECTURA = 65536  # Patrones leídos por bloque al recorrer datasets grandes
+# Tipos de almacenamiento de los pesos; con float16 los cálculos se hacen en float32
+TIPOS_PESOS = ('float64', 'float32', 'float16')
+
+# Matriz (patrones x neuronas) con la influencia de cada vencedora sobre cada neurona.
+# Con 'out' se calcula en ese buffer (reutilizado entre bloques)
+def influencias_vecindad(distancias_red, neuronas_vencedoras, radio, tipo_competencia, dtype=np.float64, out=None):
+    if out is None:
+        out = np.empty((len(neuronas_vencedoras), distancias_red.shape[0]), dtype=dtype)
+    if tipo_competencia == 'blanda':
+        if out.dtype == distancias_red.dtype:
+            np.take(distancias_red, neuronas_vencedoras, axis=0, out=out, mode='clip')
+        else:
+            out[...] = distancias_red[neuronas_vencedoras]
+        out[out > radio] = np.inf  # Fuera del radio la influencia es exp(-inf) = 0
+        np.square(out, out=out)
+        out *= -1 / (2 * radio ** 2)
+        np.exp(out, out=out)
+    else:
+        out.fill(0)
+        out[np.arange(len(neuronas_vencedoras)), neuronas_vencedoras] = 1.0
+    return out
+
+# Devuelve un buffer de trabajo de 'buffers' con la forma pedida. Se reutiliza mientras quepa:
+# un bloque más corto (p. ej. el último de la época) usa las primeras filas del buffer
+def buffer_trabajo(buffers, nombre, forma, dtype):
+    buffer = buffers.get(nombre)
+    if buffer is None or buffer.dtype != dtype or buffer.shape[1:] != forma[1:] or buffer.shape[0] < forma[0]:
+        buffer = buffers[nombre] = np.empty(forma, dtype=dtype)
+    return buffer[:forma[0]]
+
+# Convierte un chunk (array, memmap o DataFrame de pd.read_csv) en matriz numérica
+def matriz_de_chunk(chunk):
+    columnas = getattr(chunk, 'columns', None)
+    if columnas is not None and 'Etiqueta' in columnas:
+        chunk = chunk.drop(columns='Etiqueta')
+    return np.asarray(chunk)
+
+# Mezcla a nivel de chunk con un buffer acotado: se leen 'tamano_buffer' chunks y se
+# entrega uno al azar cada vez que entra uno nuevo
+def mezclar_chunks(chunks, tamano_buffer, rng):
+    buffer = []
+    for chunk in chunks:
+        buffer.append(chunk)
+        if len(buffer) >= tamano_buffer:
+            yield buffer.pop(rng.integers(len(buffer)))
+    for i in rng.permutation(len(buffer)):
+        yield buffer[i]
+
+# Media y desviación estándar globales de una secuencia de bloques, en una sola pasada
+# (combinación de Chan et al. de medias y varianzas parciales)
+def estadisticas_normalizacion(bloques):
+    n, media, m2 = 0, 0.0, 0.0
+    for bloque in bloques:
+        bloque = np.asarray(bloque, dtype=float)
+        n_bloque = bloque.size
+        if n_bloque == 0:
+            continue
+        media_bloque = bloque.mean()
+        m2_bloque = np.sum((bloque - media_bloque) ** 2)
+        delta = media_bloque - media
+        total = n + n_bloque
+        media += delta * n_bloque / total
+        m2 += m2_bloque + delta ** 2 * n * n_bloque / total
+        n = total
+    if n == 0:
+        raise ValueError("El dataset está vacío.")
+    return media, np.sqrt(m2 / n)
 
 class RedKohonen:
-    def __init__(self, num_entradas, tipo_competencia, tasa_aprendizaje, num_iteraciones):
+    def __init__(self, num_entradas, tipo_competencia, tasa_aprendizaje, num_iteraciones,
+                 topologia='lineal', filas=None, columnas=None, pesos=None, distancias_red=None, semilla=None,
+                 dtype='float32'):
+        if topologia not in TOPOLOGIAS:
+            raise ValueError(f"Topología no soportada: {topologia}")
+        if np.dtype(dtype).name not in TIPOS_PESOS:
+            raise ValueError(f"Tipo de pesos no soportado: {dtype}")
+
         self.num_entradas = num_entradas
+        self.dtype = np.dtype(dtype)  # Tipo con el que se guardan los pesos
+        self.dtype_calculo = tipo_calculo(self.dtype)  # Tipo de patrones, distancias y acumulados
+        self.rng = np.random.default_rng(semilla)  # Generador propio: con 'semilla' el entrenamiento es reproducible
         self.num_neuronas = max(4, num_entradas * 8)  # Aumentamos el número de neuronas
+        self.topologia = topologia
+        self.filas, self.columnas = self.dimensiones_mapa(filas, columnas)
+        self.num_neuronas = self.filas * self.columnas
+        # Coordenadas (fila, columna) de cada neurona y distancias en la rejilla (ver tabla_distancias)
+        self.coordenadas = np.indices((self.filas, self.columnas)).reshape(2, -1).T
+        self.distancias_red = distancias_red  # None = se calculan la primera vez que se usan
+        self.adyacentes = None  # Pares de neuronas vecinas en la rejilla (para la matriz U), calculados al usarse
+        self.radio_inicial = max(self.filas, self.columnas)
         self.tasa_aprendizaje_inicial = tasa_aprendizaje
         self.tasa_aprendizaje = tasa_aprendizaje
         self.num_iteraciones = num_iteraciones
-        self.pesos = np.random.uniform(-0.5, 0.5, (self.num_entradas, self.num_neuronas))  # Inicialización más acotada
+        if pesos is None:
+            pesos = self.rng.uniform(-0.5, 0.5, (self.num_entradas, self.num_neuronas))  # Inicialización más acotada
+        self.pesos = np.asarray(pesos, dtype=self.dtype)  # Sin copia si ya tiene el tipo (p. ej. memmap)
         self.tipo_competencia = tipo_competencia
         self.dm_values = []
         self.mejor_dm = float('inf')
+        # Estado de la parada temprana (se guarda en los checkpoints para reanudar)
+        self.epocas_sin_mejora = 0
+        self.mejores_pesos = None
+        self.mejor_iteracion = None
+        self.iteracion_actual = 0  # Última época completada (para reanudar el entrenamiento)
+        self.media = None  # Estadísticas de normalización del dataset de entrenamiento
+        self.desviacion = None
         self.callback = None  # Para actualizar la interfaz
+        self.indice_bmu = None  # Índice opcional para acelerar la búsqueda de la vencedora
+        self.version_pesos = 0  # Se incrementa cada vez que cambian los pesos
+        self.telemetria = None  # Métricas por época (ver configuraciones/telemetria.py); None = sin coste
+        self.buffers = {}  # Buffers de trabajo reutilizados por los motores de entrenamiento y simulación
+        # Tabla neurona -> etiqueta (ver etiquetar_neuronas); None si la red no tiene etiquetas
+        self.clases = None
+        self.conteos_etiquetas = None
+        self.etiqueta_neurona = None
+        self.confianza_neurona = None
+        self.patrones_incrementales = 0  # Patrones absorbidos con ajustar_parcial
+        self.buffers_incrementales = {}  # Buffers propios de ajustar_parcial (no comparte los de simulación)
+        self.configurar_parada()
+        self.configurar_checkpoints(None)
+        self.configurar_incremental()
+
+    # Al serializar (p. ej. entre procesos del barrido) no viajan las distancias de la rejilla
+    # ni los buffers de trabajo: las distancias se recalculan a partir de la topología si se usan
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        estado.update(distancias_red=None, adyacentes=None, buffers={}, buffers_incrementales={})
+        return estado
 
     def set_callback(self, callback_fn):
         self.callback = callback_fn
 
-    def entrenar(self, dataset):
-        dataset = np.array(dataset)
-        # Normalizar dataset
-        dataset = (dataset - dataset.mean()) / dataset.std()
-        
-        fig, axs = plt.subplots(1, 2, figsize=(15, 5))
-        plt.ion()
+    def configurar_parada(self, paciencia=None, mejora_minima=0.0, restaurar_mejor=False,
+                          umbral_dm=0.001, umbral_variacion=0.0001, umbral_dm_estable=0.01, ventana=10):
+        # paciencia: épocas seguidas sin que el DM mejore en al menos 'mejora_minima' (relativa)
+        # antes de parar. restaurar_mejor: al terminar se vuelve a los pesos del mejor DM.
+        # Los umbrales restantes son los de la condición de estabilidad original.
+        self.paciencia = paciencia
+        self.mejora_minima = mejora_minima
+        self.restaurar_mejor = restaurar_mejor
+        self.umbral_dm = umbral_dm
+        self.umbral_variacion = umbral_variacion
+        self.umbral_dm_estable = umbral_dm_estable
+        self.ventana_parada = ventana
 
-        for iteracion in range(1, self.num_iteraciones + 1):
-            distancias_total = []
-            np.random.shuffle(dataset)  # Mezclar datos en cada iteración
+    def configurar_checkpoints(self, ruta, cada_epocas=None, cada_segundos=None):
+        # Guarda el modelo completo en 'ruta' cada N épocas y/o cada T segundos (y al terminar)
+        self.ruta_checkpoint = ruta
+        self.checkpoint_epocas = cada_epocas
+        self.checkpoint_segundos = cada_segundos
 
-            for patron in dataset:
-                distancias = self.calcular_distancias(patron)
-                neurona_vencedora = np.argmin(distancias)
-                distancias_total.append(np.min(distancias))  # Solo la menor distancia
+    def configurar_incremental(self, tasa=None, decaimiento=0.0, radio=None, modo='online'):
+        # Parámetros de ajustar_parcial. tasa: por defecto, la tasa con la que terminó el entrenamiento.
+        # La tasa efectiva es tasa / (1 + decaimiento * n), con n los patrones ya absorbidos
+        # (decaimiento 0 = tasa constante). radio: de vecindad en 'blanda'; por defecto, el de la
+        # última época entrenada. modo: 'online' (patrón a patrón) o 'minibatch' (una actualización por llamada)
+        if modo not in ('online', 'minibatch'):
+            raise ValueError(f"Modo incremental no soportado: {modo}")
+        self.tasa_incremental = tasa
+        self.decaimiento_incremental = decaimiento
+        self.radio_incremental = radio
+        self.modo_incremental = modo
 
-                self.actualizar_pesos(patron, neurona_vencedora, iteracion)
+    def activar_telemetria(self, *sumideros):
+        # Cada sumidero es una función que recibe el evento de cada época
+        self.telemetria = Telemetria(*sumideros)
+        return self.telemetria
+
+    def desactivar_telemetria(self):
+        if self.telemetria is not None:
+            self.telemetria.cerrar()
+        self.telemetria = None
+
+    def dimensiones_mapa(self, filas, columnas):
+        # En la topología lineal las neuronas forman una sola fila
+        if self.topologia == 'lineal':
+            return 1, columnas or self.num_neuronas
+        if filas is None and columnas is None:
+            filas = int(np.sqrt(self.num_neuronas))
+        if columnas is None:
+            columnas = int(np.ceil(self.num_neuronas / filas))
+        if filas is None:
+            filas = int(np.ceil(self.num_neuronas / columnas))
+        if filas < 1 or columnas < 1:
+            raise ValueError("El mapa debe tener al menos una fila y una columna.")
+        return filas, columnas
+
+    def calcular_distancias_red(self, origen=slice(None), destino=slice(None)):
+        # Posición de cada neurona en el plano; en la hexagonal las filas impares se desplazan
+        # media columna y las filas se acercan sqrt(3)/2 para que los 6 vecinos estén a distancia 1
+        # Con 'origen' y 'destino' (índices de neuronas) solo se calcula esa submatriz
+        posiciones = self.coordenadas.astype(np.float32)
+        if self.topologia == 'hexagonal':
+            posiciones[:, 1] += 0.5 * (self.coordenadas[:, 0] % 2)
+            posiciones[:, 0] *= np.sqrt(3) / 2
+        filas, columnas = posiciones[:, 0], posiciones[:, 1]
+        return np.hypot(filas[origen, np.newaxis] - filas[np.newaxis, destino],
+                        columnas[origen, np.newaxis] - columnas[np.newaxis, destino])
+
+    def tabla_distancias(self):
+        # Tabla (neuronas x neuronas) de distancias en la rejilla, calculada al necesitar una
+        # vecindad: cargar una red para simular no la construye
+        if self.distancias_red is None:
+            self.distancias_red = self.calcular_distancias_red()
+        return self.distancias_red
+
+    def distancias_entre(self, origen, destino):
+        # Submatriz (origen x destino) de la tabla, sin construirla entera si aún no existe
+        if self.distancias_red is None:
+            return self.calcular_distancias_red(origen, destino)
+        return self.distancias_red[np.ix_(origen, destino)]
+
+    def pares_adyacentes(self):
+        if self.adyacentes is None:
+            self.adyacentes = pares_adyacentes(self.tabla_distancias())
+        return self.adyacentes
+
+    def matriz_u(self, pesos=None):
+        # Matriz U con la forma del mapa (filas x columnas)
+        pesos = np.asarray(self.pesos if pesos is None else pesos, dtype=np.float64)
+        return matriz_u(pesos, self.pares_adyacentes()).reshape(self.filas, self.columnas)
+
+    def metricas(self, datos, pesos=None):
+        # Errores de cuantización y topográfico, aciertos por neurona y matriz U (ver configuraciones/metricas.py)
+        return metricas_mapa(self, datos, TAMANO_BLOQUE_LECTURA, pesos)
+
+    def buffer(self, nombre, forma, dtype=None):
+        return buffer_trabajo(self.buffers, nombre, forma, dtype or self.dtype_calculo)
+
+    def activar_indice_bmu(self, num_grupos=None, num_sondas=2, exacto=False):
+        self.indice_bmu = IndiceBMU(num_grupos=num_grupos, num_sondas=num_sondas, exacto=exacto, rng=self.rng)
+
+    def desactivar_indice_bmu(self):
+        self.indice_bmu = None
+
+    def buscar_vencedoras(self, patrones, pesos=None):
+        # Vencedoras y distancias al cuadrado; usa el índice si está activo (se reconstruye
+        # de forma perezosa cuando los pesos han cambiado). 'pesos' permite fijar una instantánea:
+        # las vencedoras y sus distancias se calculan siempre con esos pesos
+        patrones = np.atleast_2d(patrones)
+        indice = self.indice_bmu
+        if indice is None:
+            distancias = self.calcular_distancias_bloque(patrones, pesos)
+            vencedoras = np.argmin(distancias, axis=1)
+            return vencedoras, distancias[np.arange(len(patrones)), vencedoras]
+        # Solo se reagrupa para los pesos vigentes; una instantánea ya sustituida (p. ej. por
+        # ajustar_parcial) se consulta con los grupos actuales, midiendo sus propios pesos
+        if pesos is None or pesos is self.pesos:
+            pesos = self.pesos
+            if indice.desactualizado(pesos, self.version_pesos):
+                indice.construir(pesos, self.version_pesos)
+        return indice.buscar(patrones, pesos)
+
+    def calcular_radio(self, iteracion):
+        # float de Python para no promover a float64 los cálculos en float32
+        return float(self.radio_inicial * np.exp(-iteracion / self.num_iteraciones))
+
+    def entrenar(self, dataset, modo='online', batch_size=256, mostrar_graficos=True, intervalo_graficos=1,
+                 continuar=False, hasta=None):
+        if modo not in MODOS_ENTRENAMIENTO:
+            raise ValueError(f"Modo de entrenamiento no soportado: {modo}")
+
+        # El dataset puede ser un np.memmap: no se copia a memoria, se lee por bloques
+        dataset = np.asarray(dataset)
+        # Estadísticas de normalización del dataset, calculadas por bloques
+        self.preparar_normalizacion(
+            (dataset[inicio:inicio + TAMANO_BLOQUE_LECTURA] for inicio in range(0, len(dataset), TAMANO_BLOQUE_LECTURA)),
+            continuar)
+
+        def bloques_epoca():
+            orden = self.rng.permutation(len(dataset))  # Mezclar datos en cada iteración (sin mover el dataset)
+            for inicio in range(0, len(orden), batch_size):
+                yield dataset[orden[inicio:inicio + batch_size]]
+
+        self.ejecutar_entrenamiento(lambda iteracion: self.entrenar_epoca(bloques_epoca(), iteracion, modo),
+                                    mostrar_graficos, intervalo_graficos, continuar, hasta)
+
+    def entrenar_flujo(self, fuente, modo='minibatch', batch_size=256, chunks_mezcla=8,
+                       mostrar_graficos=False, intervalo_graficos=1, continuar=False):
+        # Entrenamiento fuera de memoria: 'fuente' es una función que devuelve un iterador nuevo
+        # de chunks en cada llamada (p. ej. lambda: pd.read_csv(ruta, chunksize=10000)).
+        # Solo se mantienen en memoria 'chunks_mezcla' chunks a la vez.
+        if modo not in MODOS_ENTRENAMIENTO:
+            raise ValueError(f"Modo de entrenamiento no soportado: {modo}")
+        if not callable(fuente):
+            raise TypeError("La fuente debe ser una función que devuelva un iterador de chunks nuevo en cada época.")
+
+        # Media y varianza en una sola pasada sobre los chunks
+        self.preparar_normalizacion((matriz_de_chunk(chunk) for chunk in fuente()), continuar)
+
+        def bloques_epoca():
+            for chunk in mezclar_chunks((matriz_de_chunk(chunk) for chunk in fuente()), chunks_mezcla, self.rng):
+                chunk = chunk[self.rng.permutation(len(chunk))]  # Mezclar también dentro del chunk
+                for inicio in range(0, len(chunk), batch_size):
+                    yield chunk[inicio:inicio + batch_size]
+
+        self.ejecutar_entrenamiento(lambda iteracion: self.entrenar_epoca(bloques_epoca(), iteracion, modo),
+                                    mostrar_graficos, intervalo_graficos, continuar)
+
+    def entrenar_paralelo(self, dataset, procesos=None, batch_size=1024, mostrar_graficos=False, intervalo_graficos=1,
+                          continuar=False):
+        # SOM por lotes repartido entre varios procesos (ver configuraciones/entrenamiento_paralelo.py)
+        from modelo_kohonen.configuraciones.entrenamiento_paralelo import entrenar_paralelo
+        entrenar_paralelo(self, dataset, procesos=procesos, batch_size=batch_size,
+                          mostrar_graficos=mostrar_graficos, intervalo_graficos=intervalo_graficos,
+                          continuar=continuar)
+
+    def preparar_normalizacion(self, bloques, continuar):
+        # Al continuar un entrenamiento se conserva la escala con la que se entrenó el modelo
+        if continuar and self.media is not None:
+            return
+        self.media, self.desviacion = (float(valor) for valor in estadisticas_normalizacion(bloques))
+
+    def ejecutar_entrenamiento(self, epoca, mostrar_graficos, intervalo_graficos, continuar=False, hasta=None):
+        # Bucle de épocas común: 'epoca(iteracion)' entrena una época y devuelve su DM.
+        # Con 'continuar' se reanuda desde la última época completada (p. ej. de un modelo guardado).
+        # Con 'hasta' se detiene tras esa época sin cambiar el calendario de radio y tasa, que
+        # sigue dependiendo de num_iteraciones (p. ej. para evaluar una configuración y reanudarla)
+        primera = self.iteracion_actual + 1 if continuar else 1
+        ultima = self.num_iteraciones if hasta is None else min(hasta, self.num_iteraciones)
+        ultimo_checkpoint = time.monotonic()
+        # matplotlib solo se importa cuando hay interfaz gráfica (entrenamiento sin GUI en servidores)
+        if mostrar_graficos:
+            import matplotlib.pyplot as plt
+            fig, axs = plt.subplots(1, 2, figsize=(15, 5))
+            plt.ion()
+
+        for iteracion in range(primera, ultima + 1):
+            telemetria = self.telemetria
+            fase = telemetria.fase if telemetria else sin_medicion
+            if telemetria:
+                telemetria.iniciar_epoca()
+                tasa_epoca = self.tasa_aprendizaje
+
+            dm = epoca(iteracion)
+            self.iteracion_actual = iteracion
 
             # Actualización adaptativa de la tasa de aprendizaje
-            self.tasa_aprendizaje = self.tasa_aprendizaje_inicial * np.exp(-0.001 * iteracion)
+            self.tasa_aprendizaje = float(self.tasa_aprendizaje_inicial * np.exp(-0.001 * iteracion))
 
-            dm = np.mean(distancias_total)
             self.dm_values.append(dm)
+
+            # Se cuenta como mejora solo si supera al mejor DM en al menos 'mejora_minima' (relativa)
+            if dm < self.mejor_dm * (1 - self.mejora_minima):
+                self.epocas_sin_mejora = 0
+            else:
+                self.epocas_sin_mejora += 1
             
             if dm < self.mejor_dm:
                 self.mejor_dm = dm
+                self.mejor_iteracion = iteracion
+                if self.restaurar_mejor:
+                    self.mejores_pesos = np.array(self.pesos)
 
-            self.actualizar_graficos(axs, iteracion, dm)
+            parar = self.verificar_condiciones_parada(dm, iteracion)
+
+            if self.ruta_checkpoint and self.toca_checkpoint(iteracion, ultimo_checkpoint):
+                with fase('io'):
+                    self.guardar_checkpoint()
+                ultimo_checkpoint = time.monotonic()
+
+            # Refrescar los gráficos cada 'intervalo_graficos' iteraciones y al terminar
+            if mostrar_graficos and (iteracion % intervalo_graficos == 0 or parar):
+                with fase('graficos'):
+                    self.actualizar_graficos(axs, iteracion, dm)
+
+            if telemetria:
+                telemetria.cerrar_epoca(iteracion, dm, tasa_epoca, self.calcular_radio(iteracion))
             
             # Actualizar interfaz si hay callback
             if self.callback:
                 self.callback(f"DM actual: {dm:.6f}\nMejor DM: {self.mejor_dm:.6f}")
 
-            if self.verificar_condiciones_parada(dm, iteracion):
+            if parar:
                 print(f"Entrenamiento completado en iteración {iteracion}")
                 print(f"DM final: {dm:.6f}")
                 # Mensaje en la interfaz con el DM final
@@ -59,34 +389,184 @@ class RedKohonen:
                     self.callback(f"La red ha sido entrenada con éxito.\nMejor DM alcanzado: {self.mejor_dm:.6f}\nDM final: {dm:.6f}")
                 break
 
-        plt.ioff()
-        plt.show()
+        # Volver a los pesos con el mejor DM si se ha pedido
+        if self.restaurar_mejor and self.mejores_pesos is not None:
+            self.pesos[...] = self.mejores_pesos
+            self.version_pesos += 1
+            print(f"Pesos restaurados a la iteración {self.mejor_iteracion} (DM: {self.mejor_dm:.6f})")
+
+        if self.ruta_checkpoint:
+            self.guardar_checkpoint()
+
+        if mostrar_graficos:
+            plt.ioff()
+            plt.show()
+
+    def normalizar(self, patrones):
+        # Los patrones pasan al tipo de cálculo; sin estadísticas (red no entrenada) no se escalan
+        patrones = np.asarray(patrones, dtype=self.dtype_calculo)
+        if self.media is None:
+            return patrones
+        return (patrones - self.media) / self.desviacion
+
+    def entrenar_epoca(self, bloques, iteracion, modo):
+        # Recorre una época bloque a bloque y devuelve el DM (distancia media a la vencedora).
+        # 'online' actualiza tras cada patrón, 'minibatch' tras cada bloque y 'batch'
+        # acumula todos los bloques y actualiza una sola vez por época.
+        telemetria = self.telemetria
+        fase = sin_medicion
+        if telemetria:
+            fase = telemetria.fase
+            bloques = telemetria.medir_iterador(bloques)
+
+        suma_distancias = 0.0  # float de Python: la suma de la época se acumula en float64
+        num_patrones = 0
+        if modo != 'online':
+            # Acumuladores de la época (en 'minibatch' se vacían tras cada bloque)
+            numerador = self.buffer('numerador', self.pesos.shape)
+            denominador = self.buffer('denominador', (self.num_neuronas,))
+            numerador.fill(0)
+            denominador.fill(0)
+        for bloque in bloques:
+            bloque = self.normalizar(bloque)
+            num_patrones += len(bloque)
+
+            if modo == 'online':
+                suma_distancias += float(np.sum(self.entrenar_epoca_online(bloque, iteracion)))
+                continue
+
+            # BMUs de todo el bloque en una sola operación matricial
+            with fase('bmu'):
+                distancias = self.calcular_distancias_bloque(bloque)
+                neuronas_vencedoras = np.argmin(distancias, axis=1)
+                suma_distancias += float(np.sum(np.sqrt(distancias[np.arange(len(bloque)), neuronas_vencedoras])))
+            if telemetria:
+                telemetria.contar(distancias, self.tabla_distancias())
+
+            with fase('actualizacion'):
+                self.acumular_bloque(bloque, neuronas_vencedoras, iteracion, numerador, denominador)
+                if modo == 'minibatch':
+                    self.aplicar_acumulado(numerador, denominador)
+                    numerador.fill(0)
+                    denominador.fill(0)
+
+        if num_patrones == 0:
+            raise ValueError("La época no contiene patrones.")
+        if modo == 'batch':
+            with fase('actualizacion'):
+                self.aplicar_acumulado(numerador, denominador)
+        return suma_distancias / num_patrones
+
+    def entrenar_epoca_online(self, dataset, iteracion):
+        # Recorre los patrones uno a uno, actualizando los pesos tras cada uno. Las distancias
+        # de cada patrón y las de las vencedoras se escriben en buffers de tamaño fijo
+        if self.telemetria:
+            return self.entrenar_epoca_online_medida(dataset, iteracion)
+        distancias = self.buffer('distancias_patron', (self.num_neuronas,))
+        distancias_vencedoras = self.buffer('distancias_vencedoras', (len(dataset),))
+        for i, patron in enumerate(dataset):
+            self.calcular_distancias_cuadradas(patron, out=distancias)
+            neurona_vencedora = np.argmin(distancias)
+            distancias_vencedoras[i] = distancias[neurona_vencedora]  # Solo la menor distancia
+
+            self.actualizar_pesos(patron, neurona_vencedora, iteracion)
+        return np.sqrt(distancias_vencedoras, out=distancias_vencedoras)
+
+    def entrenar_epoca_online_medida(self, dataset, iteracion):
+        # Igual que entrenar_epoca_online, cronometrando cada fase (solo con telemetría activa)
+        telemetria = self.telemetria
+        distancias = self.buffer('distancias_patron', (self.num_neuronas,))
+        distancias_vencedoras = self.buffer('distancias_vencedoras', (len(dataset),))
+        for i, patron in enumerate(dataset):
+            with telemetria.fase('bmu'):
+                self.calcular_distancias_cuadradas(patron, out=distancias)
+                neurona_vencedora = np.argmin(distancias)
+                distancias_vencedoras[i] = distancias[neurona_vencedora]
+            telemetria.contar(distancias, self.tabla_distancias())
+
+            with telemetria.fase('actualizacion'):
+                self.actualizar_pesos(patron, neurona_vencedora, iteracion)
+        return np.sqrt(distancias_vencedoras, out=distancias_vencedoras)
+
+    def calcular_distancias_bloque(self, bloque, pesos=None):
+        # El resultado vive en un buffer reutilizado: válido hasta el siguiente bloque
+        return distancias_cuadradas(bloque, self.pesos if pesos is None else pesos,
+                                    out=self.buffer('distancias_bloque', (len(bloque), self.num_neuronas)))
+
+    def influencia_bloque(self, neuronas_vencedoras, iteracion):
+        return influencias_vecindad(self.tabla_distancias(), neuronas_vencedoras,
+                                    self.calcular_radio(iteracion), self.tipo_competencia, self.dtype_calculo,
+                                    out=self.buffer('influencias', (len(neuronas_vencedoras), self.num_neuronas)))
+
+    def acumular_bloque(self, bloque, neuronas_vencedoras, iteracion, numerador, denominador):
+        # Suma al acumulado los patrones del bloque ponderados por la influencia sobre cada neurona
+        influencias = self.influencia_bloque(neuronas_vencedoras, iteracion)
+        producto = self.buffer('producto', self.pesos.shape)
+        np.matmul(bloque.T, influencias, out=producto)  # (entradas x neuronas)
+        numerador += producto
+        denominador += influencias.sum(axis=0)
+
+    def aplicar_acumulado(self, numerador, denominador):
+        # Cada neurona se mueve hacia la media ponderada de los patrones que ha acumulado.
+        # Se calcula en el propio numerador (que queda inservible) y en el tipo de cálculo;
+        # las neuronas sin patrones reciben un incremento 0
+        activas = denominador > 0
+        np.divide(numerador, denominador, out=numerador, where=activas)
+        numerador -= self.pesos
+        numerador *= self.tasa_aprendizaje
+        numerador *= activas
+        self.pesos += numerador
+        self.version_pesos += 1
 
     def calcular_distancias(self, patron):
+        return np.sqrt(self.calcular_distancias_cuadradas(patron))
+
+    def calcular_distancias_cuadradas(self, patron, out=None):
+        # Para elegir la vencedora basta con la distancia al cuadrado (sin np.sqrt).
+        # Las diferencias se calculan en un buffer reutilizado; con 'out' tampoco se reserva el resultado
         if patron.ndim == 1:
             patron = patron[:, np.newaxis]  # Asegúrate de que patron sea 2D
         if self.pesos.ndim == 1:
             self.pesos = self.pesos[:, np.newaxis]  # Asegúrate de que pesos sea 2D
-        return np.sqrt(np.sum((self.pesos - patron) ** 2, axis=0))
+        diferencias = self.buffer('diferencias', self.pesos.shape)
+        np.subtract(self.pesos, patron, out=diferencias)
+        np.square(diferencias, out=diferencias)
+        return np.sum(diferencias, axis=0, out=out)
     
 
     def actualizar_pesos(self, patron, neurona_vencedora, iteracion):
         if self.tipo_competencia == 'blanda':
-            radio = self.num_neuronas * np.exp(-iteracion / self.num_iteraciones)
-            for i in range(self.num_neuronas):
-                distancia = abs(i - neurona_vencedora)
-                if distancia <= radio:
-                    influencia = np.exp(-distancia**2 / (2 * radio**2))
-                    self.pesos[:, i] += self.tasa_aprendizaje * influencia * (patron - self.pesos[:, i])
+            radio = self.calcular_radio(iteracion)
+            # Fila precalculada de distancias en la rejilla: solo se indexan las neuronas dentro del radio
+            distancias = self.tabla_distancias()[neurona_vencedora]
+            vecinos = np.flatnonzero(distancias <= radio)
+            influencia = np.exp(-distancias[vecinos]**2 / (2 * radio**2)) * self.tasa_aprendizaje
+            # Actualización de todos los vecinos con un único producto exterior, en buffers
+            # (vecinos x entradas) reutilizados entre patrones
+            pesos_vecinos = self.buffer('pesos_vecinos', (len(vecinos), self.num_entradas), self.pesos.dtype)
+            np.take(self.pesos.T, vecinos, axis=0, out=pesos_vecinos, mode='clip')
+            nuevos = self.buffer('nuevos_vecinos', (len(vecinos), self.num_entradas))
+            np.subtract(patron, pesos_vecinos, out=nuevos)
+            nuevos *= influencia[:, np.newaxis]
+            nuevos += pesos_vecinos
+            self.pesos[:, vecinos] = nuevos.T
         else:
-            self.pesos[:, neurona_vencedora] += self.tasa_aprendizaje * (patron - self.pesos[:, neurona_vencedora])
+            vencedora = self.pesos[:, neurona_vencedora]
+            incremento = self.buffer('incremento', (self.num_entradas,))
+            np.subtract(patron, vencedora, out=incremento)
+            incremento *= self.tasa_aprendizaje
+            vencedora += incremento
+        self.version_pesos += 1
 
     def actualizar_graficos(self, axs, iteracion, dm):
+        import matplotlib.pyplot as plt
+
+        # Matriz U: las zonas claras separan grupos de neuronas con pesos muy distintos
         axs[0].cla()
-        axs[0].imshow(self.pesos, aspect='auto', cmap='viridis')
-        axs[0].set_title(f'Pesos en la iteración {iteracion} (DM: {dm:.6f})')
-        axs[0].set_xlabel('Neuronas')
-        axs[0].set_ylabel('Entradas')
+        axs[0].imshow(self.matriz_u(), aspect='auto', cmap='viridis')
+        axs[0].set_title(f'Matriz U en la iteración {iteracion} (DM: {dm:.6f})')
+        axs[0].set_xlabel('Columna')
+        axs[0].set_ylabel('Fila')
 
         axs[1].cla()
         axs[1].plot(self.dm_values, label="DM")
@@ -99,22 +579,172 @@ class RedKohonen:
         plt.pause(0.1)  # Actualización más rápida de gráficos
 
     def verificar_condiciones_parada(self, dm, iteracion):
-        if len(self.dm_values) > 10:
-            ultimos_dm = self.dm_values[-10:]
+        if self.paciencia is not None and self.epocas_sin_mejora >= self.paciencia:
+            print(f"Parada temprana: {self.paciencia} épocas sin mejorar el DM")
+            return True
+        if len(self.dm_values) > self.ventana_parada:
+            ultimos_dm = self.dm_values[-self.ventana_parada:]
             variacion = np.std(ultimos_dm)
-            return dm < 0.001 or (variacion < 0.0001 and dm < 0.01) or iteracion >= self.num_iteraciones
+            return (dm < self.umbral_dm or (variacion < self.umbral_variacion and dm < self.umbral_dm_estable)
+                    or iteracion >= self.num_iteraciones)
         return False
+
+    def toca_checkpoint(self, iteracion, ultimo_checkpoint):
+        if self.checkpoint_epocas and iteracion % self.checkpoint_epocas == 0:
+            return True
+        return bool(self.checkpoint_segundos) and time.monotonic() - ultimo_checkpoint >= self.checkpoint_segundos
+
+    def guardar_checkpoint(self):
+        # La escritura del modelo es atómica: un fallo a mitad deja intacto el checkpoint anterior
+        from modelo_kohonen.configuraciones.modelo import guardar_modelo
+        guardar_modelo(self, self.ruta_checkpoint)
     
     def cargar_pesos(self, pesos):
-        self.pesos = pesos  # Cargar pesos óptimos desde un archivo o variable
+        self.pesos = np.asarray(pesos, dtype=self.dtype)  # Cargar pesos óptimos desde un archivo o variable
+        self.version_pesos += 1
     
     def simular(self, patron):
-        distancias = self.calcular_distancias(patron)  # Calcular distancias
-        neurona_vencedora = np.argmin(distancias)  # Neurona con menor distancia
-        return self.pesos[:, neurona_vencedora]  # Retornar los pesos de la neurona vencedora
+        vencedoras, _ = self.buscar_vencedoras(self.normalizar(patron))  # Neurona con menor distancia
+        neurona_vencedora = vencedoras[0]
+        return self.coordenadas_neurona(neurona_vencedora)  # Retornar (fila, columna) de la vencedora
+
+    def simular_lote(self, patrones, tamano_bloque=4096):
+        # Simula una matriz completa de patrones en una sola pasada vectorizada, por bloques: la
+        # normalización, las distancias y las diferencias se calculan bloque a bloque, así que un
+        # dataset con memoria mapeada no se carga entero
+        # Los patrones se llevan a la escala con la que se entrenó la red
+        # Toda la simulación usa la misma instantánea de los pesos (y de la tabla de etiquetas):
+        # ajustar_parcial sustituye las referencias sin modificar los arrays que se están leyendo
+        pesos = self.pesos
+        etiqueta_neurona, confianza_neurona = self.etiqueta_neurona, self.confianza_neurona
+        clases = self.clases
+        if np.ndim(patrones) < 2:
+            patrones = np.atleast_2d(patrones)
+        vencedoras = np.empty(len(patrones), dtype=int)
+        distancias = np.empty(len(patrones), dtype=self.dtype_calculo)
+        diferencias_promedio = np.empty(len(patrones), dtype=self.dtype_calculo)
+        for inicio in range(0, len(patrones), tamano_bloque):
+            bloque = self.normalizar(patrones[inicio:inicio + tamano_bloque])
+            fin = inicio + len(bloque)
+            vencedoras[inicio:fin], distancias[inicio:fin] = self.buscar_vencedoras(bloque, pesos)
+            diferencias_promedio[inicio:fin] = np.mean(np.abs(bloque - pesos[:, vencedoras[inicio:fin]].T), axis=1)
+
+        resultado = {
+            'vencedoras': vencedoras,
+            'coordenadas': self.coordenadas[vencedoras],
+            'distancias': np.sqrt(distancias),
+            'diferencias_promedio': diferencias_promedio,
+        }
+        # Con tabla de etiquetas, la predicción es una consulta por vencedora
+        if etiqueta_neurona is not None:
+            resultado['etiquetas'] = clases[etiqueta_neurona[vencedoras]]
+            resultado['confianzas'] = confianza_neurona[vencedoras]
+        return resultado
+
+    def etiquetar_neuronas(self, dataset, etiquetas):
+        # Cuenta las etiquetas de los patrones que gana cada neurona (con los pesos actuales) y
+        # construye la tabla neurona -> etiqueta mayoritaria usada por simular_lote
+        if len(etiquetas) != len(dataset):
+            raise ValueError(f"Hay {len(etiquetas)} etiquetas para {len(dataset)} patrones.")
+        clases, codigos = codificar(etiquetas)
+        vencedoras = np.concatenate([
+            self.simular_lote(dataset[inicio:inicio + TAMANO_BLOQUE_LECTURA])['vencedoras']
+            for inicio in range(0, len(dataset), TAMANO_BLOQUE_LECTURA)])
+        self.cargar_etiquetas(clases, conteos_por_neurona(vencedoras, codigos, self.num_neuronas, len(clases)))
+
+    def cargar_etiquetas(self, clases, conteos):
+        # Las clases se asignan antes que la tabla y solo crecen por el final (ajustar_parcial), así
+        # que un lector que lea primero la tabla y después las clases siempre obtiene etiquetas válidas
+        conteos = np.asarray(conteos)
+        etiqueta_neurona, confianza_neurona = tabla_etiquetas(conteos, self.distancias_entre)
+        self.clases = np.asarray(clases).astype(str)
+        self.conteos_etiquetas = conteos
+        self.etiqueta_neurona, self.confianza_neurona = etiqueta_neurona, confianza_neurona
+
+    def ajustar_parcial(self, patrones, etiquetas=None):
+        # Aprendizaje incremental: absorbe nuevos patrones (uno o un lote pequeño) en el mapa ya
+        # entrenado con la normalización guardada, con coste O(lote). Los pesos se actualizan en una
+        # copia que después sustituye a self.pesos (copia en escritura), así que se puede llamar
+        # mientras otro hilo simula. Las llamadas a ajustar_parcial deben venir de un único hilo.
+        # Con 'etiquetas' se suman también a los conteos de la tabla neurona -> etiqueta.
+        # Devuelve las vencedoras de los patrones (antes de actualizar) y sus distancias.
+        patrones = np.atleast_2d(patrones)
+        if patrones.shape[1] != self.num_entradas:
+            raise ValueError(f"Los patrones deben tener {self.num_entradas} entradas.")
+        if etiquetas is not None and len(etiquetas) != len(patrones):
+            raise ValueError(f"Hay {len(etiquetas)} etiquetas para {len(patrones)} patrones.")
+        # Red sin entrenar: escala del primer lote. Con desviación 0 (un solo patrón, un lote constante
+        # o una red entrenada con datos constantes) la normalización dividiría entre 0 y los pesos
+        # quedarían en NaN para siempre, así que se rechaza el ajuste
+        media, desviacion = self.media, self.desviacion
+        if media is None:
+            media, desviacion = (float(valor) for valor in estadisticas_normalizacion([patrones]))
+        if not desviacion > 0:
+            raise ValueError("La red no tiene estadísticas de normalización válidas (desviación 0): "
+                             "entrénala o ajusta primero un lote con dispersión.")
+        self.media, self.desviacion = media, desviacion
+        bloque = self.normalizar(patrones)
+
+        dtype = self.dtype_calculo
+        pesos = np.array(self.pesos, dtype=dtype)  # Copia privada: los lectores siguen con la anterior
+        radio = self.radio_incremental if self.radio_incremental is not None else self.calcular_radio(self.iteracion_actual)
+        tasa = self.tasa_incremental if self.tasa_incremental is not None else self.tasa_aprendizaje
+        buffers = self.buffers_incrementales
+        if self.modo_incremental == 'online':
+            vencedoras = np.empty(len(bloque), dtype=int)
+            distancias = np.empty(len(bloque), dtype=dtype)
+            distancias_patron = buffer_trabajo(buffers, 'distancias', (1, self.num_neuronas), dtype)
+            influencia = buffer_trabajo(buffers, 'influencias', (1, self.num_neuronas), dtype)
+            incremento = buffer_trabajo(buffers, 'incremento', pesos.shape, dtype)
+            for i, patron in enumerate(bloque):
+                distancias_cuadradas(patron[np.newaxis], pesos, out=distancias_patron)
+                vencedoras[i] = np.argmin(distancias_patron[0])
+                distancias[i] = distancias_patron[0, vencedoras[i]]
+                influencias_vecindad(self.tabla_distancias(), vencedoras[i:i + 1], radio, self.tipo_competencia, dtype,
+                                     out=influencia)
+                tasa_patron = tasa / (1 + self.decaimiento_incremental * (self.patrones_incrementales + i))
+                np.subtract(patron[:, np.newaxis], pesos, out=incremento)
+                incremento *= influencia * tasa_patron
+                pesos += incremento
+        else:
+            distancias_lote = distancias_cuadradas(bloque, pesos)
+            vencedoras = np.argmin(distancias_lote, axis=1)
+            distancias = distancias_lote[np.arange(len(bloque)), vencedoras]
+            influencias = influencias_vecindad(self.tabla_distancias(), vencedoras, radio, self.tipo_competencia, dtype)
+            denominador = influencias.sum(axis=0)
+            activas = denominador > 0
+            medias = np.divide(bloque.T @ influencias, denominador, out=np.zeros_like(pesos), where=activas)
+            pesos += (tasa / (1 + self.decaimiento_incremental * self.patrones_incrementales)) * (medias - pesos) * activas
+
+        if etiquetas is not None:
+            self.sumar_etiquetas(vencedoras, etiquetas)
+        self.pesos = pesos.astype(self.dtype, copy=False)  # Intercambio de la referencia (atómico)
+        self.version_pesos += 1
+        if self.indice_bmu is not None:
+            # El índice sigue a los pesos nuevos sin reagrupar en el hilo que simula
+            self.indice_bmu.seguir(self.pesos, self.version_pesos, len(bloque))
+        self.patrones_incrementales += len(bloque)
+        return vencedoras, np.sqrt(distancias)
+
+    def sumar_etiquetas(self, vencedoras, etiquetas):
+        # Las etiquetas nuevas se añaden al final de las clases (los códigos existentes no cambian)
+        etiquetas = np.asarray(etiquetas).astype(str)
+        clases = self.clases if self.clases is not None else np.array([], dtype=str)
+        nuevas = np.setdiff1d(np.unique(etiquetas), clases)
+        clases = np.concatenate([clases, nuevas])
+        _, codigos = codificar(etiquetas, clases)
+        conteos = np.zeros((self.num_neuronas, len(clases)), dtype=np.int64)
+        if self.conteos_etiquetas is not None:
+            conteos[:, :self.conteos_etiquetas.shape[1]] = self.conteos_etiquetas
+        conteos += conteos_por_neurona(vencedoras, codigos, self.num_neuronas, len(clases))
+        self.cargar_etiquetas(clases, conteos)
+
+    def coordenadas_neurona(self, neurona):
+        fila, columna = self.coordenadas[neurona]
+        return int(fila), int(columna)
     
     def comparar_pesos(self, dataset):
-        dataset = np.array(dataset)
+        dataset = self.normalizar(np.array(dataset, dtype=float))
         for i, patron in enumerate(dataset):
             distancias = self.calcular_distancias(patron)  # Calcular distancias
             neurona_vencedora = np.argmin(distancias)  # Neurona con menor distancia
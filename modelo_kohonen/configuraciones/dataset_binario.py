@@ -0,0 +1,76 @@
+import os
+import numpy as np
+
+# Formato binario de los datasets: una matriz .npy (patrones x entradas) y, al lado,
+# un archivo de texto con una etiqueta por línea (<nombre>.etiquetas.txt).
+# Los .npy se abren con memoria mapeada, así que cargarlos es instantáneo aunque no quepan en RAM.
+
+def ruta_etiquetas(ruta_npy):
+    return os.path.splitext(ruta_npy)[0] + '.etiquetas.txt'
+
+def guardar_etiquetas(ruta_npy, etiquetas):
+    with open(ruta_etiquetas(ruta_npy), 'w', encoding='utf-8') as archivo:
+        for etiqueta in etiquetas:
+            archivo.write(f"{etiqueta}\n")
+
+def cargar_etiquetas(ruta_npy):
+    ruta = ruta_etiquetas(ruta_npy)
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding='utf-8') as archivo:
+        return [linea.rstrip('\n') for linea in archivo]
+
+# Los índices de imágenes (ver configuraciones/ensamblado.py) guardan además la ruta de cada
+# imagen en <nombre>.rutas.txt
+def ruta_rutas(ruta_npy):
+    return os.path.splitext(ruta_npy)[0] + '.rutas.txt'
+
+def guardar_rutas(ruta_npy, rutas):
+    with open(ruta_rutas(ruta_npy), 'w', encoding='utf-8') as archivo:
+        for ruta in rutas:
+            archivo.write(f"{ruta}\n")
+
+def cargar_rutas(ruta_npy):
+    ruta = ruta_rutas(ruta_npy)
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding='utf-8') as archivo:
+        return [linea.rstrip('\n') for linea in archivo]
+
+def guardar_dataset_npy(ruta_npy, matriz, etiquetas=None):
+    np.save(ruta_npy, np.asarray(matriz))
+    if etiquetas is not None:
+        guardar_etiquetas(ruta_npy, etiquetas)
+
+# Importa un CSV (con o sin columna 'Etiqueta') y opcionalmente lo convierte a .npy.
+# Sin 'encabezado' la primera fila ya es un patrón (y no puede haber columna 'Etiqueta').
+# pandas solo se importa al leer CSV (la simulación sobre .npy no lo necesita)
+def importar_csv(ruta_csv, ruta_npy=None, encabezado=True):
+    import pandas as pd
+    df = pd.read_csv(ruta_csv, header=0 if encabezado else None)
+    etiquetas = df.pop('Etiqueta').astype(str).tolist() if 'Etiqueta' in df.columns else None
+    if not all(np.issubdtype(dtype, np.number) for dtype in df.dtypes):
+        raise ValueError("El dataset debe contener solo datos numéricos.")
+
+    matriz = df.to_numpy()
+    if ruta_npy is not None:
+        guardar_dataset_npy(ruta_npy, matriz, etiquetas)
+    return matriz, etiquetas
+
+# Devuelve (matriz, etiquetas); los .npy se abren como np.memmap de solo lectura
+def cargar_dataset(ruta, encabezado=True):
+    if ruta.endswith('.npy'):
+        return np.load(ruta, mmap_mode='r'), cargar_etiquetas(ruta)
+    return importar_csv(ruta, encabezado=encabezado)
+
+# Fuentes de chunks para RedKohonen.entrenar_flujo: cada llamada devuelve un iterador nuevo
+def fuente_csv(ruta_csv, tamano_chunk=100000):
+    import pandas as pd
+    return lambda: pd.read_csv(ruta_csv, chunksize=tamano_chunk)
+
+def fuente_npy(ruta_npy, tamano_chunk=100000):
+    def chunks():
+        matriz = np.load(ruta_npy, mmap_mode='r')
+        for inicio in range(0, len(matriz), tamano_chunk):
+            yield matriz[inicio:inicio + tamano_chunk]
+    return chunks
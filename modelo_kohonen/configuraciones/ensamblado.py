@@ -0,0 +1,100 @@
+import os
+import numpy as np
+from modelo_kohonen.configuraciones.dataset_binario import cargar_dataset, cargar_rutas, guardar_dataset_npy, guardar_rutas
+from modelo_kohonen.configuraciones.extraccion import (DESCRIPTORES_DEFECTO, EXTENSIONES_IMAGEN, concatenar,
+                                                       extraer_caracteristicas, guardar_caracteristicas_npy)
+
+# Ensamblado de datasets a partir de un índice de imágenes: (ruta, etiqueta, características).
+# Las características se extraen una sola vez; dividir en entrenamiento y simulación es después
+# una operación sobre arrays en memoria (sin copiar imágenes), estratificada por etiqueta y
+# reproducible con 'semilla'. En disco el índice es un dataset .npy con sus etiquetas
+# (<nombre>.etiquetas.txt) y las rutas de las imágenes (<nombre>.rutas.txt).
+CRITERIOS_ETIQUETA = ('nombre', 'carpeta')
+
+# Imágenes de archivos y carpetas (recorridas con sus subcarpetas), en orden estable
+def listar_imagenes_arbol(entradas):
+    rutas = []
+    for entrada in entradas:
+        if not os.path.isdir(entrada):
+            rutas.append(entrada)
+            continue
+        for directorio, subdirectorios, archivos in os.walk(entrada):
+            subdirectorios.sort()
+            rutas.extend(os.path.join(directorio, f) for f in sorted(archivos) if f.endswith(EXTENSIONES_IMAGEN))
+    return rutas
+
+# 'nombre': primera letra del archivo en mayúscula (como en reorganizar_letras: "Adistorsionada1.png" -> "A")
+# 'carpeta': nombre de la carpeta que contiene la imagen (p. ej. "letraA")
+def etiquetar(rutas, criterio='nombre'):
+    if criterio not in CRITERIOS_ETIQUETA:
+        raise ValueError(f"Criterio de etiqueta no soportado: {criterio}")
+    if criterio == 'nombre':
+        return [os.path.basename(ruta)[0].upper() for ruta in rutas]
+    return [os.path.basename(os.path.dirname(ruta)) for ruta in rutas]
+
+# Índice en memoria: (características, etiquetas, rutas)
+def indexar(entradas, criterio='nombre', procesos=None, cache=None, descriptores=DESCRIPTORES_DEFECTO, lienzo=None):
+    rutas = listar_imagenes_arbol(entradas)
+    if not rutas:
+        raise ValueError("No se encontraron imágenes.")
+    extraer = cache.extraer_caracteristicas if cache is not None else extraer_caracteristicas
+    matriz = concatenar(list(extraer(rutas, procesos, 256, descriptores, lienzo)))
+    if cache is not None:
+        cache.guardar()
+    return matriz, np.array(etiquetar(rutas, criterio)), rutas
+
+# Índice en disco: las características se escriben por bloques en un .npy (memoria mapeada)
+def guardar_indice(entradas, ruta_indice, criterio='nombre', procesos=None, cache=None,
+                   descriptores=DESCRIPTORES_DEFECTO, lienzo=None):
+    rutas = listar_imagenes_arbol(entradas)
+    if not rutas:
+        raise ValueError("No se encontraron imágenes.")
+    guardar_caracteristicas_npy(rutas, ruta_indice, etiquetas=etiquetar(rutas, criterio), procesos=procesos,
+                                cache=cache, descriptores=descriptores, lienzo=lienzo)
+    guardar_rutas(ruta_indice, rutas)
+    return len(rutas)
+
+def cargar_indice(ruta_indice):
+    matriz, etiquetas = cargar_dataset(ruta_indice)
+    if etiquetas is None:
+        raise ValueError(f"El índice {ruta_indice} no tiene etiquetas.")
+    return matriz, np.array(etiquetas), cargar_rutas(ruta_indice)
+
+# División estratificada: de cada etiqueta va a prueba una fracción (1 - porcentaje_entrenamiento),
+# con al menos 'minimo_prueba' patrones por etiqueta y dejando siempre uno para entrenamiento.
+# Devuelve los índices (ordenados) de entrenamiento y de prueba.
+def dividir_estratificado(etiquetas, porcentaje_entrenamiento=0.8, semilla=None, minimo_prueba=1):
+    _, codigos = np.unique(etiquetas, return_inverse=True)
+    codigos = codigos.ravel()
+    # Permutación aleatoria agrupada por etiqueta (el orden estable conserva el azar dentro de cada grupo)
+    orden = np.random.default_rng(semilla).permutation(len(codigos))
+    orden = orden[np.argsort(codigos[orden], kind='stable')]
+
+    conteos = np.bincount(codigos)
+    posicion = np.arange(len(orden)) - np.repeat(np.cumsum(conteos) - conteos, conteos)  # Posición dentro del grupo
+    cantidad_prueba = np.rint(conteos * (1 - porcentaje_entrenamiento)).astype(int)
+    cantidad_prueba = np.minimum(np.maximum(cantidad_prueba, minimo_prueba), conteos - 1)
+    es_prueba = posicion < np.repeat(cantidad_prueba, conteos)
+    return np.sort(orden[~es_prueba]), np.sort(orden[es_prueba])
+
+# Escribe las filas 'indices' como .npy (con etiquetas al lado) o como CSV con columna 'Etiqueta'
+def guardar_subconjunto(ruta, matriz, etiquetas, indices):
+    datos = np.asarray(matriz[indices])
+    if ruta.endswith('.npy'):
+        guardar_dataset_npy(ruta, datos, etiquetas[indices].tolist())
+        return
+    import pandas as pd
+    df = pd.DataFrame(datos)
+    df['Etiqueta'] = etiquetas[indices]
+    df.to_csv(ruta, index=False)
+
+def ensamblar(matriz, etiquetas, salida_entrenamiento, salida_prueba, porcentaje_entrenamiento=0.8, semilla=None,
+              minimo_prueba=1):
+    entrenamiento, prueba = dividir_estratificado(etiquetas, porcentaje_entrenamiento, semilla, minimo_prueba)
+    guardar_subconjunto(salida_entrenamiento, matriz, etiquetas, entrenamiento)
+    guardar_subconjunto(salida_prueba, matriz, etiquetas, prueba)
+    clases = np.unique(etiquetas)
+    print(f"{len(entrenamiento)} patrones de entrenamiento -> {salida_entrenamiento}")
+    print(f"{len(prueba)} patrones de simulación -> {salida_prueba} "
+          f"({len(np.unique(etiquetas[prueba]))} de {len(clases)} etiquetas)")
+    return entrenamiento, prueba
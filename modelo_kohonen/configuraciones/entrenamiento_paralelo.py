@@ -0,0 +1,105 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from modelo_kohonen.configuraciones.creacionred import TAMANO_BLOQUE_LECTURA, buffer_trabajo, influencias_vecindad
+from modelo_kohonen.configuraciones.indice_bmu import distancias_cuadradas
+from modelo_kohonen.configuraciones.memoria_compartida import ESTADO_PROCESO, MemoriaCompartida, inicializar_proceso
+from modelo_kohonen.configuraciones.telemetria import errores_topograficos, sin_medicion
+
+# SOM por lotes en paralelo: el dataset se reparte en fragmentos (uno por proceso). En cada
+# época cada proceso calcula las vencedoras de su fragmento y sus sumas parciales
+# (numerador/denominador); el proceso principal las combina y actualiza los pesos.
+# Pesos, sumas parciales y tabla de distancias de la rejilla viven en memoria compartida
+# (ver configuraciones/memoria_compartida.py).
+
+def procesar_fragmento(tarea):
+    # Sumas parciales de un fragmento; se escriben en la ranura 'fragmento' de la memoria compartida.
+    # Devuelve la suma de distancias y, con telemetría, los errores topográficos del fragmento
+    fragmento, inicio, fin, radio = tarea
+    estado = ESTADO_PROCESO
+    pesos = estado['pesos']
+    numerador = estado['numeradores'][fragmento]
+    denominador = estado['denominadores'][fragmento]
+    numerador[:] = 0
+    denominador[:] = 0
+    suma_distancias = 0.0
+    errores = 0
+    dtype = estado['dtype_calculo']
+    buffers = estado.setdefault('buffers', {})  # Buffers de trabajo reutilizados entre bloques y épocas
+    num_neuronas = pesos.shape[1]
+    producto = buffer_trabajo(buffers, 'producto', pesos.shape, dtype)
+
+    for inicio_bloque in range(inicio, fin, estado['batch_size']):
+        bloque = estado['datos'][inicio_bloque:min(fin, inicio_bloque + estado['batch_size'])]
+        bloque = (bloque.astype(dtype, copy=False) - estado['media']) / estado['desviacion']
+        forma = (len(bloque), num_neuronas)
+        distancias = distancias_cuadradas(bloque, pesos, out=buffer_trabajo(buffers, 'distancias', forma, dtype))
+        vencedoras = np.argmin(distancias, axis=1)
+        suma_distancias += float(np.sum(np.sqrt(distancias[np.arange(len(bloque)), vencedoras])))
+        if estado['telemetria']:
+            errores += errores_topograficos(distancias, estado['distancias_red'])
+
+        influencias = influencias_vecindad(estado['distancias_red'], vencedoras, radio, estado['tipo_competencia'],
+                                           dtype, out=buffer_trabajo(buffers, 'influencias', forma, dtype))
+        numerador += np.matmul(bloque.T, influencias, out=producto)
+        denominador += influencias.sum(axis=0)
+    return suma_distancias, errores
+
+def entrenar_paralelo(red, dataset, procesos=None, batch_size=1024, mostrar_graficos=False, intervalo_graficos=1,
+                      continuar=False):
+    procesos = procesos or os.cpu_count() or 1
+    if not isinstance(dataset, np.memmap):
+        dataset = np.asarray(dataset)
+    red.preparar_normalizacion(
+        (dataset[inicio:inicio + TAMANO_BLOQUE_LECTURA] for inicio in range(0, len(dataset), TAMANO_BLOQUE_LECTURA)),
+        continuar)
+
+    # Fragmentos contiguos del dataset, uno por proceso
+    limites = np.linspace(0, len(dataset), procesos + 1).astype(int)
+    fragmentos = [(limites[i], limites[i + 1]) for i in range(procesos) if limites[i + 1] > limites[i]]
+
+    # La memoria compartida se libera al salir del 'with', también si el entrenamiento falla
+    with MemoriaCompartida() as compartida:
+        try:
+            compartida.publicar_dataset('datos', dataset)
+            # Pesos en su tipo de almacenamiento; las sumas parciales, en el de cálculo
+            compartida.publicar('pesos', red.pesos)
+            compartida.crear('numeradores', (len(fragmentos),) + red.pesos.shape, red.dtype_calculo)
+            compartida.crear('denominadores', (len(fragmentos), red.num_neuronas), red.dtype_calculo)
+            compartida.publicar('distancias_red', red.tabla_distancias())
+
+            parametros = {
+                'media': red.media,
+                'desviacion': red.desviacion,
+                'tipo_competencia': red.tipo_competencia,
+                'dtype_calculo': red.dtype_calculo.str,
+                'batch_size': batch_size,
+                'telemetria': red.telemetria is not None,
+            }
+
+            # Durante el entrenamiento la red trabaja directamente sobre los pesos compartidos
+            red.pesos = compartida['pesos']
+            with ProcessPoolExecutor(max_workers=len(fragmentos), initializer=inicializar_proceso,
+                                     initargs=(compartida.descripciones, parametros)) as pool:
+                def epoca(iteracion):
+                    # Los trabajadores calculan vencedoras y sumas parciales a la vez: todo cuenta como 'bmu'
+                    telemetria = red.telemetria
+                    fase = telemetria.fase if telemetria else sin_medicion
+                    radio = red.calcular_radio(iteracion)
+                    tareas = [(i, inicio, fin, radio) for i, (inicio, fin) in enumerate(fragmentos)]
+                    with fase('bmu'):
+                        resultados = list(pool.map(procesar_fragmento, tareas))
+                    # Reducción de las sumas parciales y una única actualización por época
+                    with fase('actualizacion'):
+                        red.aplicar_acumulado(compartida['numeradores'].sum(axis=0),
+                                              compartida['denominadores'].sum(axis=0))
+                    if telemetria:
+                        telemetria.patrones += len(dataset)
+                        telemetria.errores_topograficos += sum(errores for _, errores in resultados)
+                    return sum(suma for suma, _ in resultados) / len(dataset)
+
+                red.ejecutar_entrenamiento(epoca, mostrar_graficos, intervalo_graficos, continuar)
+        finally:
+            # Copiar los pesos fuera de la memoria compartida antes de liberarla
+            red.pesos = np.array(red.pesos)
+            red.version_pesos += 1
@@ -0,0 +1,172 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+from modelo_kohonen.configuraciones.dataset_binario import guardar_etiquetas
+
+# Las sumas por columna caben en 16 bits (imágenes de hasta 65535 píxeles de alto)
+DTYPE_CARACTERISTICAS = np.uint16
+EXTENSIONES_IMAGEN = (".png", ".jpg")
+
+# Descriptores disponibles, en el orden en que se concatenan:
+#   columnas   píxeles negros por columna (el descriptor original)
+#   filas      píxeles negros por fila
+#   zonas      píxeles negros en cada zona de una cuadrícula CUADRICULA_ZONAS
+#   mapa_bits  mapa de bits reducido a TAMANO_MAPA_BITS (1 si la celda es mayoritariamente negra)
+DESCRIPTORES = ('columnas', 'filas', 'zonas', 'mapa_bits')
+DESCRIPTORES_DEFECTO = ('columnas',)
+CUADRICULA_ZONAS = (4, 4)
+TAMANO_MAPA_BITS = (8, 8)
+
+# Abre una imagen y la binariza (True para negro). Con 'lienzo' = (alto, ancho) se
+# redimensiona antes, para que la longitud de los descriptores no dependa del tamaño
+def binarizar(filepath, lienzo=None):
+    from PIL import Image  # Solo se carga al extraer (no al simular ni entrenar)
+    img = Image.open(filepath).convert('L')  # Abrir la imagen en escala de grises
+    if lienzo is not None:
+        img = img.resize((lienzo[1], lienzo[0]), Image.BILINEAR)
+    return np.asarray(img) < 128
+
+# Píxeles negros de cada celda de una cuadrícula (filas x columnas) sobre un lote de imágenes
+# binarizadas (imágenes x alto x ancho). Las celdas se reparten lo más iguales posible, así que
+# el tamaño no tiene que ser múltiplo de la cuadrícula. Devuelve las sumas (en 'dtype') y el área de cada celda
+def sumas_por_celdas(binarizadas, cuadricula, dtype=DTYPE_CARACTERISTICAS):
+    _, alto, ancho = binarizadas.shape
+    if cuadricula[0] > alto or cuadricula[1] > ancho:
+        raise ValueError(f"La cuadrícula {cuadricula} no cabe en imágenes de {alto}x{ancho}; usa un lienzo mayor.")
+    limites_filas = np.linspace(0, alto, cuadricula[0] + 1).astype(int)
+    limites_columnas = np.linspace(0, ancho, cuadricula[1] + 1).astype(int)
+    sumas = np.add.reduceat(binarizadas, limites_filas[:-1], axis=1, dtype=dtype)
+    sumas = np.add.reduceat(sumas, limites_columnas[:-1], axis=2, dtype=dtype)
+    return sumas, np.outer(np.diff(limites_filas), np.diff(limites_columnas))
+
+# Descriptores de un lote de imágenes binarizadas del mismo tamaño, vectorizados sobre el lote
+def calcular_descriptores(binarizadas, descriptores=DESCRIPTORES_DEFECTO):
+    desconocidos = set(descriptores) - set(DESCRIPTORES)
+    if desconocidos:
+        raise ValueError(f"Descriptores no soportados: {sorted(desconocidos)}")
+    num_imagenes = len(binarizadas)
+    partes = []
+    for nombre in DESCRIPTORES:
+        if nombre not in descriptores:
+            continue
+        if nombre == 'columnas':
+            partes.append(binarizadas.sum(axis=1, dtype=DTYPE_CARACTERISTICAS))  # Sumar las columnas
+        elif nombre == 'filas':
+            partes.append(binarizadas.sum(axis=2, dtype=DTYPE_CARACTERISTICAS))
+        elif nombre == 'zonas':
+            sumas, _ = sumas_por_celdas(binarizadas, CUADRICULA_ZONAS)
+            partes.append(sumas.reshape(num_imagenes, -1))
+        else:
+            # En int64: con celdas de 32768 píxeles o más, 2 * sumas se desbordaría en uint16
+            sumas, areas = sumas_por_celdas(binarizadas, TAMANO_MAPA_BITS, np.int64)
+            partes.append((2 * sumas >= areas).astype(DTYPE_CARACTERISTICAS).reshape(num_imagenes, -1))
+    return np.concatenate(partes, axis=1)
+
+# Decodifica un lote de imágenes y calcula sus descriptores de una vez. Sin lienzo, si las
+# imágenes tienen tamaños distintos se calculan una a una
+def procesar_lote(rutas, descriptores=DESCRIPTORES_DEFECTO, lienzo=None):
+    binarizadas = [binarizar(ruta, lienzo) for ruta in rutas]
+    if len({b.shape for b in binarizadas}) == 1:
+        return calcular_descriptores(np.stack(binarizadas), descriptores)
+    return apilar([calcular_descriptores(b[np.newaxis], descriptores)[0] for b in binarizadas])
+
+# Función para procesar una imagen y devolver sus descriptores (por defecto, la suma de sus columnas)
+def procesar_imagen(filepath, descriptores=DESCRIPTORES_DEFECTO, lienzo=None):
+    return procesar_lote([filepath], descriptores, lienzo)[0]
+
+# Identifica la configuración de extracción (p. ej. para invalidar cachés)
+def clave_descriptores(descriptores=DESCRIPTORES_DEFECTO, lienzo=None):
+    clave = '+'.join(nombre for nombre in DESCRIPTORES if nombre in descriptores)
+    return clave if lienzo is None else f"{clave}@{lienzo[0]}x{lienzo[1]}"
+
+# Rutas de las imágenes de una carpeta
+def listar_imagenes(carpeta):
+    return [os.path.join(carpeta, f) for f in os.listdir(carpeta) if f.endswith(EXTENSIONES_IMAGEN)]
+
+def apilar(caracteristicas):
+    anchos = {len(fila) for fila in caracteristicas}
+    if len(anchos) > 1:
+        raise ValueError(f"Todas las imágenes deben tener el mismo ancho (encontrados: {sorted(anchos)}).")
+    return np.stack(caracteristicas)
+
+def concatenar(lotes):
+    return apilar([fila for lote in lotes for fila in lote]) if len(lotes) > 1 else lotes[0]
+
+# Extrae las características por bloques, decodificando las imágenes en un pool de procesos.
+# Cada proceso recibe un lote de imágenes y calcula sus descriptores de una vez.
+# Devuelve un generador de matrices (imágenes x características) en el mismo orden que 'rutas'.
+def extraer_caracteristicas(rutas, procesos=None, tamano_bloque=256, descriptores=DESCRIPTORES_DEFECTO, lienzo=None):
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1:
+        for inicio in range(0, len(rutas), tamano_bloque):
+            yield procesar_lote(rutas[inicio:inicio + tamano_bloque], descriptores, lienzo)
+        return
+
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        for inicio in range(0, len(rutas), tamano_bloque):
+            bloque = rutas[inicio:inicio + tamano_bloque]
+            tamano_lote = max(1, -(-len(bloque) // (procesos * 4)))
+            lotes = [bloque[i:i + tamano_lote] for i in range(0, len(bloque), tamano_lote)]
+            yield concatenar(list(pool.map(procesar_lote, lotes, repeat(descriptores), repeat(lienzo))))
+
+# Extrae las características de 'rutas' y las escribe en un CSV bloque a bloque.
+# Con una CacheCaracteristicas solo se decodifican las imágenes nuevas o modificadas.
+def guardar_caracteristicas_csv(rutas, output_filepath, etiquetas=None, procesos=None, tamano_bloque=256, cache=None,
+                               descriptores=DESCRIPTORES_DEFECTO, lienzo=None):
+    import pandas as pd
+    extraer = cache.extraer_caracteristicas if cache is not None else extraer_caracteristicas
+    inicio_tiempo = time.perf_counter()
+    procesadas = 0
+    with open(output_filepath, 'w', newline='') as archivo:
+        for caracteristicas in extraer(rutas, procesos, tamano_bloque, descriptores, lienzo):
+            df = pd.DataFrame(caracteristicas)
+            if etiquetas is not None:
+                df['Etiqueta'] = etiquetas[procesadas:procesadas + len(caracteristicas)]
+            df.to_csv(archivo, index=False, header=procesadas == 0)
+            procesadas += len(caracteristicas)
+    if cache is not None:
+        cache.guardar()
+
+    duracion = time.perf_counter() - inicio_tiempo
+    velocidad = procesadas / duracion if duracion > 0 else 0.0
+    print(f"{procesadas} imágenes procesadas en {duracion:.2f} s ({velocidad:.1f} imágenes/s) -> {output_filepath}")
+    return procesadas
+
+# Igual que guardar_caracteristicas_csv pero escribe un .npy (memoria mapeada) y las
+# etiquetas en el archivo de texto asociado
+def guardar_caracteristicas_npy(rutas, output_filepath, etiquetas=None, procesos=None, tamano_bloque=256, cache=None,
+                               descriptores=DESCRIPTORES_DEFECTO, lienzo=None):
+    extraer = cache.extraer_caracteristicas if cache is not None else extraer_caracteristicas
+    inicio_tiempo = time.perf_counter()
+    procesadas = 0
+    matriz = None
+    for caracteristicas in extraer(rutas, procesos, tamano_bloque, descriptores, lienzo):
+        # El ancho se conoce con el primer bloque
+        if matriz is None:
+            matriz = np.lib.format.open_memmap(output_filepath, mode='w+', dtype=caracteristicas.dtype,
+                                               shape=(len(rutas), caracteristicas.shape[1]))
+        matriz[procesadas:procesadas + len(caracteristicas)] = caracteristicas
+        procesadas += len(caracteristicas)
+
+    if matriz is None:
+        np.save(output_filepath, np.zeros((0, 0), dtype=DTYPE_CARACTERISTICAS))
+    else:
+        matriz.flush()
+        del matriz
+    if etiquetas is not None:
+        guardar_etiquetas(output_filepath, etiquetas)
+    if cache is not None:
+        cache.guardar()
+
+    duracion = time.perf_counter() - inicio_tiempo
+    velocidad = procesadas / duracion if duracion > 0 else 0.0
+    print(f"{procesadas} imágenes procesadas en {duracion:.2f} s ({velocidad:.1f} imágenes/s) -> {output_filepath}")
+    return procesadas
+
+# Elige el formato de salida por la extensión del archivo (.npy o .csv)
+def guardar_caracteristicas(rutas, output_filepath, **kwargs):
+    if output_filepath.endswith('.npy'):
+        return guardar_caracteristicas_npy(rutas, output_filepath, **kwargs)
+    return guardar_caracteristicas_csv(rutas, output_filepath, **kwargs)
@@ -0,0 +1,128 @@
+import threading
+import numpy as np
+
+# Tipo con el que se calcula sobre pesos de tipo 'dtype': float16 solo sirve para almacenar,
+# las operaciones se acumulan al menos en float32
+def tipo_calculo(dtype):
+    return np.result_type(dtype, np.float32)
+
+# Distancias al cuadrado (patrones x neuronas) usando ||x||² - 2x·W + ||w||².
+# Con 'out' el resultado se escribe en ese buffer, sin temporales del tamaño de la matriz
+def distancias_cuadradas(patrones, pesos, out=None):
+    pesos = pesos.astype(tipo_calculo(pesos.dtype), copy=False)
+    normas_patrones = np.einsum('ij,ij->i', patrones, patrones)
+    normas_pesos = np.einsum('ij,ij->j', pesos, pesos)
+    distancias = np.matmul(patrones, pesos, out=out)
+    distancias *= -2
+    distancias += normas_patrones[:, np.newaxis]
+    distancias += normas_pesos
+    return np.maximum(distancias, 0, out=distancias)  # Evitar negativos por redondeo
+
+# Índice aproximado para buscar la neurona vencedora (BMU) sin recorrer todo el mapa.
+# Cuantizador grueso: las neuronas se agrupan con k-means y cada consulta solo se compara
+# con las neuronas de los 'num_sondas' grupos más cercanos.
+class IndiceBMU:
+    def __init__(self, num_grupos=None, num_sondas=2, exacto=False, iteraciones_kmeans=10, rng=None):
+        self.num_grupos = num_grupos  # Por defecto sqrt(num_neuronas)
+        self.num_sondas = num_sondas
+        self.exacto = exacto  # Si es True se usa la búsqueda exacta por fuerza bruta
+        self.iteraciones_kmeans = iteraciones_kmeans
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.pesos = None
+        self.version = None
+        self.centroides = None
+        self.listas = []
+        self.ajustes = 0  # Patrones absorbidos con 'seguir' desde la última agrupación
+        # Serializa la reagrupación (en el hilo que simula) con 'seguir' (ajustar_parcial en otro hilo)
+        self.cerrojo = threading.Lock()
+
+    # El cerrojo no viaja al serializar (p. ej. una red con índice enviada a otro proceso)
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado['cerrojo']
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self.cerrojo = threading.Lock()
+
+    def desactualizado(self, pesos, version):
+        # El índice se reconstruye si cambió el array de pesos o su versión, o si desde la última
+        # agrupación se han absorbido tantos patrones incrementales como neuronas tiene el mapa
+        return self.pesos is not pesos or self.version != version or self.ajustes >= pesos.shape[1]
+
+    def seguir(self, pesos, version, patrones):
+        # Ajustes incrementales (ajustar_parcial): los grupos se conservan (los pesos se mueven poco)
+        # y solo se apunta a los pesos nuevos, sin volver a ejecutar k-means en cada ajuste
+        with self.cerrojo:
+            self.ajustes += patrones
+            self.version = version
+            self.pesos = pesos
+
+    def construir(self, pesos, version=None):
+        # Un 'seguir' que llegue durante la agrupación espera a que termine y se aplica después
+        with self.cerrojo:
+            self.pesos = pesos
+            self.version = version
+            self.ajustes = 0
+            if self.exacto:
+                return
+
+            vectores = pesos.T.astype(tipo_calculo(pesos.dtype), copy=False)  # Una fila por neurona
+            num_neuronas = len(vectores)
+            num_grupos = min(self.num_grupos or max(1, int(np.sqrt(num_neuronas))), num_neuronas)
+
+            centroides = vectores[self.rng.choice(num_neuronas, num_grupos, replace=False)].copy()
+            for _ in range(self.iteraciones_kmeans):
+                asignacion = np.argmin(distancias_cuadradas(vectores, centroides.T), axis=1)
+                sumas = np.zeros_like(centroides)
+                np.add.at(sumas, asignacion, vectores)
+                conteos = np.bincount(asignacion, minlength=num_grupos)
+                no_vacios = conteos > 0
+                centroides[no_vacios] = sumas[no_vacios] / conteos[no_vacios, np.newaxis]
+            asignacion = np.argmin(distancias_cuadradas(vectores, centroides.T), axis=1)
+            # Fuera los grupos vacíos (p. ej. centroides repetidos con pesos duplicados): una consulta
+            # que solo sondease grupos vacíos se quedaría sin candidatas
+            no_vacios = np.flatnonzero(np.bincount(asignacion, minlength=num_grupos))
+            renumeracion = np.zeros(num_grupos, dtype=np.intp)
+            renumeracion[no_vacios] = np.arange(len(no_vacios))
+            asignacion = renumeracion[asignacion]
+            centroides = centroides[no_vacios]
+            num_grupos = len(no_vacios)
+
+            # Lista de candidatas de cada grupo
+            orden = np.argsort(asignacion, kind='stable')
+            limites = np.searchsorted(asignacion[orden], np.arange(num_grupos + 1))
+            self.centroides = centroides.T
+            self.listas = [orden[limites[g]:limites[g + 1]] for g in range(num_grupos)]
+
+    def buscar(self, patrones, pesos=None):
+        # Devuelve las vencedoras y sus distancias al cuadrado. Con 'pesos' (p. ej. una instantánea
+        # de unos pesos ajustados después de agrupar) las candidatas se miden con esos pesos
+        pesos = self.pesos if pesos is None else pesos
+        patrones = np.atleast_2d(patrones)
+        filas = np.arange(len(patrones))
+        if self.exacto:
+            distancias = distancias_cuadradas(patrones, pesos)
+            vencedoras = np.argmin(distancias, axis=1)
+            return vencedoras, distancias[filas, vencedoras]
+
+        num_sondas = min(self.num_sondas, len(self.listas))
+        distancias_grupos = distancias_cuadradas(patrones, self.centroides)
+        sondas = np.argpartition(distancias_grupos, num_sondas - 1, axis=1)[:, :num_sondas]
+
+        vencedoras = np.zeros(len(patrones), dtype=int)
+        mejores = np.full(len(patrones), np.inf, dtype=self.centroides.dtype)
+        # Se procesan juntas todas las consultas que sondean el mismo grupo
+        for grupo in np.unique(sondas):
+            candidatas = self.listas[grupo]
+            if len(candidatas) == 0:
+                continue
+            consultas = np.flatnonzero((sondas == grupo).any(axis=1))
+            distancias = distancias_cuadradas(patrones[consultas], pesos[:, candidatas])
+            locales = np.argmin(distancias, axis=1)
+            minimas = distancias[np.arange(len(consultas)), locales]
+            mejora = minimas < mejores[consultas]
+            mejores[consultas[mejora]] = minimas[mejora]
+            vencedoras[consultas[mejora]] = candidatas[locales[mejora]]
+        return vencedoras, mejores
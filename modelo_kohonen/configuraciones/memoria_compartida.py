@@ -0,0 +1,71 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+# Arrays compartidos con un pool de procesos (entrenamiento paralelo y barrido de
+# hiperparámetros). El proceso principal los publica dentro de un 'with MemoriaCompartida()',
+# que libera la memoria al salir; cada trabajador los abre en inicializar_proceso por su
+# descripción. Un dataset que ya es un .npy completo con memoria mapeada no se copia: cada
+# proceso abre el archivo.
+
+# Estado de cada proceso trabajador: arrays abiertos y parámetros (se rellena en inicializar_proceso)
+ESTADO_PROCESO = {}
+
+def es_npy_completo(dataset):
+    if not isinstance(dataset, np.memmap) or not dataset.filename or not dataset.filename.endswith('.npy'):
+        return False
+    completo = np.load(dataset.filename, mmap_mode='r')
+    return completo.shape == dataset.shape and completo.dtype == dataset.dtype
+
+class MemoriaCompartida:
+    def __init__(self):
+        self.memorias = []
+        self.arrays = {}  # nombre -> array sobre la memoria compartida (solo en el proceso principal)
+        self.descripciones = {}  # nombre -> descripción para abrir el array en los trabajadores
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def __getitem__(self, nombre):
+        return self.arrays[nombre]
+
+    def crear(self, nombre, forma, dtype):
+        memoria = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(forma)) * np.dtype(dtype).itemsize))
+        self.memorias.append(memoria)
+        self.arrays[nombre] = np.ndarray(forma, dtype=dtype, buffer=memoria.buf)
+        self.descripciones[nombre] = ('compartido', (memoria.name, forma, np.dtype(dtype).str))
+        return self.arrays[nombre]
+
+    def publicar(self, nombre, array):
+        self.crear(nombre, array.shape, array.dtype)[:] = array
+
+    def publicar_dataset(self, nombre, dataset):
+        # Un .npy completo con memoria mapeada lo abre cada proceso; si no, se copia una vez
+        if es_npy_completo(dataset):
+            self.descripciones[nombre] = ('npy', dataset.filename)
+        else:
+            self.publicar(nombre, dataset)
+
+    def cerrar(self):
+        # Quien tenga referencias a los arrays debe soltarlas (o copiarlas) antes de cerrar
+        self.arrays.clear()
+        for memoria in self.memorias:
+            memoria.close()
+            memoria.unlink()
+        self.memorias = []
+
+def abrir(descripcion):
+    tipo, origen = descripcion
+    if tipo == 'npy':
+        return np.load(origen, mmap_mode='r')
+    nombre, forma, dtype = origen
+    memoria = shared_memory.SharedMemory(name=nombre)
+    ESTADO_PROCESO.setdefault('memorias', []).append(memoria)  # Mantener viva la referencia
+    return np.ndarray(forma, dtype=dtype, buffer=memoria.buf)
+
+def inicializar_proceso(descripciones, parametros):
+    for nombre, descripcion in descripciones.items():
+        ESTADO_PROCESO[nombre] = abrir(descripcion)
+    ESTADO_PROCESO.update(parametros)
@@ -0,0 +1,78 @@
+import numpy as np
+
+# Métricas de calidad de un mapa entrenado, vectorizadas y por bloques (un dataset grande no se
+# carga entero ni se recorre patrón a patrón, así que se pueden calcular en cada época):
+# - error de cuantización: distancia media de cada patrón a su vencedora
+# - error topográfico: fracción de patrones cuyas dos neuronas más cercanas no son vecinas en la
+#   rejilla; las dos mejores salen de una sola ordenación parcial (argpartition)
+# - aciertos: histograma de cuántos patrones gana cada neurona (las que tienen 0 están muertas)
+# - matriz U: distancia media de los pesos de cada neurona a los de sus vecinas en la rejilla
+DISTANCIA_ADYACENTES = 1.001  # Vecinos directos en la rejilla (4 en rectangular, 6 en hexagonal), con margen float32
+
+# Índices (patrones x 2) de la vencedora y la segunda mejor de cada patrón
+def dos_mejores(distancias):
+    distancias = np.atleast_2d(distancias)
+    if distancias.shape[1] < 2:
+        return np.zeros((len(distancias), 2), dtype=np.intp)
+    return np.argpartition(distancias, 1, axis=1)[:, :2]
+
+# Cuántos pares (vencedora, segunda) no son vecinos en la rejilla
+def contar_errores_topograficos(mejores, distancias_red):
+    return int(np.count_nonzero(distancias_red[mejores[:, 0], mejores[:, 1]] > DISTANCIA_ADYACENTES))
+
+# Pares (i, j) de neuronas vecinas en la rejilla, en ambos sentidos
+def pares_adyacentes(distancias_red):
+    distancias_red = np.asarray(distancias_red)
+    return np.nonzero((distancias_red > 0) & (distancias_red <= DISTANCIA_ADYACENTES))
+
+# Matriz U por neurona (vector de longitud num_neuronas); 'pesos' es (entradas x neuronas)
+def matriz_u(pesos, pares):
+    origen, destino = pares
+    num_neuronas = pesos.shape[1]
+    diferencias = pesos[:, origen] - pesos[:, destino]
+    distancias = np.sqrt(np.einsum('ij,ij->j', diferencias, diferencias, dtype=np.float64))
+    suma = np.bincount(origen, weights=distancias, minlength=num_neuronas)
+    vecinos = np.bincount(origen, minlength=num_neuronas)
+    return np.divide(suma, vecinos, out=np.zeros(num_neuronas), where=vecinos > 0)
+
+# Recorre 'datos' en bloques de 'tamano_bloque' con los pesos actuales de 'red' (o 'pesos')
+def metricas_mapa(red, datos, tamano_bloque, pesos=None):
+    pesos = red.pesos if pesos is None else pesos
+    suma_distancias = 0.0  # float de Python: la suma se acumula en float64
+    errores = 0
+    aciertos = np.zeros(red.num_neuronas, dtype=np.int64)
+    for inicio in range(0, len(datos), tamano_bloque):
+        distancias = red.calcular_distancias_bloque(red.normalizar(datos[inicio:inicio + tamano_bloque]), pesos)
+        mejores = dos_mejores(distancias)
+        vencedoras = mejores[:, 0]
+        suma_distancias += float(np.sum(np.sqrt(np.maximum(distancias[np.arange(len(distancias)), vencedoras], 0))))
+        errores += contar_errores_topograficos(mejores, red.tabla_distancias())
+        aciertos += np.bincount(vencedoras, minlength=red.num_neuronas)
+    num_patrones = len(datos)
+    if num_patrones == 0:
+        raise ValueError("El dataset no contiene patrones.")
+    return {
+        'patrones': num_patrones,
+        'error_cuantizacion': suma_distancias / num_patrones,
+        'error_topografico': errores / num_patrones,
+        'aciertos': aciertos,
+        'neuronas_muertas': int(np.count_nonzero(aciertos == 0)),
+        'matriz_u': matriz_u(np.asarray(pesos, dtype=np.float64), red.pares_adyacentes()),
+    }
+
+def informe_metricas(metricas, filas, columnas):
+    aciertos = metricas['aciertos']
+    u = metricas['matriz_u']
+    lineas = [f"Patrones: {metricas['patrones']}",
+              f"Error de cuantización: {metricas['error_cuantizacion']:.6f}",
+              f"Error topográfico: {metricas['error_topografico']:.6f}",
+              f"Neuronas sin aciertos: {metricas['neuronas_muertas']}/{len(aciertos)}",
+              f"Aciertos por neurona: mín {aciertos.min()}, media {aciertos.mean():.1f}, máx {aciertos.max()}",
+              f"Matriz U: mín {u.min():.6f}, media {u.mean():.6f}, máx {u.max():.6f}"]
+    if filas * columnas <= 400:  # Solo se dibujan los mapas pequeños
+        lineas.append("")
+        lineas.append("Aciertos por neurona (filas x columnas):")
+        ancho = len(str(aciertos.max()))
+        for fila in aciertos.reshape(filas, columnas):
+            lineas.append(' '.join(f"{valor:>{ancho}}" for valor in fila))
+    return "\n".join(lineas)
@@ -0,0 +1,106 @@
+import json
+import os
+import shutil
+import numpy as np
+from modelo_kohonen.configuraciones.creacionred import RedKohonen
+
+# Paquete de modelo: una carpeta con
+#   pesos.npy              pesos (entradas x neuronas)
+#   conteos_etiquetas.npy  (opcional) patrones de cada etiqueta ganados por cada neurona
+#   mejores_pesos.npy      (opcional) pesos del mejor DM, para restaurarlos al reanudar el entrenamiento
+#   modelo.json            topología, hiperparámetros, normalización y estado del entrenamiento
+# Los pesos se abren con memoria mapeada. Las distancias de la rejilla no se guardan (dependen
+# solo de topología, filas y columnas): la red las calcula la primera vez que necesita una
+# vecindad, así que cargar un modelo solo para simular no las construye. Los paquetes antiguos
+# que aún traen distancias_red.npy se cargan igual (el archivo se ignora).
+VERSION_FORMATO = 1
+
+def estado_modelo(red):
+    return {
+        'version_formato': VERSION_FORMATO,
+        'num_entradas': red.num_entradas,
+        'tipo_competencia': red.tipo_competencia,
+        'tasa_aprendizaje_inicial': red.tasa_aprendizaje_inicial,
+        'num_iteraciones': red.num_iteraciones,
+        'topologia': red.topologia,
+        'dtype': red.dtype.name,
+        'filas': red.filas,
+        'columnas': red.columnas,
+        'media': None if red.media is None else float(red.media),
+        'desviacion': None if red.desviacion is None else float(red.desviacion),
+        'tasa_aprendizaje': float(red.tasa_aprendizaje),
+        'iteracion_actual': red.iteracion_actual,
+        'dm_values': [float(dm) for dm in red.dm_values],
+        'mejor_dm': None if np.isinf(red.mejor_dm) else float(red.mejor_dm),
+        'mejor_iteracion': red.mejor_iteracion,
+        'epocas_sin_mejora': red.epocas_sin_mejora,
+        'clases': None if red.clases is None else red.clases.tolist(),
+        'patrones_incrementales': red.patrones_incrementales,
+    }
+
+def rutas_intercambio(ruta):
+    ruta = ruta.rstrip('/\\')
+    return ruta + '.tmp', ruta + '.old'
+
+def guardar_modelo(red, ruta):
+    # Se escribe en una carpeta temporal y se intercambia al final. Entre los dos os.replace no
+    # hay nada en 'ruta': si el proceso muere ahí, el modelo anterior sigue completo en
+    # <ruta>.old y cargar_modelo lo usa
+    temporal, anterior = rutas_intercambio(ruta)
+    shutil.rmtree(temporal, ignore_errors=True)
+    os.makedirs(temporal)
+    np.save(os.path.join(temporal, 'pesos.npy'), np.asarray(red.pesos))
+    if red.conteos_etiquetas is not None:
+        np.save(os.path.join(temporal, 'conteos_etiquetas.npy'), np.asarray(red.conteos_etiquetas))
+    if red.mejores_pesos is not None:
+        np.save(os.path.join(temporal, 'mejores_pesos.npy'), red.mejores_pesos)
+    with open(os.path.join(temporal, 'modelo.json'), 'w', encoding='utf-8') as archivo:
+        json.dump(estado_modelo(red), archivo, indent=2)
+
+    # Si 'ruta' no existe (guardado anterior interrumpido) se conserva <ruta>.old hasta el final
+    if os.path.exists(ruta):
+        shutil.rmtree(anterior, ignore_errors=True)
+        os.replace(ruta, anterior)
+    os.replace(temporal, ruta)
+    shutil.rmtree(anterior, ignore_errors=True)
+
+# Carpeta con el último modelo completo: 'ruta' o, tras un guardado interrumpido, <ruta>.old
+def ruta_vigente(ruta):
+    _, anterior = rutas_intercambio(ruta)
+    if not os.path.exists(os.path.join(ruta, 'modelo.json')) and os.path.exists(os.path.join(anterior, 'modelo.json')):
+        return anterior
+    return ruta
+
+# mmap_mode='c' (copia en escritura) permite seguir entrenando sin modificar los archivos
+def cargar_modelo(ruta, mmap_mode='c'):
+    ruta = ruta_vigente(ruta)
+    with open(os.path.join(ruta, 'modelo.json'), encoding='utf-8') as archivo:
+        estado = json.load(archivo)
+    if estado.get('version_formato') != VERSION_FORMATO:
+        raise ValueError(f"Versión de modelo no soportada: {estado.get('version_formato')}")
+
+    red = RedKohonen(
+        num_entradas=estado['num_entradas'],
+        tipo_competencia=estado['tipo_competencia'],
+        tasa_aprendizaje=estado['tasa_aprendizaje_inicial'],
+        num_iteraciones=estado['num_iteraciones'],
+        topologia=estado['topologia'],
+        filas=estado['filas'],
+        columnas=estado['columnas'],
+        pesos=np.load(os.path.join(ruta, 'pesos.npy'), mmap_mode=mmap_mode),
+        dtype=estado.get('dtype', 'float64'),  # Los modelos anteriores a este campo eran float64
+    )
+    red.media = estado['media']
+    red.desviacion = estado['desviacion']
+    red.tasa_aprendizaje = estado['tasa_aprendizaje']
+    red.iteracion_actual = estado['iteracion_actual']
+    red.dm_values = estado['dm_values']
+    red.mejor_dm = float('inf') if estado['mejor_dm'] is None else estado['mejor_dm']
+    red.mejor_iteracion = estado.get('mejor_iteracion')
+    red.epocas_sin_mejora = estado.get('epocas_sin_mejora', 0)
+    if os.path.exists(os.path.join(ruta, 'mejores_pesos.npy')):
+        red.mejores_pesos = np.load(os.path.join(ruta, 'mejores_pesos.npy'), mmap_mode=mmap_mode)
+    red.patrones_incrementales = estado.get('patrones_incrementales', 0)
+    if estado.get('clases') is not None:
+        red.cargar_etiquetas(estado['clases'], np.load(os.path.join(ruta, 'conteos_etiquetas.npy')))
+    return red
@@ -0,0 +1,151 @@
+import contextlib
+import csv
+import json
+import os
+import time
+import numpy as np
+from modelo_kohonen.configuraciones.metricas import contar_errores_topograficos, dos_mejores
+
+# Telemetría del entrenamiento: la red emite un evento (diccionario) por época con los tiempos
+# de cada fase, el rendimiento y las métricas de calidad del mapa. Un sumidero es cualquier
+# función que reciba el evento; aquí se incluyen CSV, JSONL y un exportador de texto para
+# Prometheus. Sin telemetría activa la red no mide nada (red.telemetria es None).
+FASES = ('bmu', 'actualizacion', 'graficos', 'io')
+
+SIN_MEDICION = contextlib.nullcontext()
+
+def sin_medicion(fase):
+    return SIN_MEDICION
+
+# Patrones cuyas dos neuronas más cercanas no son vecinas en la rejilla (error topográfico)
+def errores_topograficos(distancias, distancias_red):
+    return contar_errores_topograficos(dos_mejores(distancias), distancias_red)
+
+class MedicionFase:
+    def __init__(self, tiempos, fase):
+        self.tiempos = tiempos
+        self.fase = fase
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+
+    def __exit__(self, *excepcion):
+        self.tiempos[self.fase] += time.perf_counter() - self.inicio
+
+class Telemetria:
+    def __init__(self, *sumideros):
+        self.sumideros = list(sumideros)
+        self.iniciar_epoca()
+
+    def suscribir(self, sumidero):
+        self.sumideros.append(sumidero)
+
+    def iniciar_epoca(self):
+        self.tiempos = dict.fromkeys(FASES, 0.0)
+        self.patrones = 0
+        self.errores_topograficos = 0
+        self.inicio_epoca = time.perf_counter()
+
+    def fase(self, nombre):
+        return MedicionFase(self.tiempos, nombre)
+
+    def medir_iterador(self, iterador, fase='io'):
+        # El tiempo de espera de cada elemento (lectura y mezcla de bloques) cuenta como 'fase'
+        iterador = iter(iterador)
+        while True:
+            with self.fase(fase):
+                elemento = next(iterador, None)
+            if elemento is None:
+                return
+            yield elemento
+
+    def contar(self, distancias, distancias_red):
+        distancias = np.atleast_2d(distancias)
+        self.patrones += len(distancias)
+        self.errores_topograficos += errores_topograficos(distancias, distancias_red)
+
+    def cerrar_epoca(self, iteracion, dm, tasa_aprendizaje, radio):
+        segundos = time.perf_counter() - self.inicio_epoca
+        evento = {
+            'evento': 'epoca',
+            'marca_tiempo': time.time(),
+            'iteracion': iteracion,
+            'patrones': self.patrones,
+            'segundos': segundos,
+            'patrones_por_segundo': self.patrones / segundos if segundos > 0 else 0.0,
+            'tasa_aprendizaje': float(tasa_aprendizaje),
+            'radio': float(radio),
+            'error_cuantizacion': float(dm),  # El DM: distancia media de cada patrón a su vencedora
+            'error_topografico': self.errores_topograficos / self.patrones if self.patrones else 0.0,
+        }
+        for fase in FASES:
+            evento[f'tiempo_{fase}'] = self.tiempos[fase]
+        self.emitir(evento)
+        return evento
+
+    def emitir(self, evento):
+        for sumidero in self.sumideros:
+            sumidero(evento)
+
+    def cerrar(self):
+        for sumidero in self.sumideros:
+            if hasattr(sumidero, 'cerrar'):
+                sumidero.cerrar()
+
+class SumideroJSONL:
+    def __init__(self, ruta):
+        self.archivo = open(ruta, 'a', encoding='utf-8')
+
+    def __call__(self, evento):
+        self.archivo.write(json.dumps(evento) + '\n')
+        self.archivo.flush()
+
+    def cerrar(self):
+        self.archivo.close()
+
+class SumideroCSV:
+    # Las columnas se fijan con el primer evento
+    def __init__(self, ruta):
+        self.archivo = open(ruta, 'w', newline='', encoding='utf-8')
+        self.escritor = None
+
+    def __call__(self, evento):
+        if self.escritor is None:
+            self.escritor = csv.DictWriter(self.archivo, fieldnames=list(evento), extrasaction='ignore')
+            self.escritor.writeheader()
+        self.escritor.writerow(evento)
+        self.archivo.flush()
+
+    def cerrar(self):
+        self.archivo.close()
+
+class ExportadorPrometheus:
+    # Formato de texto de Prometheus con los valores de la última época. Con 'ruta' se reescribe
+    # el archivo en cada época (p. ej. para el textfile collector de node_exporter)
+    def __init__(self, ruta=None, prefijo='kohonen'):
+        self.ruta = ruta
+        self.prefijo = prefijo
+        self.ultimo = None
+        self.epocas = 0
+
+    def __call__(self, evento):
+        self.ultimo = evento
+        self.epocas += 1
+        if self.ruta:
+            temporal = self.ruta + '.tmp'
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                archivo.write(self.texto())
+            os.replace(temporal, self.ruta)
+
+    def texto(self):
+        lineas = [f"# TYPE {self.prefijo}_epocas_total counter", f"{self.prefijo}_epocas_total {self.epocas}"]
+        if self.ultimo is None:
+            return '\n'.join(lineas) + '\n'
+        for clave in ('iteracion', 'patrones_por_segundo', 'tasa_aprendizaje', 'radio',
+                      'error_cuantizacion', 'error_topografico', 'segundos'):
+            lineas.append(f"# TYPE {self.prefijo}_{clave} gauge")
+            lineas.append(f"{self.prefijo}_{clave} {self.ultimo[clave]}")
+        lineas.append(f"# TYPE {self.prefijo}_tiempo_fase_segundos gauge")
+        for fase in FASES:
+            lineas.append(f'{self.prefijo}_tiempo_fase_segundos{{fase="{fase}"}} {self.ultimo["tiempo_" + fase]}')
+        return '\n'.join(lineas) + '\n'
@@ -1,9 +1,9 @@
 import tkinter as tk
 from tkinter import messagebox
-import matplotlib.pyplot as plt
 
 # Función para graficar los datos ingresados
 def graficar():
+    import matplotlib.pyplot as plt
     try:
         datos = [int(i) for i in entry_datos.get().split(',')]
         plt.plot(datos)
@@ -12,17 +12,23 @@ def graficar():
     except ValueError:
         messagebox.showerror("Error", "Ingresa datos numéricos separados por comas.")
 
-# Configuración de la ventana principal
-root = tk.Tk()
-root.title("Interfaz de Gráfico")
+def main():
+    global entry_datos
 
-label = tk.Label(root, text="Ingresa los datos separados por comas:")
-label.pack(padx=10, pady=5)
+    # Configuración de la ventana principal
+    root = tk.Tk()
+    root.title("Interfaz de Gráfico")
 
-entry_datos = tk.Entry(root, width=40)
-entry_datos.pack(padx=10, pady=5)
+    label = tk.Label(root, text="Ingresa los datos separados por comas:")
+    label.pack(padx=10, pady=5)
 
-button_graficar = tk.Button(root, text="Graficar", command=graficar)
-button_graficar.pack(padx=10, pady=10)
+    entry_datos = tk.Entry(root, width=40)
+    entry_datos.pack(padx=10, pady=5)
 
-root.mainloop()
+    button_graficar = tk.Button(root, text="Graficar", command=graficar)
+    button_graficar.pack(padx=10, pady=10)
+
+    root.mainloop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import numpy as np
+from modelo_kohonen.configuraciones.clasificacion import codificar, informe_confusion, matriz_confusion
+
+# Tabla de texto con el resultado de RedKohonen.simular_lote
+def tabla_resumen(resultado, umbral=0.1, max_filas=None):
+    diferencias = resultado['diferencias_promedio']
+    similares = diferencias < umbral  # Umbral ejemplo
+    num_patrones = len(diferencias)
+    num_filas = num_patrones if max_filas is None else min(max_filas, num_patrones)
+
+    # Con una red etiquetada se añaden la etiqueta predicha y su confianza
+    etiquetada = 'etiquetas' in resultado
+    encabezado = f"{'Patrón':>8} {'Neurona':>8} {'Coordenadas':>12} {'Distancia':>10} {'Dif. prom.':>10} {'Similar':>8}"
+    lineas = [encabezado + (f" {'Etiqueta':>9} {'Conf.':>6}" if etiquetada else "")]
+    for i in range(num_filas):
+        fila, columna = resultado['coordenadas'][i]
+        coordenadas = f"({fila}, {columna})"
+        linea = (f"{i + 1:>8} {resultado['vencedoras'][i]:>8} {coordenadas:>12} "
+                 f"{resultado['distancias'][i]:>10.4f} {diferencias[i]:>10.4f} {'sí' if similares[i] else 'no':>8}")
+        if etiquetada:
+            linea += f" {resultado['etiquetas'][i]:>9} {resultado['confianzas'][i]:>6.2f}"
+        lineas.append(linea)
+    if num_filas < num_patrones:
+        lineas.append(f"... {num_patrones - num_filas} patrones más")
+
+    lineas.append("")
+    lineas.append(f"Patrones simulados: {num_patrones}")
+    lineas.append(f"Neuronas vencedoras distintas: {len(np.unique(resultado['vencedoras']))}")
+    lineas.append(f"Distancia media: {np.mean(resultado['distancias']):.4f}")
+    lineas.append(f"Diferencia promedio media: {np.mean(diferencias):.4f}")
+    lineas.append(f"Patrones similares a su vencedora (dif. < {umbral}): {np.sum(similares)}")
+    return "\n".join(lineas)
+
+# Resumen de la simulación y, si los patrones tienen etiqueta real y la red está etiquetada,
+# la matriz de confusión
+def informe_simulacion(resultado, etiquetas_reales=None, clases=None, umbral=0.1, max_filas=None):
+    texto = tabla_resumen(resultado, umbral=umbral, max_filas=max_filas)
+    if etiquetas_reales is None or 'etiquetas' not in resultado:
+        return texto
+    _, reales = codificar(etiquetas_reales, clases)
+    _, predichas = codificar(resultado['etiquetas'], clases)
+    desconocidas = int(np.count_nonzero(reales < 0))
+    texto += "\n\n" + informe_confusion(matriz_confusion(reales, predichas, len(clases)), clases)
+    if desconocidas:
+        texto += f"\n{desconocidas} patrones con etiquetas que la red no conoce (no contados)"
+    return texto
@@ -0,0 +1,317 @@
+# Servidor de inferencia: carga un modelo una sola vez y atiende peticiones HTTP (por TCP o por
+# socket Unix) con asyncio. Las peticiones concurrentes se agrupan en micro-lotes, de modo que
+# cada lote se resuelve con una única búsqueda vectorizada de vencedoras (simular_lote).
+# Uso (desde la raíz del repositorio):
+#   python -m modelo_kohonen serve modelo --puerto 8080
+#   python -m modelo_kohonen serve modelo --socket /tmp/kohonen.sock --descriptores columnas filas
+# Rutas:
+#   GET  /salud            entradas, neuronas y topología del modelo
+#   GET  /estadisticas     lotes atendidos y tamaño medio de lote
+#   POST /simular          JSON {"patron": [...]} o {"patrones": [[...], ...]}
+#   POST /simular/imagen   bytes de una imagen (PNG/JPG); se extraen los descriptores configurados
+#   POST /ajustar          (solo con --aprendizaje) JSON {"patrones": [...], "etiquetas": [...]}: absorbe
+#                          los patrones en el mapa con RedKohonen.ajustar_parcial sin detener la simulación
+# Cada patrón devuelve su neurona vencedora, sus coordenadas en la rejilla y la distancia; si el
+# modelo está etiquetado, también la etiqueta predicha y su confianza.
+import asyncio
+import contextlib
+import io
+import json
+import os
+import signal
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from modelo_kohonen.configuraciones.extraccion import DESCRIPTORES_DEFECTO, binarizar, calcular_descriptores
+
+LOTE_MAXIMO = 256  # Patrones por micro-lote
+ESPERA_MAXIMA = 0.002  # Segundos que se espera a más peticiones antes de resolver un lote incompleto
+TAMANO_MAXIMO_CUERPO = 16 * 2 ** 20
+CLAVES_RESULTADO = ('vencedoras', 'coordenadas', 'distancias', 'etiquetas', 'confianzas')
+ESTADOS_HTTP = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+class ErrorPeticion(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+class AgrupadorLotes:
+    # La red reutiliza buffers internos y no es segura entre hilos: toda la inferencia se hace en
+    # un único hilo y el bucle de eventos sigue aceptando peticiones mientras se resuelve un lote
+    # (las que llegan en ese tiempo forman el siguiente)
+    def __init__(self, red, lote_maximo=LOTE_MAXIMO, espera_maxima=ESPERA_MAXIMA):
+        self.red = red
+        self.lote_maximo = lote_maximo
+        self.espera_maxima = espera_maxima
+        self.cola = asyncio.Queue()
+        self.hilo = ThreadPoolExecutor(max_workers=1)
+        self.tarea = None
+        self.lotes = 0
+        self.patrones = 0
+
+    def iniciar(self):
+        self.tarea = asyncio.get_running_loop().create_task(self.atender())
+
+    async def cerrar(self):
+        if self.tarea is not None:
+            self.tarea.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.tarea
+        self.hilo.shutdown()
+
+    async def simular(self, patrones):
+        futuro = asyncio.get_running_loop().create_future()
+        self.cola.put_nowait((patrones, futuro))
+        return await futuro
+
+    async def siguiente_lote(self):
+        bucle = asyncio.get_running_loop()
+        pendientes = [await self.cola.get()]
+        num_patrones = len(pendientes[0][0])
+        limite = bucle.time() + self.espera_maxima
+        while num_patrones < self.lote_maximo:
+            if self.cola.empty():
+                restante = limite - bucle.time()
+                if restante <= 0:
+                    break
+                try:
+                    elemento = await asyncio.wait_for(self.cola.get(), restante)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                elemento = self.cola.get_nowait()
+            pendientes.append(elemento)
+            num_patrones += len(elemento[0])
+        return pendientes
+
+    async def atender(self):
+        bucle = asyncio.get_running_loop()
+        while True:
+            pendientes = await self.siguiente_lote()
+            # Un fallo en un lote se entrega a sus peticiones; el bucle sigue atendiendo los siguientes
+            try:
+                await self.resolver(bucle, pendientes)
+            except Exception as error:
+                for _, futuro in pendientes:
+                    if not futuro.done():
+                        futuro.set_exception(error)
+
+    async def resolver(self, bucle, pendientes):
+        patrones = np.concatenate([patrones for patrones, _ in pendientes])
+        resultado = await bucle.run_in_executor(self.hilo, self.red.simular_lote, patrones)
+        self.lotes += 1
+        self.patrones += len(patrones)
+
+        # Repartir el resultado entre las peticiones del lote (las de clientes que ya se
+        # desconectaron tienen el futuro cancelado)
+        inicio = 0
+        for patrones, futuro in pendientes:
+            fin = inicio + len(patrones)
+            if not futuro.done():
+                futuro.set_result({clave: resultado[clave][inicio:fin] for clave in CLAVES_RESULTADO
+                                   if clave in resultado})
+            inicio = fin
+
+class ServidorInferencia:
+    def __init__(self, red, descriptores=DESCRIPTORES_DEFECTO, lienzo=None, lote_maximo=LOTE_MAXIMO,
+                 espera_maxima=ESPERA_MAXIMA, aprendizaje=False):
+        self.red = red
+        self.aprendizaje = aprendizaje
+        # Los ajustes se aplican de uno en uno en su propio hilo; la simulación sigue con la
+        # instantánea de pesos anterior hasta que el ajuste sustituye la referencia. Si la red usa
+        # índice de vencedoras, su reagrupación y el ajuste se serializan con el cerrojo del índice
+        self.hilo_ajustes = ThreadPoolExecutor(max_workers=1) if aprendizaje else None
+        self.descriptores = descriptores
+        self.lienzo = lienzo
+        self.lote_maximo = lote_maximo
+        self.espera_maxima = espera_maxima
+        self.agrupador = None
+
+    def validar_patrones(self, patrones):
+        try:
+            patrones = np.atleast_2d(np.asarray(patrones, dtype=float))
+        except (TypeError, ValueError):
+            raise ErrorPeticion(400, "Los patrones deben ser listas de números.")
+        if patrones.ndim != 2 or patrones.shape[1] != self.red.num_entradas or len(patrones) == 0:
+            raise ErrorPeticion(400, f"Cada patrón debe tener {self.red.num_entradas} entradas.")
+        if not np.all(np.isfinite(patrones)):
+            raise ErrorPeticion(400, "Los patrones contienen valores no finitos.")
+        return patrones
+
+    def patrones_json(self, cuerpo):
+        try:
+            datos = json.loads(cuerpo)
+        except (UnicodeDecodeError, ValueError):
+            raise ErrorPeticion(400, "El cuerpo no es JSON válido.")
+        if not isinstance(datos, dict) or ('patron' not in datos and 'patrones' not in datos):
+            raise ErrorPeticion(400, "Se esperaba un objeto con 'patron' o 'patrones'.")
+        return self.validar_patrones(datos['patron'] if 'patron' in datos else datos['patrones'])
+
+    def patrones_imagen(self, cuerpo):
+        # Se ejecuta fuera del bucle de eventos (decodificar la imagen no toca la red)
+        try:
+            binarizada = binarizar(io.BytesIO(cuerpo), self.lienzo)
+        except Exception:
+            raise ErrorPeticion(400, "No se pudo decodificar la imagen.")
+        try:
+            caracteristicas = calcular_descriptores(binarizada[np.newaxis], self.descriptores)
+        except ValueError as error:
+            raise ErrorPeticion(400, str(error))
+        return self.validar_patrones(caracteristicas)
+
+    async def ajustar(self, cuerpo):
+        patrones = self.patrones_json(cuerpo)
+        etiquetas = json.loads(cuerpo).get('etiquetas')
+        if etiquetas is not None and (not isinstance(etiquetas, list) or len(etiquetas) != len(patrones)):
+            raise ErrorPeticion(400, "Se esperaba una etiqueta por patrón.")
+        try:
+            vencedoras, _ = await asyncio.get_running_loop().run_in_executor(
+                self.hilo_ajustes, self.red.ajustar_parcial, patrones, etiquetas)
+        except ValueError as error:  # P. ej. una red sin normalización y un lote sin dispersión
+            raise ErrorPeticion(400, str(error))
+        return {'ajustados': len(vencedoras), 'patrones_incrementales': self.red.patrones_incrementales}
+
+    def estadisticas(self):
+        lotes = self.agrupador.lotes
+        return {
+            'lotes': lotes,
+            'patrones': self.agrupador.patrones,
+            'patrones_por_lote': self.agrupador.patrones / lotes if lotes else 0.0,
+            'lote_maximo': self.lote_maximo,
+            'espera_maxima': self.espera_maxima,
+            'patrones_incrementales': self.red.patrones_incrementales,
+        }
+
+    async def despachar(self, metodo, ruta, cuerpo):
+        if ruta == '/salud':
+            if metodo != 'GET':
+                raise ErrorPeticion(405, "Usa GET.")
+            return {'estado': 'ok', 'entradas': self.red.num_entradas, 'neuronas': self.red.num_neuronas,
+                    'topologia': self.red.topologia, 'filas': self.red.filas, 'columnas': self.red.columnas,
+                    'etiquetas': None if self.red.clases is None else self.red.clases.tolist()}
+        if ruta == '/estadisticas':
+            if metodo != 'GET':
+                raise ErrorPeticion(405, "Usa GET.")
+            return self.estadisticas()
+        if ruta == '/ajustar' and self.aprendizaje:
+            if metodo != 'POST':
+                raise ErrorPeticion(405, "Usa POST.")
+            return await self.ajustar(cuerpo)
+        if ruta not in ('/simular', '/simular/imagen'):
+            raise ErrorPeticion(404, f"Ruta desconocida: {ruta}")
+        if metodo != 'POST':
+            raise ErrorPeticion(405, "Usa POST.")
+
+        if ruta == '/simular':
+            patrones = self.patrones_json(cuerpo)
+        else:
+            patrones = await asyncio.get_running_loop().run_in_executor(None, self.patrones_imagen, cuerpo)
+        resultado = await self.agrupador.simular(patrones)
+        resultados = [
+            {'neurona': int(neurona), 'coordenadas': [int(fila), int(columna)], 'distancia': float(distancia)}
+            for neurona, (fila, columna), distancia in zip(resultado['vencedoras'], resultado['coordenadas'],
+                                                           resultado['distancias'])
+        ]
+        # Modelo etiquetado: letra predicha (consulta de la tabla de la vencedora) y su confianza
+        if 'etiquetas' in resultado:
+            for fila, etiqueta, confianza in zip(resultados, resultado['etiquetas'], resultado['confianzas']):
+                fila['etiqueta'] = str(etiqueta)
+                fila['confianza'] = float(confianza)
+        return {'resultados': resultados}
+
+    async def manejar_conexion(self, lector, escritor):
+        # HTTP/1.1 mínimo con conexiones persistentes (keep-alive)
+        try:
+            while True:
+                mantener = False
+                try:
+                    peticion = await leer_peticion(lector)
+                    if peticion is None:
+                        break
+                    metodo, ruta, mantener, cuerpo = peticion
+                    estado, respuesta = 200, await self.despachar(metodo, ruta, cuerpo)
+                except ErrorPeticion as error:
+                    estado, respuesta = error.estado, {'error': str(error)}
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as error:
+                    estado, respuesta = 500, {'error': str(error)}
+                escribir_respuesta(escritor, estado, respuesta, mantener)
+                await escritor.drain()
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def servir(self, host='127.0.0.1', puerto=8080, socket=None):
+        # Calentamiento: reserva los buffers de la red y lee los pesos mapeados antes de la primera petición
+        self.red.simular_lote(np.zeros((1, self.red.num_entradas)))
+        self.agrupador = AgrupadorLotes(self.red, self.lote_maximo, self.espera_maxima)
+        self.agrupador.iniciar()
+        if socket:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(socket)
+            servidor = await asyncio.start_unix_server(self.manejar_conexion, path=socket)
+            direccion = socket
+        else:
+            servidor = await asyncio.start_server(self.manejar_conexion, host, puerto)
+            direccion = 'http://{}:{}'.format(*servidor.sockets[0].getsockname()[:2])
+        print(f"Sirviendo {self.red.num_entradas} entradas x {self.red.num_neuronas} neuronas en {direccion} "
+              f"(lotes de hasta {self.lote_maximo}, espera {self.espera_maxima * 1000:.1f} ms)", flush=True)
+        # SIGTERM detiene el servidor igual que Ctrl+C (y borra el socket)
+        with contextlib.suppress(NotImplementedError):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            await self.agrupador.cerrar()
+            if self.hilo_ajustes is not None:
+                self.hilo_ajustes.shutdown()
+            if socket:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(socket)
+
+async def leer_peticion(lector):
+    linea = await lector.readline()
+    if not linea:
+        return None
+    try:
+        metodo, ruta, version = linea.decode('latin-1').split()
+    except ValueError:
+        raise ErrorPeticion(400, "Línea de petición no válida.")
+    cabeceras = {}
+    while True:
+        linea = await lector.readline()
+        if linea in (b'\r\n', b'\n', b''):
+            break
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        cabeceras[nombre.strip().lower()] = valor.strip()
+
+    conexion = cabeceras.get('connection', '').lower()
+    mantener = conexion == 'keep-alive' or (version == 'HTTP/1.1' and conexion != 'close')
+    try:
+        longitud = int(cabeceras.get('content-length', 0))
+    except ValueError:
+        raise ErrorPeticion(400, "Content-Length no válido.")
+    if longitud > TAMANO_MAXIMO_CUERPO:
+        raise ErrorPeticion(413, f"El cuerpo supera {TAMANO_MAXIMO_CUERPO} bytes.")
+    cuerpo = await lector.readexactly(longitud) if longitud else b''
+    return metodo.upper(), ruta.split('?', 1)[0], mantener, cuerpo
+
+def escribir_respuesta(escritor, estado, respuesta, mantener):
+    cuerpo = json.dumps(respuesta).encode('utf-8')
+    escritor.write(
+        f"HTTP/1.1 {estado} {ESTADOS_HTTP[estado]}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(cuerpo)}\r\n"
+        f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n".encode('latin-1') + cuerpo)
+
+def servir(red, host='127.0.0.1', puerto=8080, socket=None, **opciones):
+    servidor = ServidorInferencia(red, **opciones)
+    try:
+        asyncio.run(servidor.servir(host, puerto, socket))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("Servidor detenido.")
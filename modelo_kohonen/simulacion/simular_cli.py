@@ -0,0 +1,50 @@
+# Simulación por línea de comandos: carga unos pesos y simula un CSV completo.
+# Uso (desde la raíz del repositorio):
+#   python -m modelo_kohonen simulate pesos_red_kohonen.npy entrenamiento20.csv
+import argparse
+import os
+import numpy as np
+from modelo_kohonen.configuraciones.creacionred import RedKohonen, TOPOLOGIAS
+from modelo_kohonen.configuraciones.dataset_binario import cargar_dataset
+from modelo_kohonen.configuraciones.modelo import cargar_modelo, ruta_vigente
+from modelo_kohonen.simulacion.resumen import informe_simulacion
+
+def agregar_argumentos(parser):
+    parser.add_argument('pesos', help="Carpeta de modelo guardado o archivo .npy con los pesos (entradas x neuronas)")
+    parser.add_argument('datos', help="CSV o .npy con un patrón por fila")
+    parser.add_argument('--topologia', choices=TOPOLOGIAS, default='lineal')
+    parser.add_argument('--filas', type=int, default=None)
+    parser.add_argument('--sin-encabezado', action='store_true',
+                        help="El CSV no tiene fila de encabezado (la primera fila ya es un patrón)")
+    parser.add_argument('--umbral', type=float, default=0.1)
+    parser.add_argument('--max-filas', type=int, default=None)
+
+def ejecutar(args, parser):
+    if os.path.isdir(ruta_vigente(args.pesos)):
+        red = cargar_modelo(args.pesos)
+    else:
+        pesos = np.load(args.pesos)
+        num_neuronas = pesos.shape[1]
+        filas = args.filas or 1
+        if num_neuronas % filas != 0:
+            parser.error(f"{num_neuronas} neuronas no se pueden repartir en {filas} filas.")
+        red = RedKohonen(pesos.shape[0], 'dura', 0.1, 1, topologia=args.topologia,
+                         filas=filas, columnas=num_neuronas // filas, dtype=pesos.dtype)
+        red.cargar_pesos(pesos)
+    num_entradas = red.num_entradas
+
+    # Las etiquetas reales (si las hay) permiten evaluar una red etiquetada
+    datos, etiquetas = cargar_dataset(args.datos, encabezado=not args.sin_encabezado)
+    if datos.shape[1] != num_entradas:
+        parser.error(f"Los patrones deben tener {num_entradas} entradas.")
+
+    resultado = red.simular_lote(datos)
+    print(informe_simulacion(resultado, etiquetas, red.clases, umbral=args.umbral, max_filas=args.max_filas))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simular la red de Kohonen sobre un CSV")
+    agregar_argumentos(parser)
+    ejecutar(parser.parse_args(argv), parser)
+
+if __name__ == '__main__':
+    main()
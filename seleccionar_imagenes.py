@@ -1,64 +1,35 @@
+import argparse
 import os
-import random
-import shutil
-
-# Directorio donde están las imágenes organizadas
-directorio_origen = 'letras_organizadas'
-
-# Directorios para entrenamiento y simulación
-directorio_entrenamiento = 'entrenamiento'
-directorio_simulacion = 'simulacion'
-
-# Crear directorios si no existen
-for directorio in [directorio_entrenamiento, directorio_simulacion]:
-    if not os.path.exists(directorio):
-        os.makedirs(directorio)
-
-# Obtener todas las imágenes
-todas_las_imagenes = []
-for letra_carpeta in os.listdir(directorio_origen):
-    ruta_letra = os.path.join(directorio_origen, letra_carpeta)
-    if os.path.isdir(ruta_letra):
-        todas_las_imagenes.extend([os.path.join(ruta_letra, img) for img in os.listdir(ruta_letra)])
-
-# Mezclar aleatoriamente las imágenes
-random.shuffle(todas_las_imagenes)
-
-# Letras que deben estar en la simulación
-letras_obligatorias = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'I', 'O', 'T', 'U']
-
-# Seleccionar al menos una imagen de cada letra obligatoria para la simulación
-imagenes_simulacion = []
-for letra in letras_obligatorias:
-    for img in todas_las_imagenes:
-        if letra in img:  # Verificar si la imagen corresponde a la letra
-            imagenes_simulacion.append(img)
-            todas_las_imagenes.remove(img)  # Eliminar la imagen de la lista para no seleccionarla de nuevo
-            break  # Salir del bucle una vez que se ha encontrado una imagen
-
-# Completar con imágenes aleatorias hasta llegar a 19
-imagenes_simulacion += random.sample(todas_las_imagenes, 19 - len(imagenes_simulacion))
-
-# Asegurarse de que las imágenes de simulación no se repitan en el entrenamiento
-# Seleccionar 80% de la cantidad de imágenes para entrenamiento
-imagenes_entrenamiento = []
-letras_usadas = set()
-
-for img in todas_las_imagenes:
-    letra = img.split(os.path.sep)[-2]  # Obtener la letra de la ruta de la imagen
-    if letra not in letras_usadas and len(imagenes_entrenamiento) < 80:
-        imagenes_entrenamiento.append(img)
-        letras_usadas.add(letra)  # Marcar la letra como utilizada
-
-# Completar el entrenamiento con imágenes aleatorias si no se alcanzan 80
-if len(imagenes_entrenamiento) < 80:
-    imagenes_entrenamiento += random.sample(todas_las_imagenes, 80 - len(imagenes_entrenamiento))
-
-# Copiar imágenes a los directorios correspondientes
-for img in imagenes_entrenamiento:
-    shutil.copy2(img, directorio_entrenamiento)
-
-for img in imagenes_simulacion:
-    shutil.copy2(img, directorio_simulacion)
-
-print(f"Se han seleccionado {len(imagenes_entrenamiento)} imágenes para entrenamiento y {len(imagenes_simulacion)} para simulación.")
\ No newline at end of file
+from modelo_kohonen.configuraciones.cache_caracteristicas import CacheCaracteristicas
+from modelo_kohonen.configuraciones.ensamblado import cargar_indice, ensamblar, guardar_indice
+
+# Selecciona las imágenes organizadas para entrenamiento y simulación. En lugar de copiar las
+# imágenes a carpetas, se construye un índice con sus características y se divide de forma
+# estratificada: todas las letras aparecen en la simulación y en el entrenamiento.
+# Todo lo generado (índice, caché y CSV) se escribe en 'directorio_salida', fuera del control de
+# versiones, para no sobrescribir los entrenamiento.csv y entrenamiento20.csv del repositorio.
+# Uso (desde la raíz del repositorio): python seleccionar_imagenes.py [semilla] [--salida datos]
+def seleccionar_imagenes(semilla=None, directorio_salida='datos'):
+    # Directorio donde están las imágenes organizadas
+    directorio_origen = 'letras_organizadas'
+    os.makedirs(directorio_salida, exist_ok=True)
+    indice = os.path.join(directorio_salida, 'indice_letras.npy')
+
+    # El índice se reconstruye siempre (recoge imágenes añadidas o borradas); con la caché solo
+    # se decodifican las imágenes nuevas o modificadas
+    cache = CacheCaracteristicas(os.path.join(directorio_salida, 'cache_letras.npz'))
+    guardar_indice([directorio_origen], indice, cache=cache)
+    if cache.purgar():  # Olvidar las imágenes que ya no existen
+        cache.guardar()
+    matriz, etiquetas, _ = cargar_indice(indice)
+
+    # 80% para entrenamiento y el resto (al menos una imagen de cada letra) para simulación
+    ensamblar(matriz, etiquetas, os.path.join(directorio_salida, 'entrenamiento.csv'),
+              os.path.join(directorio_salida, 'entrenamiento20.csv'), 0.8, semilla)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Índice de letras y división en entrenamiento y simulación")
+    parser.add_argument('semilla', type=int, nargs='?', default=None)
+    parser.add_argument('--salida', default='datos', help="Carpeta del índice, la caché y los CSV")
+    args = parser.parse_args()
+    seleccionar_imagenes(args.semilla, args.salida)
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+from modelo_kohonen.configuraciones.ensamblado import dividir_estratificado
+
+def etiquetas_desbalanceadas():
+    # Clases de tamaños muy distintos, incluidas algunas con solo 2 patrones
+    conteos = {'A': 50, 'B': 13, 'C': 7, 'D': 2, 'E': 2, 'F': 31}
+    etiquetas = np.array([clase for clase, conteo in conteos.items() for _ in range(conteo)])
+    return etiquetas[np.random.default_rng(5).permutation(len(etiquetas))]
+
+@pytest.mark.parametrize('semilla', [0, 1, 42])
+@pytest.mark.parametrize('porcentaje', [0.5, 0.8, 0.95])
+def test_todas_las_clases_en_entrenamiento_y_prueba(semilla, porcentaje):
+    etiquetas = etiquetas_desbalanceadas()
+    entrenamiento, prueba = dividir_estratificado(etiquetas, porcentaje, semilla)
+    assert set(etiquetas[entrenamiento]) == set(etiquetas)
+    assert set(etiquetas[prueba]) == set(etiquetas)
+    # Cada patrón va a uno solo de los dos conjuntos
+    np.testing.assert_array_equal(np.sort(np.concatenate([entrenamiento, prueba])), np.arange(len(etiquetas)))
+
+def test_division_reproducible_con_semilla():
+    etiquetas = etiquetas_desbalanceadas()
+    primera = dividir_estratificado(etiquetas, 0.8, semilla=7)
+    segunda = dividir_estratificado(etiquetas, 0.8, semilla=7)
+    for a, b in zip(primera, segunda):
+        np.testing.assert_array_equal(a, b)
+    assert not np.array_equal(dividir_estratificado(etiquetas, 0.8, semilla=8)[1], primera[1])
@@ -0,0 +1,62 @@
+import contextlib
+import io
+import os
+import numpy as np
+import pytest
+from modelo_kohonen.configuraciones.creacionred import RedKohonen
+from modelo_kohonen.configuraciones.dataset_binario import cargar_dataset
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOLERANCIA_DM = 1.25  # El DM por bloques puede ser hasta un 25 % peor que el del modo online
+
+def entrenar(datos, tipo_competencia, modo, semilla=0, num_iteraciones=50):
+    red = RedKohonen(datos.shape[1], tipo_competencia, 0.1, num_iteraciones, semilla=semilla)
+    with contextlib.redirect_stdout(io.StringIO()):  # Silenciar los mensajes del entrenamiento
+        red.entrenar(datos, modo=modo, batch_size=16, mostrar_graficos=False)
+    return red
+
+@pytest.fixture(scope='module')
+def datos():
+    datos, _ = cargar_dataset(os.path.join(RAIZ, 'entrenamiento.csv'))
+    return np.asarray(datos, dtype=np.float64)
+
+@pytest.mark.parametrize('tipo_competencia', ['dura', 'blanda'])
+@pytest.mark.parametrize('modo', ['batch', 'minibatch'])
+def test_dm_por_bloques_comparable_a_online(datos, tipo_competencia, modo):
+    online = entrenar(datos, tipo_competencia, 'online')
+    por_bloques = entrenar(datos, tipo_competencia, modo)
+    assert np.isfinite(por_bloques.mejor_dm)
+    assert por_bloques.mejor_dm <= online.mejor_dm * TOLERANCIA_DM
+
+@pytest.mark.parametrize('modo', ['online', 'batch', 'minibatch'])
+def test_entrenamiento_reproducible_con_semilla(datos, modo):
+    primera = entrenar(datos, 'blanda', modo, semilla=3, num_iteraciones=5)
+    segunda = entrenar(datos, 'blanda', modo, semilla=3, num_iteraciones=5)
+    np.testing.assert_array_equal(primera.pesos, segunda.pesos)
+    assert primera.dm_values == segunda.dm_values
+
+# Actualización de referencia: un bucle de Python sobre todas las neuronas
+def actualizar_pesos_bucle(red, pesos, patron, neurona_vencedora, iteracion):
+    if red.tipo_competencia != 'blanda':
+        pesos[:, neurona_vencedora] += red.tasa_aprendizaje * (patron - pesos[:, neurona_vencedora])
+        return
+    radio = red.calcular_radio(iteracion)
+    for i in range(red.num_neuronas):
+        distancia = red.tabla_distancias()[neurona_vencedora, i]
+        if distancia <= radio:
+            influencia = np.exp(-distancia**2 / (2 * radio**2))
+            pesos[:, i] += red.tasa_aprendizaje * influencia * (patron - pesos[:, i])
+
+@pytest.mark.parametrize('tipo_competencia', ['dura', 'blanda'])
+@pytest.mark.parametrize('topologia', ['lineal', 'rectangular', 'hexagonal'])
+def test_actualizar_pesos_igual_que_bucle(tipo_competencia, topologia):
+    rng = np.random.default_rng(0)
+    red = RedKohonen(6, tipo_competencia, 0.3, 20, topologia=topologia, filas=5, columnas=6, semilla=0,
+                     dtype='float64')
+    referencia = np.array(red.pesos)
+    for iteracion in range(1, 11):
+        patron = rng.normal(size=red.num_entradas)
+        vencedora = int(rng.integers(red.num_neuronas))
+        red.actualizar_pesos(patron, vencedora, iteracion)
+        actualizar_pesos_bucle(red, referencia, patron, vencedora, iteracion)
+    np.testing.assert_allclose(red.pesos, referencia, rtol=1e-12, atol=1e-12)
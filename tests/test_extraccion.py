@@ -0,0 +1,47 @@
+import glob
+import os
+import numpy as np
+from modelo_kohonen.configuraciones.cache_caracteristicas import CacheCaracteristicas
+from modelo_kohonen.configuraciones.extraccion import (DESCRIPTORES, DTYPE_CARACTERISTICAS, calcular_descriptores,
+                                                       concatenar, extraer_caracteristicas)
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTAS = sorted(glob.glob(os.path.join(RAIZ, 'letras_organizadas', '*', '*.png')))[:40]
+
+def extraer(extractor, rutas, **opciones):
+    return concatenar(list(extractor(rutas, 2, 16, **opciones)))
+
+def test_cache_igual_que_sin_cache(tmp_path):
+    sin_cache = extraer(extraer_caracteristicas, RUTAS)
+    cache = CacheCaracteristicas(str(tmp_path / 'cache.npz'))
+    np.testing.assert_array_equal(extraer(cache.extraer_caracteristicas, RUTAS), sin_cache)
+    cache.guardar()
+
+    # Caché parcialmente vigente: solo se vuelven a extraer las entradas borradas
+    cache = CacheCaracteristicas(str(tmp_path / 'cache.npz'))
+    for ruta in RUTAS[::3]:
+        del cache.entradas[os.path.abspath(ruta)]
+    mixta = extraer(cache.extraer_caracteristicas, RUTAS)
+    np.testing.assert_array_equal(mixta, sin_cache)
+    assert mixta.dtype == sin_cache.dtype
+
+def test_descriptores_en_dtype_de_caracteristicas():
+    binarizadas = np.random.default_rng(0).integers(0, 2, (3, 28, 28), dtype=np.uint8)
+    for nombre in DESCRIPTORES:
+        assert calcular_descriptores(binarizadas, (nombre,)).dtype == DTYPE_CARACTERISTICAS, nombre
+
+def test_mapa_bits_con_celdas_grandes():
+    # Celdas de 128x256 = 32768 píxeles: el doble de la suma no cabe en uint16
+    binarizadas = np.ones((1, 8 * 128, 8 * 256), dtype=bool)
+    binarizadas[:, :, :8 * 256 // 2] = False
+    mapa = calcular_descriptores(binarizadas, ('mapa_bits',)).reshape(8, 8)
+    np.testing.assert_array_equal(mapa, np.repeat([[0, 0, 0, 0, 1, 1, 1, 1]], 8, axis=0))
+
+def test_cache_con_zonas_conserva_el_dtype(tmp_path):
+    opciones = {'descriptores': DESCRIPTORES, 'lienzo': (28, 28)}
+    cache = CacheCaracteristicas(str(tmp_path / 'cache.npz'))
+    nuevas = extraer(cache.extraer_caracteristicas, RUTAS, **opciones)
+    cache.guardar()
+    cacheadas = extraer(CacheCaracteristicas(str(tmp_path / 'cache.npz')).extraer_caracteristicas, RUTAS, **opciones)
+    assert nuevas.dtype == cacheadas.dtype == DTYPE_CARACTERISTICAS
+    np.testing.assert_array_equal(nuevas, cacheadas)
@@ -0,0 +1,88 @@
+import contextlib
+import io
+import pickle
+import numpy as np
+import pytest
+from modelo_kohonen.configuraciones.creacionred import RedKohonen
+from modelo_kohonen.configuraciones.indice_bmu import IndiceBMU, distancias_cuadradas
+
+def red_entrenada(tipo_competencia='blanda'):
+    datos = np.random.default_rng(0).normal(size=(400, 6))
+    red = RedKohonen(6, tipo_competencia, 0.2, 5, topologia='rectangular', filas=5, columnas=6, semilla=0,
+                     dtype='float64')
+    with contextlib.redirect_stdout(io.StringIO()):
+        red.entrenar(datos, modo='batch', batch_size=64, mostrar_graficos=False)
+    return red
+
+@pytest.mark.parametrize('tipo_competencia', ['dura', 'blanda'])
+def test_ajustar_parcial_online_igual_que_actualizar_pesos(tipo_competencia):
+    patrones = np.random.default_rng(1).normal(size=(20, 6))
+    incremental = red_entrenada(tipo_competencia)
+    referencia = red_entrenada(tipo_competencia)
+    incremental.configurar_incremental(modo='online')
+
+    vencedoras, _ = incremental.ajustar_parcial(patrones)
+    for patron, vencedora_incremental in zip(referencia.normalizar(patrones), vencedoras):
+        vencedora = int(np.argmin(referencia.calcular_distancias_cuadradas(patron)))
+        assert vencedora == vencedora_incremental
+        referencia.actualizar_pesos(patron, vencedora, referencia.iteracion_actual)
+    # actualizar_pesos eleva al cuadrado la fila de distancias de la rejilla (float32) en float32
+    np.testing.assert_allclose(incremental.pesos, referencia.pesos, rtol=1e-6, atol=1e-7)
+
+@pytest.mark.parametrize('patrones', [np.ones((1, 6)), np.full((5, 6), 3.0)])
+def test_ajustar_parcial_sin_normalizacion_rechaza_lote_sin_dispersion(patrones):
+    red = RedKohonen(6, 'blanda', 0.2, 5, semilla=0)
+    pesos = np.array(red.pesos)
+    with pytest.raises(ValueError):
+        red.ajustar_parcial(patrones)
+    assert red.media is None and red.desviacion is None
+    np.testing.assert_array_equal(red.pesos, pesos)
+    red.ajustar_parcial(np.random.default_rng(0).normal(size=(5, 6)))  # Un lote con dispersión sí sirve
+    assert np.all(np.isfinite(red.pesos))
+
+def test_indice_usa_la_instantanea_y_no_reagrupa_en_cada_ajuste():
+    red = red_entrenada()
+    red.activar_indice_bmu(num_grupos=4, num_sondas=4)  # Sondear todos los grupos: búsqueda exacta
+    patrones = red.normalizar(np.random.default_rng(2).normal(size=(50, 6)))
+    red.buscar_vencedoras(patrones)
+    centroides = red.indice_bmu.centroides
+
+    instantanea = red.pesos
+    red.ajustar_parcial(np.random.default_rng(3).normal(size=(3, 6)))
+    assert red.pesos is not instantanea
+    vencedoras, distancias = red.buscar_vencedoras(patrones, instantanea)
+    exactas = distancias_cuadradas(patrones, instantanea)
+    np.testing.assert_array_equal(vencedoras, np.argmin(exactas, axis=1))
+    np.testing.assert_allclose(distancias, exactas.min(axis=1))
+
+    # Con los pesos vigentes tampoco se vuelve a ejecutar k-means tras un ajuste pequeño
+    vencedoras, _ = red.buscar_vencedoras(patrones)
+    assert red.indice_bmu.centroides is centroides
+    np.testing.assert_array_equal(vencedoras, np.argmin(distancias_cuadradas(patrones, red.pesos), axis=1))
+
+def test_indice_sin_grupos_vacios_con_pesos_duplicados():
+    # Muchas neuronas con los mismos pesos dejan centroides repetidos y grupos vacíos tras k-means
+    rng = np.random.default_rng(0)
+    pesos = np.repeat(rng.normal(size=(6, 10)), 20, axis=1)
+    patrones = rng.normal(size=(300, 6))
+    exactas = distancias_cuadradas(patrones, pesos)
+
+    indice = IndiceBMU(num_grupos=30, num_sondas=1, rng=np.random.default_rng(0))
+    indice.construir(pesos)
+    assert all(len(lista) for lista in indice.listas)
+    vencedoras, distancias = indice.buscar(patrones)
+    assert np.all(np.isfinite(distancias))
+    np.testing.assert_allclose(distancias, exactas[np.arange(len(patrones)), vencedoras])
+
+    indice.num_sondas = len(indice.listas)  # Sondear todos los grupos: búsqueda exacta
+    _, distancias = indice.buscar(patrones)
+    np.testing.assert_allclose(distancias, exactas.min(axis=1))
+
+def test_indice_se_puede_serializar():
+    red = red_entrenada()
+    red.activar_indice_bmu(num_grupos=4, num_sondas=4)
+    patrones = red.normalizar(np.random.default_rng(2).normal(size=(20, 6)))
+    vencedoras, _ = red.buscar_vencedoras(patrones)
+    copia = pickle.loads(pickle.dumps(red))
+    copia.ajustar_parcial(np.random.default_rng(3).normal(size=(2, 6)))  # 'seguir' usa el cerrojo recreado
+    np.testing.assert_array_equal(copia.indice_bmu.buscar(patrones, red.pesos)[0], vencedoras)
@@ -0,0 +1,113 @@
+import contextlib
+import io
+import json
+import os
+import pickle
+import numpy as np
+import pytest
+from modelo_kohonen.configuraciones.creacionred import RedKohonen
+from modelo_kohonen.configuraciones.modelo import cargar_modelo, estado_modelo, guardar_modelo
+
+@pytest.fixture
+def red_etiquetada():
+    rng = np.random.default_rng(0)
+    datos = np.concatenate([rng.normal(centro, 0.3, (40, 5)) for centro in (-2, 0, 2)])
+    etiquetas = ['A'] * 40 + ['B'] * 40 + ['C'] * 40
+    red = RedKohonen(5, 'blanda', 0.2, 5, topologia='hexagonal', filas=3, columnas=4, semilla=0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        red.entrenar(datos, modo='batch', batch_size=32, mostrar_graficos=False)
+    red.etiquetar_neuronas(datos, etiquetas)
+    return red
+
+def test_guardar_y_cargar_conserva_el_modelo(tmp_path, red_etiquetada):
+    ruta = str(tmp_path / 'modelo')
+    guardar_modelo(red_etiquetada, ruta)
+    cargada = cargar_modelo(ruta)
+
+    with open(os.path.join(ruta, 'modelo.json'), encoding='utf-8') as archivo:
+        assert json.load(archivo) == estado_modelo(red_etiquetada)
+    assert estado_modelo(cargada) == estado_modelo(red_etiquetada)
+    np.testing.assert_array_equal(cargada.pesos, red_etiquetada.pesos)
+    assert cargada.pesos.dtype == red_etiquetada.pesos.dtype
+    np.testing.assert_array_equal(cargada.clases, red_etiquetada.clases)
+    np.testing.assert_array_equal(cargada.conteos_etiquetas, red_etiquetada.conteos_etiquetas)
+    np.testing.assert_array_equal(cargada.etiqueta_neurona, red_etiquetada.etiqueta_neurona)
+    np.testing.assert_array_equal(cargada.confianza_neurona, red_etiquetada.confianza_neurona)
+
+def test_distancias_red_se_calculan_al_usarse(tmp_path, red_etiquetada):
+    ruta = str(tmp_path / 'modelo')
+    guardar_modelo(red_etiquetada, ruta)
+    assert not os.path.exists(os.path.join(ruta, 'distancias_red.npy'))
+    cargada = cargar_modelo(ruta)
+    cargada.simular_lote(np.zeros((3, 5)))  # Simular no necesita la tabla
+    assert cargada.distancias_red is None
+    np.testing.assert_array_equal(cargada.tabla_distancias(), red_etiquetada.tabla_distancias())
+
+def test_serializar_red_sin_distancias_ni_buffers(red_etiquetada):
+    red_etiquetada.simular_lote(np.zeros((3, 5)))  # Llena los buffers de trabajo
+    copia = pickle.loads(pickle.dumps(red_etiquetada))
+    assert copia.buffers == {}
+    assert copia.distancias_red is None
+    np.testing.assert_array_equal(copia.tabla_distancias(), red_etiquetada.tabla_distancias())
+    np.testing.assert_array_equal(copia.pesos, red_etiquetada.pesos)
+
+def test_guardado_interrumpido_carga_el_modelo_anterior(tmp_path, monkeypatch, red_etiquetada):
+    from modelo_kohonen.configuraciones import modelo
+    ruta = str(tmp_path / 'modelo')
+    guardar_modelo(red_etiquetada, ruta)
+    pesos_guardados = np.array(red_etiquetada.pesos)
+
+    # El proceso muere entre os.replace(ruta, <ruta>.old) y os.replace(<ruta>.tmp, ruta)
+    reemplazar = os.replace
+    llamadas = []
+    def reemplazar_e_interrumpir(origen, destino):
+        llamadas.append(destino)
+        if len(llamadas) == 2:
+            raise KeyboardInterrupt
+        reemplazar(origen, destino)
+    monkeypatch.setattr(modelo.os, 'replace', reemplazar_e_interrumpir)
+    red_etiquetada.pesos[...] += 1.0
+    with pytest.raises(KeyboardInterrupt):
+        guardar_modelo(red_etiquetada, ruta)
+    monkeypatch.setattr(modelo.os, 'replace', reemplazar)
+    assert not os.path.exists(ruta)
+    np.testing.assert_array_equal(cargar_modelo(ruta).pesos, pesos_guardados)
+
+    # El siguiente guardado no borra <ruta>.old antes de tener el nuevo modelo en su sitio
+    guardar_modelo(red_etiquetada, ruta)
+    np.testing.assert_array_equal(cargar_modelo(ruta).pesos, red_etiquetada.pesos)
+    assert not os.path.exists(ruta + '.old')
+
+def test_reanudar_checkpoint_conserva_el_mejor_estado(tmp_path):
+    # Épocas simuladas: los pesos de cada época valen su número y el mejor DM es el de la 3,
+    # anterior a la interrupción; después el DM solo empeora
+    ruta = str(tmp_path / 'checkpoint')
+    dm_por_epoca = {1: 5.0, 2: 3.0, 3: 1.0, 4: 2.0, 5: 4.0, 6: 6.0, 7: 7.0, 8: 8.0}
+
+    def epoca(red, interrumpir_en=None):
+        def entrenar_epoca(iteracion):
+            if iteracion == interrumpir_en:
+                raise KeyboardInterrupt
+            red.pesos[...] = iteracion
+            return dm_por_epoca[iteracion]
+        return entrenar_epoca
+
+    red = RedKohonen(2, 'dura', 0.1, 8, filas=1, columnas=4)
+    red.configurar_parada(paciencia=3, restaurar_mejor=True)
+    red.configurar_checkpoints(ruta, cada_epocas=1)
+    with pytest.raises(KeyboardInterrupt):
+        red.ejecutar_entrenamiento(epoca(red, interrumpir_en=5), False, 1)
+
+    reanudada = cargar_modelo(ruta)
+    assert (reanudada.mejor_iteracion, reanudada.epocas_sin_mejora) == (3, 1)
+    # Como en 'train --continuar': la parada y los checkpoints se configuran tras cargar
+    reanudada.configurar_parada(paciencia=3, restaurar_mejor=True)
+    reanudada.configurar_checkpoints(ruta, cada_epocas=1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        reanudada.ejecutar_entrenamiento(epoca(reanudada), False, 1, continuar=True)
+
+    # La paciencia cuenta la época 4: para en la 6, y los pesos vuelven a los de la época 3
+    assert reanudada.iteracion_actual == 6
+    assert reanudada.mejor_dm == 1.0
+    np.testing.assert_array_equal(reanudada.pesos, 3)
+    np.testing.assert_array_equal(cargar_modelo(ruta).pesos, 3)
@@ -0,0 +1,29 @@
+import contextlib
+import io
+import numpy as np
+from modelo_kohonen.configuraciones.barrido import barrido, configuraciones_rejilla
+from modelo_kohonen.configuraciones.creacionred import RedKohonen
+
+def crear_red():
+    return RedKohonen(8, 'blanda', 0.1, 5, topologia='rectangular', filas=4, columnas=4, semilla=0, dtype='float64')
+
+def test_paralelo_igual_que_batch():
+    datos = np.random.default_rng(0).normal(size=(3000, 8))
+    serie = crear_red()
+    paralela = crear_red()
+    with contextlib.redirect_stdout(io.StringIO()):
+        serie.entrenar(datos, modo='batch', batch_size=500, mostrar_graficos=False)
+        paralela.entrenar_paralelo(datos, procesos=3)
+    np.testing.assert_allclose(paralela.pesos, serie.pesos, atol=1e-12)
+    assert isinstance(paralela.pesos, np.ndarray) and paralela.pesos.base is None  # Fuera de la memoria compartida
+
+def test_barrido_no_depende_del_numero_de_procesos(tmp_path):
+    ruta = str(tmp_path / 'datos.npy')
+    np.save(ruta, np.random.default_rng(1).normal(size=(1000, 6)))
+    espacio = {'tasa_aprendizaje': [0.1, 0.3], 'num_iteraciones': [6], 'tipo_competencia': ['blanda'],
+               'mapa': [(3, 3), (4, 4)], 'topologia': ['rectangular'], 'modo': ['batch']}
+    resultados = []
+    for datos, procesos in ((np.load(ruta), 1), (np.load(ruta, mmap_mode='r'), 3)):
+        clasificacion, _ = barrido(datos, configuraciones_rejilla(espacio), procesos=procesos, epocas_poda=2)
+        resultados.append([(fila['estado'], fila['dm'], fila['error_cuantizacion']) for fila in clasificacion])
+    assert resultados[0] == resultados[1]
@@ -0,0 +1,24 @@
+import asyncio
+import numpy as np
+import pytest
+from modelo_kohonen.configuraciones.creacionred import RedKohonen
+from modelo_kohonen.simulacion.servidor import AgrupadorLotes
+
+def test_un_lote_fallido_no_bloquea_los_siguientes():
+    red = RedKohonen(3, 'dura', 0.1, 1, filas=2, columnas=2, semilla=0)
+
+    async def peticiones():
+        agrupador = AgrupadorLotes(red, espera_maxima=0.05)
+        agrupador.iniciar()
+        try:
+            # Dos peticiones del mismo lote que no se pueden concatenar: fallan las dos
+            fallidas = await asyncio.wait_for(asyncio.gather(
+                agrupador.simular(np.zeros((1, 3))), agrupador.simular(np.zeros((1, 4))),
+                return_exceptions=True), 5)
+            assert all(isinstance(error, ValueError) for error in fallidas)
+            return await asyncio.wait_for(agrupador.simular(np.ones((2, 3))), 5)
+        finally:
+            await agrupador.cerrar()
+
+    resultado = asyncio.run(peticiones())
+    np.testing.assert_array_equal(resultado['vencedoras'], red.simular_lote(np.ones((2, 3)))['vencedoras'])